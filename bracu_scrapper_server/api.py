@@ -1,42 +1,85 @@
-from fastapi import FastAPI, Query, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Query, HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from typing import Optional
 from pydantic import BaseModel
-from sqlalchemy import create_engine, text
-import json
-from datetime import timedelta, datetime, date
+from starlette.concurrency import run_in_threadpool
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
 import calendar
-
-
-## Helper Functions
-def format_time(seconds):
-    if seconds is None:
-        return None
-
-    if isinstance(seconds, timedelta):
-        td = seconds
-    else:
-        td = timedelta(seconds=float(seconds))
-
-    # Format into HH:MM:SS
-    total_seconds = int(td.total_seconds())
-    hours, remainder = divmod(total_seconds, 3600)
-    minutes, seconds = divmod(remainder, 60)
-    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-
-
-# Database config
-DB_USER = "root"
-DB_PASSWORD = ""
-DB_HOST = "localhost"
-DB_NAME = "bracu_info"
-
-# DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
-DATABASE_URL = f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
-engine = create_engine(DATABASE_URL, echo=False)
-
-app = FastAPI(title="BRACU Info API")
+import logging
+
+from bootstrap import BOOTSTRAP_MAX_AGE, BootstrapHolder
+from cache import VERSION_POLL_SECONDS, ResponseCache, make_shared_backend
+from db import engine, fetch_all, stream_rows, dispose
+from metrics import MetricsMiddleware, PROMETHEUS_CONTENT_TYPE, Counter, Gauge, registry, scraper_metrics
+from export import EXPORT_FORMATS, EXPORT_TABLES, export_query, ndjson_chunks, csv_chunks
+from negotiation import choose_encoding, compress_stream
+from exam_snapshot import SnapshotHolder, snapshot_enabled
+from pagination import MAX_PAGE_SIZE, clamp_page_size, keyset_condition, order_by, make_page, encode_cursor, decode_cursor
+from serialize import FastJSONResponse, parse_json_columns
+from sync import SYNC_BATCH, SYNC_TABLES, parse_tables, decode_since, encode_since, changes_query, tombstones_query, first_sync, advance
+from search import MAX_SEARCH_OFFSET, parse_sources, build_search_sql, query_terms, make_snippet
+
+
+# Database config (credentials, DB_MODE and pool settings) lives in db.py
+
+# Errors the handlers recover from go to the log (uvicorn's stderr), not the response
+logger = logging.getLogger(__name__)
+
+# Read endpoints are cached until the scraper for their table bumps TableVersions
+response_cache = ResponseCache(engine, shared=make_shared_backend())
+
+# Cache-Control max-age per resource, clients revalidate with the ETag once it runs out.
+# Announcements and news are scraped hourly, exams after PDF ingests, the rest rarely changes.
+MAX_AGE_FREQUENT = 300
+MAX_AGE_DAILY = 3600
+MAX_AGE_STATIC = 21600
+
+# Sort keys used for keyset pagination, the last column must be unique
+ANNOUNCEMENT_KEYS = ["published_date", "id"]
+NEWS_KEYS = ["published_date", "id"]
+PEOPLE_KEYS = ["id"]
+
+# Without date filters /news shows the current month and /academic-dates the current year,
+# the cache keys those endpoints on the window's first day so a rollover is a new entry
+def this_month():
+    return date.today().replace(day=1)
+
+def this_year():
+    return date.today().replace(month=1, day=1)
+
+# TIME columns come back as HH:MM:SS strings from MySQL itself, other TIME
+# columns are formatted by serialize.dumps while it encodes
+TRANSPORT_COLUMNS = ", ".join(
+    ["route_id", "route_name", "route_no", "stoppage"]
+    + [f"TIME_FORMAT({c}, '%H:%i:%s') AS {c}"
+       for c in ["first_pickup_time", "second_pickup_time", "first_dropoff_time", "second_dropoff_time"]]
+    + ["phone_no"]
+)
+
+# /exam-schedule is answered from a columnar copy of ExamSchedule when numpy is installed
+exam_snapshots = SnapshotHolder()
+
+# /bootstrap is rebuilt in the background as soon as a scraper bumps one of its tables
+bootstrap = BootstrapHolder(response_cache, TRANSPORT_COLUMNS)
+
+# Background work starts with the app, the connection pool (see db.py) is closed when it stops
+@asynccontextmanager
+async def lifespan(app):
+    refresher = asyncio.create_task(bootstrap.refresh_forever(VERSION_POLL_SECONDS))
+    try:
+        yield
+    finally:
+        refresher.cancel()
+        await dispose()
+
+# Rows go straight from the driver to orjson (see serialize.py), cached responses are stored as bytes
+app = FastAPI(title="BRACU Info API", default_response_class=FastJSONResponse, lifespan=lifespan)
+
+# Per-route latency, sizes, in-flight and DB vs serialization time, served on /metrics
+app.add_middleware(MetricsMiddleware)
 
 app.mount("/client/", StaticFiles(directory="client"), name="client")
 
@@ -45,10 +88,13 @@ def read_root():
     return FileResponse("client/index.html")
 
 @app.get("/announcements")
-def get_announcements(
+@response_cache.cached("Announcements", max_age=MAX_AGE_FREQUENT)
+async def get_announcements(
     start_date: Optional[str] = Query(None, description="YYYY-MM-DD"),
     end_date: Optional[str] = Query(None, description="YYYY-MM-DD"),
-    limit: Optional[int] = Query(None, description="Max number of results to return")
+    limit: Optional[int] = Query(None, description="Max number of results to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    page_size: Optional[int] = Query(None, description=f"Paginate with this many results per page (max {MAX_PAGE_SIZE})")
 ):
 
     sql_conditions = []
@@ -58,33 +104,47 @@ def get_announcements(
     if end_date:
         sql_conditions.append("published_date <= :end_date")
 
-    sql = "SELECT * FROM Announcements"
-    if sql_conditions:
-        sql += " WHERE " + " AND ".join(sql_conditions)
-        sql += " ORDER BY published_date DESC"
-    else:
-        sql += " ORDER BY published_date DESC LIMIT 10"
-
-    if limit:
-        sql += " LIMIT :limit"
-
-
     params = {}
     if start_date:
         params["start_date"] = start_date
     if end_date:
         params["end_date"] = end_date
+
+    # Paginated mode, keyset on (published_date, id) so deep pages cost the same as the first
+    if cursor or page_size:
+        page_size = clamp_page_size(page_size)
+        if cursor:
+            condition, cursor_params = keyset_condition(cursor, ANNOUNCEMENT_KEYS, descending=True)
+            sql_conditions.append(condition)
+            params.update(cursor_params)
+
+        sql = "SELECT * FROM Announcements"
+        if sql_conditions:
+            sql += " WHERE " + " AND ".join(sql_conditions)
+        sql += order_by(ANNOUNCEMENT_KEYS, descending=True) + " LIMIT :page_limit"
+        params["page_limit"] = page_size + 1
+
+        rows = await fetch_all(sql, params)
+        return make_page(rows, page_size, ANNOUNCEMENT_KEYS)
+
+    sql = "SELECT * FROM Announcements"
+    if sql_conditions:
+        sql += " WHERE " + " AND ".join(sql_conditions)
+    sql += " ORDER BY published_date DESC"
+
     if limit:
+        sql += " LIMIT :limit"
         params["limit"] = limit
+    elif not sql_conditions:
+        sql += " LIMIT 10"
 
-    with engine.connect() as conn:
-        result = conn.execute(text(sql), params)
-        rows = [dict(row._mapping) for row in result]
+    rows = await fetch_all(sql, params)
 
     return rows
 
 @app.get("/exam-schedule")
-def get_exam_schedule(
+@response_cache.cached("ExamSchedule", max_age=MAX_AGE_DAILY)
+async def get_exam_schedule(
     exam_type: str = Query(..., description="Exam type, e.g. Final Fall 2022, Mid Spring 2025"),  # required
     course_code: str = Query(..., description="Course code, e.g. CSE331"),  # required
     section: Optional[str] = None,
@@ -99,7 +159,7 @@ def get_exam_schedule(
     if section:
         sql_conditions.append("section = :section")
     if student_id:
-        sql_conditions.append("student_id = :end_date")
+        sql_conditions.append("student_id = :student_id")
 
     sql = "SELECT * FROM ExamSchedule"
     if sql_conditions:
@@ -116,20 +176,38 @@ def get_exam_schedule(
     if student_id:
         filters["student_id"] = student_id
 
-    with engine.connect() as conn:
-        result = conn.execute(text(sql), filters)
-        rows = []
-        for row in result:
-            r = dict(row._mapping)
-            if "start_time" in r and r["start_time"] is not None:
-                r["start_time"] = format_time(r["start_time"])
-            if "end_time" in r and r["end_time"] is not None:
-                r["end_time"] = format_time(r["end_time"])
-            rows.append(r)
+    if snapshot_enabled():
+        version = response_cache.version_of(("ExamSchedule",))
+        snapshot = exam_snapshots.current(version) or await run_in_threadpool(exam_snapshots.get, version)
+        rows = snapshot.filter(**filters)
+    else:
+        rows = await fetch_all(sql, filters)
     return rows
 
+# Served from StudentExams, which the exam ingesters rebuild before bumping ExamSchedule
+@app.get("/students/{student_id}/exams")
+@response_cache.cached("ExamSchedule", max_age=MAX_AGE_DAILY)
+async def get_student_exams(
+    student_id: str,
+    term: Optional[str] = Query(None, description="Exam type, e.g. Final Fall 2022, all terms if omitted")
+):
+    sql = """
+        SELECT term, course_code, section, date,
+               TIME_FORMAT(start_time, '%H:%i:%s') AS start_time, TIME_FORMAT(end_time, '%H:%i:%s') AS end_time,
+               room_no, dept
+        FROM StudentExams WHERE student_id = :student_id
+    """
+    params = {"student_id": student_id}
+    if term:
+        sql += " AND term = :term"
+        params["term"] = term
+    sql += " ORDER BY term, date, start_time"
+
+    return await fetch_all(sql, params)
+
 @app.get("/academic-dates")
-def get_academic_dates(
+@response_cache.cached("AcademicDates", max_age=MAX_AGE_DAILY, period=this_year)
+async def get_academic_dates(
     event_name: Optional[str] = None,
     start_date: Optional[str] = Query(None, description="YYYY-MM-DD"),
     end_date: Optional[str] = Query(None, description="YYYY-MM-DD")
@@ -159,22 +237,23 @@ def get_academic_dates(
         sql += " ORDER BY start_date ASC"
     else:
         # If no conditions are given just give all the ecents of the current year
-        current_year = datetime.now().year
+        current_year = this_year().year
         sql += f" WHERE start_date >= '{current_year}-01-01' AND start_date <= '{current_year}-12-31'" 
         sql += " ORDER BY start_date ASC"
 
-    with engine.connect() as conn:
-        result = conn.execute(text(sql), params)
-        rows = [dict(row._mapping) for row in result]
+    rows = await fetch_all(sql, params)
 
     return rows
 
 @app.get("/news")
-def get_news(
+@response_cache.cached("News", max_age=MAX_AGE_FREQUENT, period=this_month)
+async def get_news(
     title: Optional[str] = None,
     start_date: Optional[str] = Query(None, description="YYYY-MM-DD"),
     end_date: Optional[str] = Query(None, description="YYYY-MM-DD"),
-    exact_date: Optional[str] = Query(None, description="YYYY-MM-DD")
+    exact_date: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    page_size: Optional[int] = Query(None, description=f"Paginate with this many results per page (max {MAX_PAGE_SIZE})")
 ):
     sql = "SELECT * FROM News"
     conditions = []
@@ -193,68 +272,57 @@ def get_news(
         conditions.append("published_date = :exact_date")
         params["exact_date"] = exact_date
 
-    if conditions:
-        sql += " WHERE " + " AND ".join(conditions)
-        sql += " ORDER BY published_date ASC"
-
     if not conditions:
         # If no conditions give the news of the current month
-        today = date.today()
-        current_year = today.year
-        current_month = today.month
+        first_day = this_month()
+        current_year = first_day.year
+        current_month = first_day.month
 
-        first_day = date(current_year, current_month, 1)
         last_day = date(current_year, current_month, calendar.monthrange(current_year, current_month)[1])
 
-        first_day_str = first_day.strftime("%Y-%m-%d")
-        last_day_str = last_day.strftime("%Y-%m-%d")
-
-        sql += f" WHERE published_date >= '{first_day_str}' AND published_date <= '{last_day_str}'"
+        conditions.append("published_date >= :first_day AND published_date <= :last_day")
+        params["first_day"] = first_day.strftime("%Y-%m-%d")
+        params["last_day"] = last_day.strftime("%Y-%m-%d")
+
+    paged = bool(cursor or page_size)
+    if paged:
+        page_size = clamp_page_size(page_size)
+        if cursor:
+            condition, cursor_params = keyset_condition(cursor, NEWS_KEYS, descending=False)
+            conditions.append(condition)
+            params.update(cursor_params)
+
+    sql += " WHERE " + " AND ".join(conditions)
+    if paged:
+        sql += order_by(NEWS_KEYS, descending=False) + " LIMIT :page_limit"
+        params["page_limit"] = page_size + 1
+    else:
         sql += " ORDER BY published_date ASC"
 
-    with engine.connect() as conn:
-        result = conn.execute(text(sql), params)
-        rows = [dict(row._mapping) for row in result]
-
-    # Parse JSON field
-    for item in rows:
-        if item.get("image_url"):
-            try:
-                item["image_url"] = json.loads(item["image_url"])
-            except Exception:
-                item["image_url"] = None
+    rows = parse_json_columns(await fetch_all(sql, params), "image_url")
 
+    if paged:
+        return make_page(rows, page_size, NEWS_KEYS)
     return rows
 
 @app.get("/transport")
-def get_transport(route_id: Optional[int] = None):
-    sql = "SELECT * FROM Transport"
+@response_cache.cached("Transport", max_age=MAX_AGE_STATIC)
+async def get_transport(route_id: Optional[int] = None):
+    sql = f"SELECT {TRANSPORT_COLUMNS} FROM Transport"
     params = {}
 
     if route_id:
-        sql += " WHERE route_name LIKE :route_id"
-        params["route_id"] = f"%Route-{route_id:02}%" # :02 make it pad with zeros to make it 2 digits.
+        # route_no is parsed from "Route-NN" by the scraper and indexed
+        sql += " WHERE route_no = :route_no"
+        params["route_no"] = route_id
 
     sql += " ORDER BY route_id ASC"
 
-    with engine.connect() as conn:
-        result = conn.execute(text(sql), params)
-        rows = []
-        for row in result:
-            r = dict(row._mapping)
-            if "first_pickup_time" in r and r["first_pickup_time"] is not None:
-                r["first_pickup_time"] = format_time(r["first_pickup_time"])
-            if "second_pickup_time" in r and r["second_pickup_time"] is not None:
-                r["second_pickup_time"] = format_time(r["second_pickup_time"])
-            if "first_dropoff_time" in r and r["first_dropoff_time"] is not None:
-                r["first_dropoff_time"] = format_time(r["first_dropoff_time"])
-            if "second_dropoff_time" in r and r["second_dropoff_time"] is not None:
-                r["second_dropoff_time"] = format_time(r["second_dropoff_time"])
-            rows.append(r)
-    return rows
+    return await fetch_all(sql, params)
 
 @app.get("/contact-info")
-def get_contact_info(
+@response_cache.cached("ContactInfo", max_age=MAX_AGE_STATIC)
+async def get_contact_info(
     name: Optional[str] = None,
     id: Optional[int] = None
 ):
@@ -274,41 +342,184 @@ def get_contact_info(
 
     sql += " ORDER BY id DESC"
 
-    with engine.connect() as conn:
-        result = conn.execute(text(sql), params)
-        rows = [dict(row._mapping) for row in result]
-
-    # Parse JSON fields
-    for item in rows:
-        if item.get("emails"):
-            try:
-                item["emails"] = json.loads(item["emails"])
-            except Exception:
-                item["emails"] = None
-        if item.get("phone_no"):
-            try:
-                item["phone_no"] = json.loads(item["phone_no"])
-            except Exception:
-                item["phone_no"] = None
-
-    return rows
+    return parse_json_columns(await fetch_all(sql, params), "emails", "phone_no")
 
 @app.get("/people")
-def get_people(name: Optional[str] = None):
+@response_cache.cached("People", max_age=MAX_AGE_STATIC)
+async def get_people(
+    name: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    page_size: Optional[int] = Query(None, description=f"Paginate with this many results per page (max {MAX_PAGE_SIZE})")
+):
     sql = "SELECT * FROM People"
+    conditions = []
     params = {}
 
     if name:
-        sql += " WHERE url LIKE :name"
+        conditions.append("url LIKE :name")
         params["name"] = f"%{name}%"
+
+    # Paginated mode, keyset on id
+    if cursor or page_size:
+        page_size = clamp_page_size(page_size)
+        if cursor:
+            condition, cursor_params = keyset_condition(cursor, PEOPLE_KEYS, descending=True)
+            conditions.append(condition)
+            params.update(cursor_params)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += order_by(PEOPLE_KEYS, descending=True) + " LIMIT :page_limit"
+        params["page_limit"] = page_size + 1
+
+        rows = await fetch_all(sql, params)
+        return make_page(rows, page_size, PEOPLE_KEYS)
+
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
         sql += " ORDER BY id DESC"
     else:
         sql += " ORDER BY id DESC LIMIT :limit"
         params["limit"] = 50
 
 
-    with engine.connect() as conn:
-        result = conn.execute(text(sql), params)
-        rows = [dict(row._mapping) for row in result]
+    rows = await fetch_all(sql, params)
 
     return rows
+
+@app.get("/search")
+@response_cache.cached("Announcements", "News", "People", max_age=MAX_AGE_FREQUENT)
+async def get_search(
+    q: str = Query(..., min_length=2, description="Words to search for"),
+    sources: Optional[str] = Query(None, description="Comma separated subset of announcements, news, people"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    page_size: Optional[int] = Query(None, description=f"Results per page (max {MAX_PAGE_SIZE})")
+):
+    try:
+        source_names = parse_sources(sources)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Results are ranked by relevance, so the cursor is just the offset of the next page
+    page_size = clamp_page_size(page_size)
+    offset = decode_cursor(cursor, ["offset"])["offset"] if cursor else 0
+    if not isinstance(offset, int) or offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if offset >= MAX_SEARCH_OFFSET:
+        return {"items": [], "next_cursor": None}
+
+    params = {"q": q, "page_limit": page_size + 1, "offset": offset}
+    rows = await fetch_all(build_search_sql(source_names), params)
+
+    terms = query_terms(q)
+    for r in rows:
+        r["snippet"] = make_snippet(r.pop("body"), terms)
+        r["score"] = round(float(r["score"]), 4)
+
+    next_cursor = None
+    if len(rows) > page_size and offset + page_size < MAX_SEARCH_OFFSET:
+        next_cursor = encode_cursor({"offset": offset + page_size}, ["offset"])
+    return {"items": rows[:page_size], "next_cursor": next_cursor}
+
+# Apply "upserted" (by id) before "deleted", keep next_since, call again while has_more
+@app.get("/sync")
+@response_cache.cached(*SYNC_TABLES.values(), max_age=0)
+async def get_sync(
+    since: Optional[str] = Query(None, description="next_since from the previous sync, omit for a full first sync"),
+    tables: Optional[str] = Query(None, description=f"Comma separated subset of {', '.join(SYNC_TABLES)}")
+):
+    try:
+        names = parse_tables(tables)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    watermarks = decode_since(since)
+
+    async def table_changes(name):
+        watermark = watermarks.get(name)
+        changed, deleted = await asyncio.gather(
+            fetch_all(*changes_query(name, watermark)),
+            fetch_all(*tombstones_query(name, watermark)),
+        )
+        more = len(changed) > SYNC_BATCH or len(deleted) > SYNC_BATCH
+        changed, deleted = changed[:SYNC_BATCH], deleted[:SYNC_BATCH]
+        watermarks[name] = advance(watermark, changed, deleted)
+        if first_sync(watermark):
+            deleted = []
+        if name == "news":
+            parse_json_columns(changed, "image_url")
+        return name, {"upserted": changed, "deleted": [row["row_id"] for row in deleted]}, more
+
+    results = await asyncio.gather(*(table_changes(name) for name in names))
+    return {
+        "tables": {name: changes for name, changes, _ in results},
+        "next_since": encode_since(watermarks),
+        "has_more": any(more for _, _, more in results),
+    }
+
+# Everything the app shows on first paint in one round trip: latest announcements, this month's
+# news headlines, upcoming academic dates and the transport table. Prebuilt, see bootstrap.py.
+@app.get("/bootstrap")
+async def get_bootstrap(request: Request):
+    bundle = bootstrap.current() or await bootstrap.refresh()
+    return bundle.respond(request, BOOTSTRAP_MAX_AGE)
+
+# Whole tables as NDJSON or CSV, streamed in batches so memory stays flat however many rows
+# there are. With since, only rows changed after it (see export.py). Not cached.
+@app.get("/export/{table}")
+async def export_table(
+    table: str,
+    request: Request,
+    fmt: str = Query("ndjson", alias="format", description=f"One of {', '.join(EXPORT_FORMATS)}"),
+    since: Optional[str] = Query(None, description="Only rows changed after this ISO date or datetime")
+):
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    try:
+        sql, params = export_query(table, since)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    batches = stream_rows(sql, params)
+    if fmt == "csv":
+        body = csv_chunks(batches)
+    else:
+        body = ndjson_chunks(batches, EXPORT_TABLES[table].get("json", []))
+
+    headers = {"Content-Disposition": f'attachment; filename="{table}.{fmt}"', "Vary": "Accept-Encoding"}
+    # size is unknown up front, so anything the client accepts is compressed
+    encoding = choose_encoding(request.headers.get("accept-encoding"), float("inf"))
+    if encoding is not None:
+        body = compress_stream(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return StreamingResponse(body, media_type=EXPORT_FORMATS[fmt], headers=headers)
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    return response_cache.stats()
+
+CACHE_LOOKUPS = Counter("api_cache_lookups_total", "Response cache lookups by result", ["result"])
+CACHE_ENTRIES = Gauge("api_cache_entries", "Entries in the local caches", ["cache"])
+BOOTSTRAP_BUILDS = Counter("api_bootstrap_builds_total", "Times the /bootstrap bundle was rebuilt")
+
+@registry.collector
+def cache_metrics():
+    yield CACHE_LOOKUPS, [((name,), value) for name, value in response_cache.counters.items()]
+    yield CACHE_ENTRIES, [(("responses",), len(response_cache.local)), (("compressed",), len(response_cache.compressed))]
+    yield BOOTSTRAP_BUILDS, [((), bootstrap.builds)]
+
+# Prometheus text format. Each uvicorn worker has its own registry, scrape them separately.
+# Scraper counters come from the tables the scheduler writes, so they are the same on every worker.
+@app.get("/metrics")
+async def get_metrics():
+    try:
+        runs = await fetch_all("""
+            SELECT job_name, runs, failures, last_duration_sec, UNIX_TIMESTAMP(last_finished) AS last_finished
+            FROM ScraperRuns
+        """)
+        totals = await fetch_all("SELECT job_name, metric, table_name, value FROM ScraperMetrics")
+    except Exception:
+        # tables missing on an old database, the API's own metrics are still useful
+        logger.exception("Could not read scraper metrics")
+        runs, totals = [], []
+    return Response(registry.render(scraper_metrics(runs, totals)), media_type=PROMETHEUS_CONTENT_TYPE)
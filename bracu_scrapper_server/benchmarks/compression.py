@@ -0,0 +1,103 @@
+"""
+Bytes on the wire and encode CPU per endpoint, for every body format and compression.
+
+    python benchmarks/compression.py
+    python benchmarks/compression.py --rows 500 --label small
+
+For each endpoint shape (rows are generated, no database needed) this
+encodes JSON and, with msgpack installed, MessagePack, then compresses the
+result with gzip and, with brotli installed, brotli at the levels set in
+negotiation.py. Each run is saved to benchmarks/results/compression_<label>.json.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from negotiation import ENCODINGS, compress
+from serialize import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, encode, msgpack, parse_json_columns
+from serialization import news_rows, transport_rows
+
+# === CONFIG ===
+results_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+WORDS = ("BRAC University research faculty student department course program "
+         "professor lecturer engineering science computer business").split()
+
+
+def text(words):
+    return " ".join(random.choice(WORDS) for _ in range(words))
+
+
+def people_rows(count):
+    return [{"id": i, "name": f"Person {i}", "designation": "Lecturer", "department": "CSE",
+             "email": f"person{i}@bracu.ac.bd", "about": text(250), "image_url": f"https://www.bracu.ac.bd/p/{i}.jpg"}
+            for i in range(count)]
+
+
+def announcement_rows(count):
+    return [{"id": i, "title": f"Notice {i}: {text(6)}", "url": f"https://www.bracu.ac.bd/notice/{i}",
+             "message": text(120), "published_date": datetime(2024, 1, 1) + timedelta(days=i % 365)}
+            for i in range(count)]
+
+
+def exam_rows(count):
+    return [{"id": i, "type": "Final Fall 2024", "course_code": f"CSE{random.randint(100, 499)}",
+             "section": f"{random.randint(1, 20):02}", "date": "2024-12-15", "start_time": "09:00:00",
+             "end_time": "11:00:00", "room_no": f"{random.randint(1, 12)}{random.randint(101, 120)}",
+             "dept": "CSE", "student_id": "N/A", "source_file": "Final Fall 2024/cse.pdf"}
+            for i in range(count)]
+
+
+def best_ms(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), result
+
+
+def run(label, count, repeat):
+    random.seed(1)
+    endpoints = {
+        "people": people_rows(count),
+        "news": parse_json_columns(news_rows(count), "image_url"),
+        "announcements": announcement_rows(count),
+        "exam-schedule": exam_rows(count),
+        "transport": transport_rows(count, formatted=True),
+    }
+    media_types = [JSON_MEDIA_TYPE] + ([MSGPACK_MEDIA_TYPE] if msgpack is not None else [])
+    report = {"label": label, "rows": count, "encodings": ENCODINGS, "endpoints": {}}
+
+    for name, rows in endpoints.items():
+        results = report["endpoints"][name] = {}
+        for media_type in media_types:
+            encode_ms, body = best_ms(lambda: encode(rows, media_type), repeat)
+            fmt = media_type.split("/")[1]
+            results[fmt] = {"bytes": len(body), "encode_ms": round(encode_ms, 3)}
+            line = f"{name:14} {fmt:8} {len(body):>9} B  encode {encode_ms:7.2f} ms"
+            for encoding in ENCODINGS:
+                compress_ms, compressed = best_ms(lambda: compress(body, encoding), repeat)
+                results[f"{fmt}+{encoding}"] = {"bytes": len(compressed), "encode_ms": round(encode_ms + compress_ms, 3)}
+                line += f"  | {encoding:4} {len(compressed):>8} B ({len(compressed) / len(body):4.0%}) +{compress_ms:6.2f} ms"
+            print(line)
+
+    os.makedirs(results_folder, exist_ok=True)
+    path = os.path.join(results_folder, f"compression_{label}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--label", default="current", help="Name for this run")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.label, args.rows, args.repeat)
@@ -0,0 +1,104 @@
+"""
+Compare /exam-schedule's two paths: SQL through db.py against the in-memory ExamSnapshot.
+
+    python benchmarks/exam_snapshot.py
+    python benchmarks/exam_snapshot.py --queries 500 --label exam-week
+
+Filters are sampled from real (type, course_code, section, student_id)
+rows, half of them with a section and student. Each run is saved to
+benchmarks/results/exam_snapshot_<label>.json.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import fetch_all_sync
+from exam_snapshot import ExamSnapshot, np
+
+# === CONFIG ===
+results_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def sample_filters(count):
+    keys = fetch_all_sync("SELECT DISTINCT type, course_code, section, student_id FROM ExamSchedule")
+    filters = []
+    for _ in range(count):
+        key = random.choice(keys)
+        f = {"type": key["type"], "course_code": key["course_code"]}
+        if random.random() < 0.5 and key["section"]:
+            f["section"] = key["section"]
+            f["student_id"] = key["student_id"]
+        filters.append(f)
+    return filters
+
+
+def sql_filter(f):
+    sql = "SELECT * FROM ExamSchedule WHERE " + " AND ".join(f"{name} = :{name}" for name in f)
+    return fetch_all_sync(sql + " ORDER BY section ASC", f)
+
+
+def timed(func, filters):
+    times, rows = [], 0
+    for f in filters:
+        start = time.perf_counter()
+        rows += len(func(f))
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {
+        "avg_ms": round(statistics.mean(times), 4),
+        "p50_ms": round(times[len(times) // 2], 4),
+        "p99_ms": round(times[int(len(times) * 0.99) - 1], 4),
+        "rows": rows,
+    }
+
+
+def run(label, queries):
+    if np is None:
+        sys.exit("numpy is not installed: pip install numpy")
+
+    filters = sample_filters(queries)
+
+    start = time.perf_counter()
+    snapshot = ExamSnapshot.load("bench")
+    build_ms = (time.perf_counter() - start) * 1000
+
+    report = {
+        "label": label,
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "rows": snapshot.size,
+        "snapshot_build_ms": round(build_ms, 1),
+        "snapshot_code_bytes": snapshot.nbytes(),
+        "sql": timed(sql_filter, filters),
+        "snapshot": timed(lambda f: snapshot.filter(**f), filters),
+    }
+    if report["sql"]["rows"] != report["snapshot"]["rows"]:
+        print(f"Warning: SQL returned {report['sql']['rows']} rows, snapshot {report['snapshot']['rows']}")
+
+    for path in ("sql", "snapshot"):
+        r = report[path]
+        print(f"{path:10} avg={r['avg_ms']:.3f} ms  p50={r['p50_ms']:.3f} ms  p99={r['p99_ms']:.3f} ms  rows={r['rows']}")
+    print(f"snapshot of {snapshot.size} rows built in {build_ms:.0f} ms, "
+          f"speedup {report['sql']['avg_ms'] / max(report['snapshot']['avg_ms'], 1e-9):.1f}x")
+
+    os.makedirs(results_folder, exist_ok=True)
+    path = os.path.join(results_folder, f"exam_snapshot_{label}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--label", default="current", help="Name for this run")
+    parser.add_argument("--queries", type=int, default=200, help="Filters to time on each path")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    run(args.label, args.queries)
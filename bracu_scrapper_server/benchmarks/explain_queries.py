@@ -0,0 +1,228 @@
+"""
+EXPLAIN and time the queries api.py issues, to check the indexes in migrations/.
+
+    python benchmarks/explain_queries.py --label before
+    python migrate.py
+    python benchmarks/explain_queries.py --label after
+    python benchmarks/explain_queries.py --compare before after
+
+Queries run through db.py like the API's own, and the keyset pages,
+search, /sync, /export and /bootstrap queries are built with the same
+helpers api.py calls, so they follow it when it changes. Each run is saved
+to benchmarks/results/explain_<label>.json.
+"""
+import argparse
+import calendar
+import os
+import sys
+import time
+from datetime import date
+
+root_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_folder)
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from bootstrap import bundle_queries
+from db import fetch_all_sync
+from export import export_query
+from pagination import keyset_after, order_by
+from search import build_search_sql, parse_sources
+from sync import SYNC_BATCH, SYNC_TABLES, changes_query, tombstones_query
+from harness import compare, new_report, save_report, summarize_ms
+
+# === CONFIG ===
+runs_per_query = 20
+# Sort keys api.py paginates on
+ANNOUNCEMENT_KEYS = ["published_date", "id"]
+NEWS_KEYS = ["published_date", "id"]
+PEOPLE_KEYS = ["id"]
+
+
+def first_row(sql, params=None, offset=0):
+    """One row, None when there is none or the table / column does not exist yet (a run before migrate.py)."""
+    try:
+        rows = fetch_all_sync(f"{sql} LIMIT 1 OFFSET {offset}", params)
+    except SQLAlchemyError:
+        return None
+    return rows[0] if rows else None
+
+
+def sample_params():
+    """Pick real values from the database so the plans reflect actual selectivity."""
+    p = {
+        "start_date": "2024-01-01",
+        "end_date": "2024-12-31",
+        "type": "N/A",
+        "course_code": "N/A",
+        "section": "N/A",
+        "student_id": "N/A",
+        "exam_student_id": "N/A",
+        "term": "N/A",
+        "title": "",
+        "event_name": "%exam%",
+        "route_no": 1,
+        "name": "%a%",
+        "q": "exam schedule",
+        "announcement": {"published_date": "2024-06-01", "id": 1},
+        "news": {"published_date": "2024-06-01", "id": 1},
+        "person": {"id": 1},
+        "watermarks": {},
+    }
+
+    row = first_row("SELECT type, course_code, section, student_id FROM ExamSchedule")
+    if row:
+        p.update(row)
+    row = first_row("SELECT student_id, term FROM StudentExams")
+    if row:
+        p["exam_student_id"], p["term"] = row["student_id"], row["term"]
+    row = first_row("SELECT title FROM News ORDER BY id DESC")
+    if row:
+        p["title"] = row["title"]
+
+    # a cursor halfway down each paginated list, the deep pages keyset pagination is for
+    for name, table, keys in (("announcement", "Announcements", ANNOUNCEMENT_KEYS),
+                              ("news", "News", NEWS_KEYS), ("person", "People", PEOPLE_KEYS)):
+        count = first_row(f"SELECT COUNT(*) AS n FROM {table}")["n"]
+        row = first_row(f"SELECT {', '.join(keys)} FROM {table}{order_by(keys, True)}", offset=count // 2)
+        if row:
+            p[name] = {key: str(value) if key == "published_date" else value for key, value in row.items()}
+
+    # an incremental /sync: everything up to the newest change and tombstone is already on the client
+    for name, table in SYNC_TABLES.items():
+        watermark = {}
+        row = first_row(f"SELECT updated_at, id FROM {table} ORDER BY updated_at DESC, id DESC")
+        if row:
+            watermark.update(updated_at=str(row["updated_at"]), id=row["id"])
+        row = first_row("SELECT deleted_at, row_id FROM SyncTombstones WHERE table_name = :table_name"
+                        " ORDER BY deleted_at DESC, row_id DESC", {"table_name": table})
+        if row:
+            watermark.update(deleted_at=str(row["deleted_at"]), row_id=row["row_id"])
+        p["watermarks"][name] = watermark
+    return p
+
+
+def keyset_page(table, conditions, params, keys, descending, cursor):
+    condition, cursor_params = keyset_after(cursor, keys, descending)
+    sql = f"SELECT * FROM {table} WHERE " + " AND ".join([*conditions, condition])
+    return sql + order_by(keys, descending) + " LIMIT :page_limit", {**params, **cursor_params, "page_limit": 21}
+
+
+def api_queries(p):
+    """{name: (sql, params)} for every query shape api.py can build."""
+    today = date.today()
+    # the windows /news and /academic-dates fall back to without date filters
+    month_window = {"first_day": str(today.replace(day=1)),
+                    "last_day": str(today.replace(day=calendar.monthrange(today.year, today.month)[1]))}
+
+    queries = {
+        "exam_schedule": (
+            "SELECT * FROM ExamSchedule WHERE type = :type AND course_code = :course_code ORDER BY section ASC",
+            {"type": p["type"], "course_code": p["course_code"]}),
+        "exam_schedule_section_student": (
+            "SELECT * FROM ExamSchedule WHERE type = :type AND course_code = :course_code"
+            " AND section = :section AND student_id = :student_id ORDER BY section ASC",
+            {key: p[key] for key in ("type", "course_code", "section", "student_id")}),
+        "student_exams": (
+            "SELECT term, course_code, section, date, start_time, end_time, room_no, dept FROM StudentExams"
+            " WHERE student_id = :student_id ORDER BY term, date, start_time",
+            {"student_id": p["exam_student_id"]}),
+        "student_exams_term": (
+            "SELECT term, course_code, section, date, start_time, end_time, room_no, dept FROM StudentExams"
+            " WHERE student_id = :student_id AND term = :term ORDER BY term, date, start_time",
+            {"student_id": p["exam_student_id"], "term": p["term"]}),
+
+        "announcements_latest": ("SELECT * FROM Announcements ORDER BY published_date DESC LIMIT 10", {}),
+        "announcements_range": (
+            "SELECT * FROM Announcements WHERE published_date >= :start_date AND published_date <= :end_date"
+            " ORDER BY published_date DESC",
+            {"start_date": p["start_date"], "end_date": p["end_date"]}),
+        "announcements_first_page": (
+            "SELECT * FROM Announcements" + order_by(ANNOUNCEMENT_KEYS, True) + " LIMIT :page_limit",
+            {"page_limit": 21}),
+        "announcements_deep_page": keyset_page("Announcements", [], {}, ANNOUNCEMENT_KEYS, True, p["announcement"]),
+
+        "news_this_month": (
+            "SELECT * FROM News WHERE published_date >= :first_day AND published_date <= :last_day"
+            " ORDER BY published_date ASC", month_window),
+        "news_title": ("SELECT * FROM News WHERE title = :title ORDER BY published_date ASC", {"title": p["title"]}),
+        "news_range_deep_page": keyset_page(
+            "News", ["published_date >= :start_date", "published_date <= :end_date"],
+            {"start_date": p["start_date"], "end_date": p["end_date"]}, NEWS_KEYS, False, p["news"]),
+
+        "academic_dates_this_year": (
+            "SELECT * FROM AcademicDates WHERE start_date >= :first_day AND start_date <= :last_day"
+            " ORDER BY start_date ASC", {"first_day": f"{today.year}-01-01", "last_day": f"{today.year}-12-31"}),
+        "academic_dates_range": (
+            "SELECT * FROM AcademicDates WHERE start_date <= :end_date AND start_date >= :start_date"
+            " ORDER BY start_date ASC", {"start_date": p["start_date"], "end_date": p["end_date"]}),
+        "academic_dates_end": (
+            "SELECT * FROM AcademicDates WHERE end_date = :end_date ORDER BY start_date ASC",
+            {"end_date": p["end_date"]}),
+        "academic_dates_event": (
+            "SELECT * FROM AcademicDates WHERE event_name LIKE :event_name ORDER BY start_date ASC",
+            {"event_name": p["event_name"]}),
+
+        "transport": ("SELECT * FROM Transport ORDER BY route_id ASC", {}),
+        "transport_route_no": (
+            "SELECT * FROM Transport WHERE route_no = :route_no ORDER BY route_id ASC", {"route_no": p["route_no"]}),
+        "contact_info_name": (
+            "SELECT * FROM ContactInfo WHERE name LIKE :name ORDER BY id DESC", {"name": p["name"]}),
+
+        "people_latest": ("SELECT * FROM People ORDER BY id DESC LIMIT :limit", {"limit": 50}),
+        "people_name": ("SELECT * FROM People WHERE url LIKE :name ORDER BY id DESC", {"name": p["name"]}),
+        "people_deep_page": keyset_page("People", [], {}, PEOPLE_KEYS, True, p["person"]),
+
+        "search_all": (build_search_sql(parse_sources(None)), {"q": p["q"], "page_limit": 21, "offset": 0}),
+    }
+
+    for name in SYNC_TABLES:
+        watermark = p["watermarks"].get(name)
+        queries[f"sync_{name}_first"] = changes_query(name, None)
+        queries[f"sync_{name}_changes"] = changes_query(name, watermark)
+        queries[f"sync_{name}_deleted"] = tombstones_query(name, watermark)
+
+    queries["export_news_since"] = export_query("news", p["start_date"])
+    queries["export_exam_schedule_since"] = export_query("exam_schedule", p["start_date"])
+
+    for name, query in bundle_queries(today, "*").items():
+        queries[f"bootstrap_{name}"] = query
+    return queries
+
+
+def run(label):
+    params = sample_params()
+    report = new_report(label, runs_per_query=runs_per_query, sync_batch=SYNC_BATCH, queries={})
+    for name, (sql, args) in api_queries(params).items():
+        try:
+            plan = fetch_all_sync("EXPLAIN " + sql, args)
+            times = []
+            for _ in range(runs_per_query):
+                start = time.perf_counter()
+                fetch_all_sync(sql, args)
+                times.append((time.perf_counter() - start) * 1000)
+        except SQLAlchemyError as e:
+            # e.g. transport_route_no before migration 0003 added the column
+            print(f"{name}: {e}")
+            report["queries"][name] = {"error": str(e)}
+            continue
+
+        first = plan[0]
+        r = {"sql": sql, "explain": plan, "type": first.get("type"), "key": first.get("key"),
+             "rows": first.get("rows"), **summarize_ms(times)}
+        report["queries"][name] = r
+        print(f"{name:32} type={r['type']!s:6} key={r['key']!s:30} rows={r['rows']!s:8} "
+              f"extra={first.get('Extra')}  p50={r['p50_ms']} ms")
+    save_report("explain", report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--label", default="current", help="Name for this run, e.g. before / after")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two saved runs")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare("explain", "queries", *args.compare, ["type", "key", "rows", "p50_ms"])
+    else:
+        run(args.label)
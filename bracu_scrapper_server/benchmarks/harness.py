@@ -0,0 +1,74 @@
+"""Shared bits of the benchmark scripts: percentiles, the commit a run was made on, saving results."""
+import json
+import os
+import subprocess
+import time
+
+# === CONFIG ===
+results_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize_ms(times_ms):
+    times_ms = sorted(times_ms)
+    if not times_ms:
+        return {"count": 0}
+    return {
+        "count": len(times_ms),
+        "avg_ms": round(sum(times_ms) / len(times_ms), 3),
+        "p50_ms": round(percentile(times_ms, 50), 3),
+        "p95_ms": round(percentile(times_ms, 95), 3),
+        "p99_ms": round(percentile(times_ms, 99), 3),
+        "max_ms": round(times_ms[-1], 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def new_report(label, **settings):
+    return {"label": label, "created_at": time.strftime("%Y-%m-%d %H:%M:%S"), "commit": git_commit(), **settings}
+
+
+def save_report(kind, report):
+    os.makedirs(results_folder, exist_ok=True)
+    path = os.path.join(results_folder, f"{kind}_{report['label']}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Saved {path}")
+
+
+def load_report(kind, label):
+    with open(os.path.join(results_folder, f"{kind}_{label}.json")) as f:
+        return json.load(f)
+
+
+def compare(kind, section, before_label, after_label, columns):
+    """Print `columns` of every entry in `section` side by side for two saved runs."""
+    before, after = load_report(kind, before_label), load_report(kind, after_label)
+    print(f"{before_label} ({before.get('commit')}) -> {after_label} ({after.get('commit')})")
+    print(f"{'':28}" + "".join(f"{column:>26}" for column in columns))
+    for name, b in before[section].items():
+        a = after[section].get(name)
+        if a is None:
+            print(f"{name:28} (missing in {after_label})")
+            continue
+        cells = []
+        for column in columns:
+            old, new = b.get(column), a.get(column)
+            numbers = isinstance(old, (int, float)) and isinstance(new, (int, float))
+            change = f" ({(new - old) / old:+.0%})" if numbers and old else ""
+            cells.append(f"{f'{old} -> {new}{change}':>26}")
+        print(f"{name:28}" + "".join(cells))
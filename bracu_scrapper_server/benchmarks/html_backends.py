@@ -0,0 +1,96 @@
+"""
+Parse time and peak memory of each HTML backend in scrappers/html_parse.py, on the bundled fixture pages.
+
+    python benchmarks/html_backends.py --label main
+    python benchmarks/html_backends.py --compare main my-branch
+
+Every page is parsed the way its scraper does it, for the selectors the
+scraper reads, then the text of every match is extracted. `full` is the
+old way, the whole page in BeautifulSoup's html.parser, and every backend's
+text is checked against it. Peak memory is measured with tracemalloc: it
+counts what goes through Python's allocator, the BeautifulSoup trees and
+Lexbor's per-document arena (about 1 MiB whatever the page size), but not
+libxml2's buffers under lxml. Install the optional backends with
+`pip install lxml selectolax`. Each run is saved to
+benchmarks/results/html_<label>.json.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+root_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root_folder, "scrappers"))
+
+from bs4 import BeautifulSoup
+
+from html_parse import available_backends, parse_html
+from harness import compare, new_report, save_report, summarize_ms
+
+# === CONFIG ===
+fixtures_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# page -> the selectors its scraper passes to parse_html
+PAGES = {
+    "announcement.html": ["div.block-content.content", "span.date-display-single"],
+    "news.html": ["div.block-content.content", "span.date-display-single"],
+    "person.html": ["div.block-content.content"],
+    "transport.html": ["div.columns.medium-6.small-12", "div.block-content.content"],
+}
+
+
+def extract(page, selectors):
+    return [[element.get_text(separator="\n", strip=True) for element in page.select(selector)]
+            for selector in selectors]
+
+
+def run_once(backend, markup, selectors):
+    if backend == "full":
+        page = BeautifulSoup(markup, "html.parser")
+    else:
+        page = parse_html(markup, *selectors, backend=backend)
+    return extract(page, selectors)
+
+
+def measure(backend, markup, selectors, iterations):
+    times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        run_once(backend, markup, selectors)
+        times.append((time.perf_counter() - start) * 1000)
+    result = summarize_ms(times)
+
+    tracemalloc.start()
+    run_once(backend, markup, selectors)
+    result["peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    tracemalloc.stop()
+    return result
+
+
+def run(label, iterations):
+    backends = ["full"] + available_backends()
+    report = new_report(label, iterations=iterations, backends=backends, pages={})
+    for name, selectors in PAGES.items():
+        with open(os.path.join(fixtures_folder, name), encoding="utf-8") as f:
+            markup = f.read()
+        expected = run_once("full", markup, selectors)
+        for backend in backends:
+            r = measure(backend, markup, selectors, iterations)
+            r["same_text"] = run_once(backend, markup, selectors) == expected
+            report["pages"][f"{name} {backend}"] = r
+            print(f"{name:18} {backend:12} p50={r['p50_ms']} ms  p95={r['p95_ms']} ms  "
+                  f"peak={r['peak_kib']} KiB  same_text={r['same_text']}")
+    save_report("html", report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--label", default="current", help="Name for this run, e.g. the branch")
+    parser.add_argument("--iterations", type=int, default=200, help="Parses per page and backend")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two saved runs")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare("html", "pages", *args.compare, ["p50_ms", "p95_ms", "peak_kib"])
+        sys.exit()
+    run(args.label, args.iterations)
@@ -0,0 +1,213 @@
+"""
+Time the parse stages of the scrapers on bundled fixtures, without network or database.
+
+    python benchmarks/ingest.py --label main
+    python benchmarks/ingest.py --pdf-pages 200 --workers 8
+    python benchmarks/ingest.py --pdfs "scrappers/exam schedule pdfs"    # real PDFs instead of generated ones
+    python benchmarks/ingest.py --compare main my-branch
+
+html: the parse functions of the announcement, news and people scrapers on
+      the pages in benchmarks/fixtures/, timed per page
+pdf:  parse_exam_pages on one exam schedule PDF in this process (per page),
+      then pdf_ingest.ingest over several copies on its process pool (per file)
+
+The exam schedule PDFs are generated (a ruled table like the registrar's),
+so every checkout benchmarks the same input. Each run is saved to
+benchmarks/results/ingest_<label>.json.
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+root_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root_folder, "scrappers"))
+
+from db_scrape_announcements import parse_announcement
+from db_scrape_general_exam_schedule import parse_exam_pages
+from db_scrape_news import parse_news_page
+from db_scrape_people_info import parse_person
+from pdf_ingest import ingest
+
+from harness import compare, new_report, save_report, summarize_ms
+
+# === CONFIG ===
+fixtures_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+ROWS_PER_PAGE = 28
+PDF_COLUMNS = ["Course Code", "Section", "Date", "Start Time", "End Time", "Room", "Dept"]
+
+
+class FixtureResponse:
+    """The parts of a requests.Response the parse functions read."""
+
+    def __init__(self, url, path):
+        with open(path, "rb") as f:
+            self.content = f.read()
+        self.text = self.content.decode()
+        self.url = url
+        self.status_code = 200
+
+
+def html_cases():
+    """(name, call) for every HTML fixture, call() parses it once."""
+    announcement_url = "https://www.bracu.ac.bd/news-archive/announcements/final-exam-schedule-fall-2024"
+    news_url = "https://www.bracu.ac.bd/news/research-symposium"
+    person_url = "https://www.bracu.ac.bd/about/people/jane-doe"
+    announcement = FixtureResponse(announcement_url, os.path.join(fixtures_folder, "announcement.html"))
+    news = FixtureResponse(news_url, os.path.join(fixtures_folder, "news.html"))
+    person = FixtureResponse(person_url, os.path.join(fixtures_folder, "person.html"))
+    return [
+        ("announcement", lambda: parse_announcement(announcement_url, announcement, {announcement_url: "Final Exam Schedule"})),
+        ("news", lambda: parse_news_page(news_url, news, {news_url: "Research symposium"})),
+        ("person", lambda: parse_person(person_url, person)),
+    ]
+
+
+def pdf_text(x, y, value):
+    value = value.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return f"BT /F1 8 Tf {x:.1f} {y:.1f} Td ({value}) Tj ET"
+
+
+def exam_table_page(rows):
+    """Content stream of one landscape page: a ruled table, header row first."""
+    width, left, top, row_height = 110, 36, 560, 18
+    ops = ["0.5 w"]
+    for r, row in enumerate([PDF_COLUMNS] + rows):
+        y = top - (r + 1) * row_height
+        for c, value in enumerate(row):
+            x = left + c * width
+            ops.append(f"{x} {y} {width} {row_height} re S")
+            ops.append(pdf_text(x + 4, y + 5, value))
+    return "\n".join(ops).encode()
+
+
+def write_exam_pdf(path, pages):
+    """A minimal PDF of `pages` exam schedule pages, pdfplumber finds the tables from the ruling lines."""
+    courses = [f"{dept}{n}" for dept in ("CSE", "EEE", "MAT", "PHY", "BUS") for n in range(101, 480, 17)]
+    streams = []
+    for _ in range(pages):
+        rows = []
+        for _ in range(ROWS_PER_PAGE):
+            start = random.choice([8, 11, 14])
+            course = random.choice(courses)
+            rows.append([course, f"{random.randint(1, 20):02}", f"{random.randint(1, 28):02}-Dec-2024",
+                         f"{start:02}:00 AM" if start < 12 else f"{start - 12:02}:00 PM",
+                         f"{start + 2 - 12 if start + 2 > 12 else start + 2:02}:00 {'PM' if start + 2 >= 12 else 'AM'}",
+                         f"{random.randint(1, 12)}{random.randint(1, 30):02}", course[:3]])
+        streams.append(exam_table_page(rows))
+
+    # objects: 1 catalog, 2 pages, 3 font, then a page and its content stream per page
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for stream in streams:
+        page_id, content_id = len(objects) + 1, len(objects) + 2
+        kids.append(f"{page_id} 0 R")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 842 595] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>".encode())
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def time_html(iterations):
+    results = {}
+    for name, call in html_cases():
+        times = []
+        # the scrapers print progress while parsing, keep it out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(iterations):
+                start = time.perf_counter()
+                call()
+                times.append((time.perf_counter() - start) * 1000)
+        results[name] = summarize_ms(times)
+        print(f"html {name:14} p50={results[name]['p50_ms']} ms  p95={results[name]['p95_ms']} ms")
+    return results
+
+
+def time_pdf(folder, pdf_pages, copies, workers):
+    files = []
+    if folder:
+        for root, _, names in os.walk(folder):
+            files += [(os.path.join(root, name), os.path.basename(root)) for name in names if name.lower().endswith(".pdf")]
+    else:
+        tmp = tempfile.mkdtemp(prefix="bench_pdfs_")
+        for i in range(copies):
+            path = os.path.join(tmp, f"final-{i}.pdf")
+            write_exam_pdf(path, pdf_pages)
+            files.append((path, "Final Fall 2024"))
+    if not files:
+        sys.exit(f"No PDFs in {folder}")
+
+    results = {}
+    try:
+        # one file in this process, what a single worker does per task
+        path, exam_type = files[0]
+        start = time.perf_counter()
+        rows = parse_exam_pages(path, exam_type, None)
+        elapsed = time.perf_counter() - start
+        results["parse_one_file"] = {"file": os.path.basename(path), "rows": len(rows),
+                                     "total_ms": round(elapsed * 1000, 1),
+                                     "rows_per_sec": round(len(rows) / elapsed) if elapsed else None}
+
+        # the whole pipeline: page ranges on the process pool, rows handed back to store()
+        stored_rows = []
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            stored, skipped = ingest(files, parse_exam_pages, lambda pdf_path, context, rows: stored_rows.append(len(rows)),
+                                     workers=workers)
+        elapsed = time.perf_counter() - start
+        results["ingest"] = {"files": len(files), "stored": stored, "skipped": skipped, "workers": workers,
+                             "rows": sum(stored_rows), "total_ms": round(elapsed * 1000, 1),
+                             "rows_per_sec": round(sum(stored_rows) / elapsed) if elapsed else None}
+    finally:
+        if not folder:
+            shutil.rmtree(tmp)
+
+    for name, r in results.items():
+        print(f"pdf  {name:14} {r['rows']} rows in {r['total_ms']} ms ({r['rows_per_sec']} rows/sec)")
+    return results
+
+
+def run(label, iterations, folder, pdf_pages, copies, workers):
+    report = new_report(label, html_iterations=iterations, pdf_pages=pdf_pages, pdf_copies=copies,
+                        pdf_folder=folder, workers=workers)
+    report["html"] = time_html(iterations)
+    report["pdf"] = time_pdf(folder, pdf_pages, copies, workers)
+    save_report("ingest", report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--label", default="current", help="Name for this run, e.g. the branch")
+    parser.add_argument("--iterations", type=int, default=200, help="Parses per HTML fixture")
+    parser.add_argument("--pdfs", help="Folder of real exam schedule PDFs to use instead of generated ones")
+    parser.add_argument("--pdf-pages", type=int, default=40, help="Pages per generated PDF")
+    parser.add_argument("--pdf-copies", type=int, default=8, help="Generated PDFs fed to the process pool")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two saved runs")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare("ingest", "html", *args.compare, ["p50_ms", "p95_ms"])
+        compare("ingest", "pdf", *args.compare, ["total_ms", "rows_per_sec"])
+        sys.exit()
+    random.seed(args.seed)
+    run(args.label, args.iterations, args.pdfs, args.pdf_pages, args.pdf_copies, args.workers)
@@ -0,0 +1,166 @@
+"""
+Drive every api.py route at a fixed concurrency and report latency percentiles and throughput.
+
+    python benchmarks/seed.py --create                          # once, see seed.py
+    uvicorn api:app --workers 4                                 # with db.py pointed at the bench database
+    python benchmarks/load_test.py --label main --concurrency 32
+    python benchmarks/load_test.py --compare main my-branch
+
+Request parameters (exam types, courses, student ids, dates, search words)
+are sampled from the database, so most requests differ and the response
+cache sees a realistic mix of misses and hits. Routes run one after the
+other, each with `--requests` requests spread over `--concurrency` threads
+that keep their connection open. Each run is saved to
+benchmarks/results/load_<label>.json together with the commit it ran on.
+"""
+import argparse
+import http.client
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import quote, urlencode, urlparse
+
+import mysql.connector
+
+from harness import compare, new_report, save_report, summarize_ms
+from seed import BENCH_DATABASE, db_config
+
+# === CONFIG ===
+BASE_URL = "http://localhost:8000"
+SAMPLES_PER_ROUTE = 200     # distinct parameter sets per route
+TIMEOUT = 30
+
+
+def sample_rows(cursor, sql, count=SAMPLES_PER_ROUTE):
+    cursor.execute(sql + f" ORDER BY RAND() LIMIT {count}")
+    return cursor.fetchall() or [{}]
+
+
+def route_paths(database):
+    """{route: [path?query, ...]} for every read endpoint, with parameters taken from the data."""
+    conn = mysql.connector.connect(**db_config, database=database)
+    cursor = conn.cursor(dictionary=True)
+    exams = sample_rows(cursor, "SELECT DISTINCT type, course_code, section FROM ExamSchedule WHERE student_id = 'N/A'")
+    students = sample_rows(cursor, "SELECT DISTINCT student_id, term FROM StudentExams")
+    days = [row["day"] for row in sample_rows(cursor, "SELECT DATE(published_date) AS day FROM Announcements")]
+    titles = [row["title"] for row in sample_rows(cursor, "SELECT title FROM News")]
+    people = [row["about"].split("\n", 1)[0] for row in sample_rows(cursor, "SELECT about FROM People") if row.get("about")]
+    routes = [row["route_no"] for row in sample_rows(cursor, "SELECT DISTINCT route_no FROM Transport")]
+    cursor.close()
+    conn.close()
+
+    words = ["exam", "schedule", "scholarship", "seminar", "admission", "convocation", "research workshop"]
+
+    def path(route, **params):
+        params = {name: value for name, value in params.items() if value is not None}
+        return route + ("?" + urlencode(params) if params else "")
+
+    def date_range(day):
+        return {"start_date": str(day), "end_date": str(day + timedelta(days=30))}
+
+    return {
+        "/announcements": [path("/announcements", page_size=20)]
+                          + [path("/announcements", **date_range(day)) for day in days if day],
+        "/exam-schedule": [path("/exam-schedule", exam_type=e.get("type"), course_code=e.get("course_code"),
+                                section=random.choice([None, e.get("section")])) for e in exams],
+        "/students/{student_id}/exams": [path(f"/students/{quote(s['student_id'])}/exams", term=s.get("term"))
+                                         for s in students if s.get("student_id")],
+        "/academic-dates": [path("/academic-dates", **date_range(day)) for day in days if day],
+        "/news": [path("/news", page_size=20)] + [path("/news", title=title) for title in titles],
+        "/transport": [path("/transport")] + [path("/transport", route_id=route) for route in routes if route],
+        "/contact-info": [path("/contact-info")],
+        "/people": [path("/people", page_size=50)] + [path("/people", name=name) for name in people],
+        "/search": [path("/search", q=word) for word in words],
+        "/sync": [path("/sync", tables=name) for name in ("announcements", "news", "academic_dates")],
+        "/bootstrap": [path("/bootstrap")],
+    }
+
+
+class Client:
+    """One keep-alive connection per thread."""
+
+    def __init__(self, base_url, headers):
+        url = urlparse(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.headers = headers
+        self._local = threading.local()
+
+    def connection(self):
+        if not hasattr(self._local, "conn"):
+            self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=TIMEOUT)
+        return self._local.conn
+
+    def get(self, path):
+        """(milliseconds, status, body bytes), status 0 when the request failed."""
+        start = time.perf_counter()
+        try:
+            conn = self.connection()
+            conn.request("GET", path, headers=self.headers)
+            response = conn.getresponse()
+            size = len(response.read())
+            return (time.perf_counter() - start) * 1000, response.status, size
+        except (OSError, http.client.HTTPException):
+            self.connection().close()
+            del self._local.conn
+            return (time.perf_counter() - start) * 1000, 0, 0
+
+
+def run_route(client, paths, requests, concurrency):
+    batch = [paths[i % len(paths)] for i in range(requests)]
+    random.shuffle(batch)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(client.get, batch))
+    elapsed = time.perf_counter() - start
+
+    ok = [r for r in results if 200 <= r[1] < 400]
+    summary = summarize_ms([ms for ms, _, _ in ok])
+    summary.update({
+        "errors": len(results) - len(ok),
+        "throughput_rps": round(len(results) / elapsed, 1),
+        "avg_bytes": round(sum(size for _, _, size in ok) / len(ok)) if ok else 0,
+    })
+    return summary
+
+
+def run(label, base_url, database, requests, concurrency, warmup, encoding, only):
+    paths = route_paths(database)
+    headers = {"Accept-Encoding": encoding} if encoding else {}
+    client = Client(base_url, headers)
+    report = new_report(label, base_url=base_url, database=database, requests=requests,
+                        concurrency=concurrency, warmup=warmup, accept_encoding=encoding, routes={})
+
+    for route, urls in paths.items():
+        if only and route not in only:
+            continue
+        if warmup:
+            run_route(client, urls, warmup, concurrency)
+        r = report["routes"][route] = run_route(client, urls, requests, concurrency)
+        print(f"{route:30} p50={r.get('p50_ms')} ms  p95={r.get('p95_ms')} ms  p99={r.get('p99_ms')} ms  "
+              f"{r['throughput_rps']} req/s  errors={r['errors']}  {r['avg_bytes']} B")
+
+    save_report("load", report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--label", default="current", help="Name for this run, e.g. the branch")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--database", default=BENCH_DATABASE, help="Where request parameters are sampled from")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=100, help="Untimed requests per route first, 0 to measure cold")
+    parser.add_argument("--encoding", default="gzip, br", help="Accept-Encoding to send, '' for none")
+    parser.add_argument("--route", action="append", help="Only this route (repeatable), e.g. /news")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two saved runs")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare("load", "routes", *args.compare, ["p50_ms", "p95_ms", "p99_ms", "throughput_rps"])
+        sys.exit()
+    random.seed(args.seed)
+    run(args.label, args.base_url, args.database, args.requests, args.concurrency, args.warmup, args.encoding, args.route)
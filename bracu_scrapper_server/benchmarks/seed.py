@@ -0,0 +1,189 @@
+"""
+Fill a benchmark database with generated rows shaped like the scraped data.
+
+    python benchmarks/seed.py --create                  # new database from schema.sql, then seed
+    python benchmarks/seed.py --exam-rows 100000        # smaller run into an existing database
+    python benchmarks/seed.py --scale 0.1               # every table at a tenth of the defaults
+
+Point db.py's DB_NAME (and the scrapers' db_config) at BENCH_DATABASE to run
+the API and benchmarks/load_test.py against it. The same --seed always
+produces the same rows, so runs on different commits see the same data.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import mysql.connector
+
+root_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_folder)
+sys.path.insert(0, os.path.join(root_folder, "scrappers"))
+
+from migrate import split_statements
+from bulk_writer import BulkWriter
+from student_exams import rebuild_student_exams
+from table_versions import bump_table_version
+
+# === CONFIG ===
+BENCH_DATABASE = "bracu_info_bench"   # never the real database, --create drops it
+db_config = {
+    "host": "localhost",
+    "user": "root",
+    "password": "",  # your MySQL password
+}
+schema_file = os.path.join(root_folder, "schema.sql")
+SEED_BATCH = 5000   # rows per multi-row INSERT
+
+# Default volumes, roughly a few years of the real site with every term's PDFs ingested
+VOLUMES = {
+    "exam_rows": 1_000_000,
+    "people": 50_000,
+    "announcements": 20_000,
+    "news": 10_000,
+    "academic_dates": 2_000,
+    "transport_routes": 40,
+    "contacts": 300,
+}
+
+DEPARTMENTS = ["CSE", "EEE", "MAT", "PHY", "ENG", "BUS", "ECO", "ARC", "PHR", "LAW", "MNS", "ESS"]
+SEMESTERS = ["Spring", "Summer", "Fall"]
+WORDS = ("BRAC University students faculty department course program research semester exam "
+         "registration notice schedule campus seminar workshop admission result class section "
+         "library scholarship convocation lecture laboratory project thesis advising").split()
+
+
+def text(words):
+    return " ".join(random.choice(WORDS) for _ in range(words))
+
+
+def terms(years):
+    return [f"{kind} {semester} {year}" for year in years for semester in SEMESTERS for kind in ("Mid", "Final")]
+
+
+def exam_rows(count):
+    """Most rows are per course and section ("N/A" student), a tenth are per student like the special exams."""
+    exam_types = terms(range(2021, 2026))
+    courses = [f"{dept}{number}" for dept in DEPARTMENTS for number in random.sample(range(100, 500), 35)]
+    students = [f"{year}{dept_no:03}{n:03}" for year in range(20, 25) for dept_no in range(1, 13) for n in range(1, 120, 7)]
+    for _ in range(count):
+        exam_type = random.choice(exam_types)
+        course = random.choice(courses)
+        start = random.choice([9, 11, 14, 16])
+        exam_date = date(int(exam_type[-4:]), random.randint(1, 12), random.randint(1, 28))
+        per_student = random.random() < 0.1
+        yield (exam_type, course, f"{random.randint(1, 25):02}", exam_date,
+               f"{start:02}:00:00", f"{start + 2:02}:00:00", f"{random.randint(1, 12)}{random.randint(1, 30):02}",
+               course[:3], random.choice(students) if per_student else "N/A",
+               f"{exam_type}/{'special' if per_student else course[:3].lower()}.pdf")
+
+
+def people_rows(count):
+    for i in range(count):
+        yield (f"https://www.bracu.ac.bd/about/people/person-{i}", f"https://www.bracu.ac.bd/sites/default/files/p/{i}.jpg",
+               f"Person {i}\n{random.choice(['Lecturer', 'Assistant Professor', 'Professor'])}, "
+               f"{random.choice(DEPARTMENTS)}\nperson{i}@bracu.ac.bd\n{text(random.randint(60, 400))}")
+
+
+def dated(count, days=5 * 365):
+    start = datetime(2021, 1, 1)
+    return [start + timedelta(minutes=random.randint(0, days * 24 * 60)) for _ in range(count)]
+
+
+def announcement_rows(count):
+    for i, published in enumerate(dated(count)):
+        yield (f"Notice {i}: {text(6)}", f"https://www.bracu.ac.bd/news-archive/announcements/notice-{i}",
+               text(random.randint(40, 300)), published)
+
+
+def news_rows(count):
+    for i, published in enumerate(dated(count)):
+        images = [f"https://www.bracu.ac.bd/sites/default/files/news/{i}-{n}.jpg" for n in range(random.randint(0, 6))]
+        yield (f"News {i}: {text(8)}", f"https://www.bracu.ac.bd/news/news-{i}",
+               text(random.randint(100, 600)), json.dumps(images), published)
+
+
+def academic_date_rows(count):
+    events = ["Classes begin", "Mid-term examinations", "Final examinations", "Advising", "Semester break", "Holiday"]
+    for i, start in enumerate(dated(count)):
+        semester = ["Spring", "Summer", "Fall"][(start.month - 1) // 4]
+        yield (f"{random.choice(events)} {i}", start.date(), (start + timedelta(days=random.randint(0, 10))).date(),
+               f"{semester} {start.year}")
+
+
+def transport_rows(routes):
+    for route_no in range(1, routes + 1):
+        for stop in range(random.randint(5, 15)):
+            pickup = 6 * 60 + stop * 7
+            yield (f"Route-{route_no:02}: Stop {route_no} to Merul Badda", route_no, f"Stoppage {route_no}-{stop}",
+                   f"{pickup // 60:02}:{pickup % 60:02}:00", None, "17:30:00", None, "+8801700000000")
+
+
+def contact_rows(count):
+    for i in range(count):
+        yield (f"Office {i}", json.dumps([f"office{i}@bracu.ac.bd"]), "Sunday-Thursday 9:00 AM - 5:00 PM",
+               json.dumps([f"+88096389{i:05}"]))
+
+
+TABLES = [
+    ("ExamSchedule", ["type", "course_code", "section", "date", "start_time", "end_time", "room_no", "dept",
+                      "student_id", "source_file"], "exam_rows", exam_rows),
+    ("People", ["url", "image_url", "about"], "people", people_rows),
+    ("Announcements", ["title", "url", "message", "published_date"], "announcements", announcement_rows),
+    ("News", ["title", "url", "message", "image_url", "published_date"], "news", news_rows),
+    ("AcademicDates", ["event_name", "start_date", "end_date", "semester"], "academic_dates", academic_date_rows),
+    ("Transport", ["route_name", "route_no", "stoppage", "first_pickup_time", "second_pickup_time",
+                   "first_dropoff_time", "second_dropoff_time", "phone_no"], "transport_routes", transport_rows),
+    ("ContactInfo", ["name", "emails", "hours", "phone_no"], "contacts", contact_rows),
+]
+
+
+def create_database():
+    conn = mysql.connector.connect(**db_config)
+    cursor = conn.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS {BENCH_DATABASE}")
+    cursor.execute(f"CREATE DATABASE {BENCH_DATABASE}")
+    cursor.execute(f"USE {BENCH_DATABASE}")
+    with open(schema_file) as f:
+        for statement in split_statements(f.read()):
+            # schema.sql creates and selects bracu_info itself
+            if not statement.upper().startswith(("CREATE DATABASE", "USE ")):
+                cursor.execute(statement)
+    conn.commit()
+    cursor.close()
+    conn.close()
+    print(f"Created {BENCH_DATABASE} from {schema_file}")
+
+
+def seed(volumes):
+    conn = mysql.connector.connect(**db_config, database=BENCH_DATABASE)
+    for table, columns, volume, generate in TABLES:
+        start = time.perf_counter()
+        with BulkWriter(conn, table, columns, replace_all=True, batch_size=SEED_BATCH) as writer:
+            for row in generate(volumes[volume]):
+                writer.add(row)
+        print(f"  {table}: {writer.rows} rows in {time.perf_counter() - start:.1f}s")
+        bump_table_version(conn, table)
+
+    rebuild_student_exams(conn)
+    conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--create", action="store_true", help=f"Drop and recreate {BENCH_DATABASE} from schema.sql first")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every default volume")
+    parser.add_argument("--seed", type=int, default=1)
+    for name, default in VOLUMES.items():
+        parser.add_argument("--" + name.replace("_", "-"), type=int, help=f"Default {default}")
+    args = parser.parse_args()
+
+    volumes = {name: getattr(args, name) or max(1, int(default * args.scale)) for name, default in VOLUMES.items()}
+    random.seed(args.seed)
+    if args.create:
+        create_database()
+    print(f"Seeding {BENCH_DATABASE}: {volumes}")
+    seed(volumes)
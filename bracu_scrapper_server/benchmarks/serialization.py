@@ -0,0 +1,116 @@
+"""
+Time the old and new response serialization on /transport and /news shaped rows.
+
+    python benchmarks/serialization.py
+    python benchmarks/serialization.py --rows 5000 --label big
+
+old: per-row format_time / json.loads fixups, then jsonable_encoder and the
+     stdlib encoder (what FastAPI did with a returned list of dicts)
+new: TIME columns already strings (TIME_FORMAT in the SQL), parse_json_columns
+     and serialize.dumps
+
+No database needed, rows are generated. Each run is saved to
+benchmarks/results/serialization_<label>.json.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+
+from serialize import dumps, format_time, orjson, parse_json_columns
+
+# === CONFIG ===
+results_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+TIME_COLUMNS = ["first_pickup_time", "second_pickup_time", "first_dropoff_time", "second_dropoff_time"]
+
+
+def transport_rows(count, formatted=False):
+    def t():
+        value = timedelta(hours=random.randint(6, 20), minutes=random.choice([0, 15, 30, 45]))
+        return format_time(value) if formatted else value
+    return [{"route_id": i, "route_name": f"Route-{i % 30:02}: Uttara to Merul Badda", "route_no": i % 30,
+             "stoppage": f"Stoppage {i}", **{c: t() for c in TIME_COLUMNS}, "phone_no": "+8801700000000"}
+            for i in range(count)]
+
+
+def news_rows(count):
+    return [{"id": i, "title": f"News {i}", "url": f"https://www.bracu.ac.bd/news/{i}",
+             "message": "BRAC University " * 60,
+             "image_url": json.dumps([f"https://www.bracu.ac.bd/img/{i}-{n}.jpg" for n in range(3)]),
+             "published_date": datetime(2024, 1, 1) + timedelta(days=i % 365)}
+            for i in range(count)]
+
+
+def old_transport(rows):
+    for r in rows:
+        for c in TIME_COLUMNS:
+            if r[c] is not None:
+                r[c] = format_time(r[c])
+    return json.dumps(jsonable_encoder(rows)).encode()
+
+
+def old_news(rows):
+    for item in rows:
+        if item.get("image_url"):
+            try:
+                item["image_url"] = json.loads(item["image_url"])
+            except Exception:
+                item["image_url"] = None
+    return json.dumps(jsonable_encoder(rows)).encode()
+
+
+def new_transport(rows):
+    return dumps(rows)
+
+
+def new_news(rows):
+    return dumps(parse_json_columns(rows, "image_url"))
+
+
+def best_of(func, make_rows, repeat):
+    times = []
+    for _ in range(repeat):
+        rows = make_rows()   # fixups mutate the rows, every run gets fresh ones
+        start = time.perf_counter()
+        body = func(rows)
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), len(body)
+
+
+def run(label, count, repeat):
+    random.seed(1)
+    transport = transport_rows(count)
+    random.seed(1)
+    transport_formatted = transport_rows(count, formatted=True)
+    news = news_rows(count)
+    report = {"label": label, "rows": count, "orjson": orjson is not None, "endpoints": {}}
+
+    for name, old_rows, new_rows, old, new in [("transport", transport, transport_formatted, old_transport, new_transport),
+                                               ("news", news, news, old_news, new_news)]:
+        old_ms, old_bytes = best_of(old, lambda: [dict(r) for r in old_rows], repeat)
+        new_ms, new_bytes = best_of(new, lambda: [dict(r) for r in new_rows], repeat)
+        report["endpoints"][name] = {"old_ms": round(old_ms, 3), "new_ms": round(new_ms, 3),
+                                     "speedup": round(old_ms / new_ms, 2), "old_bytes": old_bytes, "new_bytes": new_bytes}
+        print(f"{name:10} old={old_ms:8.2f} ms  new={new_ms:8.2f} ms  {old_ms / new_ms:5.1f}x  ({count} rows)")
+
+    os.makedirs(results_folder, exist_ok=True)
+    path = os.path.join(results_folder, f"serialization_{label}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--label", default="current", help="Name for this run")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    run(args.label, args.rows, args.repeat)
@@ -0,0 +1,131 @@
+import asyncio
+import calendar
+import logging
+import time
+from datetime import date
+
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+
+from cache import etag_for, make_key, not_modified
+from db import fetch_all
+from negotiation import COMPRESS_MIN_BYTES, ENCODINGS, MEDIA_TYPES, choose_encoding, choose_media_type, compress, etag_with_encoding
+from serialize import JSON_MEDIA_TYPE, encode, parse_json_columns
+
+
+# === CONFIG ===
+BOOTSTRAP_TABLES = ("Announcements", "News", "AcademicDates", "Transport")
+BOOTSTRAP_ANNOUNCEMENTS = 10     # latest announcements, same as /announcements without filters
+BOOTSTRAP_ACADEMIC_DATES = 20    # upcoming (or still running) academic events
+BOOTSTRAP_MAX_AGE = 300
+
+logger = logging.getLogger(__name__)
+
+
+def bundle_queries(today, transport_columns):
+    """{section: (sql, params)} for everything the app shows on first paint."""
+    first_day = today.replace(day=1)
+    last_day = today.replace(day=calendar.monthrange(today.year, today.month)[1])
+    return {
+        "announcements": ("SELECT * FROM Announcements ORDER BY published_date DESC LIMIT :limit",
+                          {"limit": BOOTSTRAP_ANNOUNCEMENTS}),
+        # headlines only, the full message is fetched from /news when one is opened
+        "news": ("SELECT id, title, url, image_url, published_date FROM News"
+                 " WHERE published_date >= :first_day AND published_date < :next_day ORDER BY published_date DESC",
+                 {"first_day": str(first_day), "next_day": str(date.fromordinal(last_day.toordinal() + 1))}),
+        "academic_dates": ("SELECT * FROM AcademicDates WHERE end_date >= :today ORDER BY start_date ASC LIMIT :limit",
+                           {"today": str(today), "limit": BOOTSTRAP_ACADEMIC_DATES}),
+        "transport": (f"SELECT {transport_columns} FROM Transport ORDER BY route_id ASC", {}),
+    }
+
+
+class Bundle:
+    """One built bundle: every media type and encoding of it, encoded and compressed up front."""
+
+    def __init__(self, key, value):
+        self.key = key
+        self.built_at = time.time()
+        self.bodies = {}
+        self.etags = {}
+        for media_type in MEDIA_TYPES:
+            body = encode(value, media_type)
+            self.bodies[media_type, None] = body
+            self.etags[media_type] = etag_for(key if media_type == JSON_MEDIA_TYPE else f"{key}|{media_type}")
+            if len(body) >= COMPRESS_MIN_BYTES:
+                for encoding in ENCODINGS:
+                    self.bodies[media_type, encoding] = compress(body, encoding)
+
+    def respond(self, request, max_age):
+        """The prebuilt body the client negotiated, or a 304 when its copy still matches."""
+        media_type = choose_media_type(request.headers.get("accept"))
+        etag = self.etags[media_type]
+        headers = {"Cache-Control": f"public, max-age={max_age}", "Vary": "Accept, Accept-Encoding", "ETag": etag}
+        if not_modified(request, etag, None):
+            return Response(status_code=304, headers=headers)
+
+        body = self.bodies[media_type, None]
+        encoding = choose_encoding(request.headers.get("accept-encoding"), len(body))
+        if encoding is not None:
+            body = self.bodies[media_type, encoding]
+            headers["Content-Encoding"] = encoding
+            headers["ETag"] = etag_with_encoding(etag, encoding)
+        return Response(body, media_type=media_type, headers=headers)
+
+
+class BootstrapHolder:
+    """Keeps the /bootstrap bundle in memory and rebuilds it when one of its tables moves.
+
+    The scrapers bump TableVersions when a run finishes; `refresh_forever`
+    polls it on the response cache's schedule and rebuilds right away, so
+    requests are answered from the prebuilt bytes. The bundle also depends
+    on the date (this month's news, upcoming events), so it is rebuilt when
+    the day changes too.
+    """
+
+    def __init__(self, response_cache, transport_columns):
+        self.response_cache = response_cache
+        self.transport_columns = transport_columns
+        self.bundle = None
+        self.builds = 0
+        self._lock = asyncio.Lock()
+
+    def current_key(self):
+        return make_key("bootstrap", self.response_cache.version_of(BOOTSTRAP_TABLES), {"day": date.today()})
+
+    def current(self):
+        """The bundle if it is fresh, else None (await refresh())."""
+        bundle = self.bundle
+        if bundle is not None and bundle.key == self.current_key():
+            return bundle
+        return None
+
+    async def build(self, key):
+        start = time.perf_counter()
+        queries = bundle_queries(date.today(), self.transport_columns)
+        results = await asyncio.gather(*(fetch_all(sql, params) for sql, params in queries.values()))
+        value = {"version": etag_for(key).strip('"'), **dict(zip(queries, results))}
+        parse_json_columns(value["news"], "image_url")
+        bundle = await run_in_threadpool(Bundle, key, value)
+        self.builds += 1
+        print(f"Bootstrap bundle {key}: {len(bundle.bodies[JSON_MEDIA_TYPE, None]) / 1024:.0f} KiB, "
+              f"built in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return bundle
+
+    async def refresh(self):
+        """Rebuild if the tables or the date moved since the last build, one build at a time."""
+        if self.response_cache.versions_stale():
+            await run_in_threadpool(self.response_cache.table_versions)
+        async with self._lock:
+            key = self.current_key()
+            if self.bundle is None or self.bundle.key != key:
+                self.bundle = await self.build(key)
+            return self.bundle
+
+    async def refresh_forever(self, interval):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                # database down, keep serving the last bundle and try again next round
+                logger.warning("Could not rebuild the bootstrap bundle: %s", e)
+            await asyncio.sleep(interval)
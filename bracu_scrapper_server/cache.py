@@ -0,0 +1,360 @@
+import hashlib
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from functools import wraps
+
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from metrics import timed
+from negotiation import choose_encoding, choose_media_type, compress, etag_with_encoding, strip_encoding
+from serialize import JSON_MEDIA_TYPE, encode
+
+
+# === CONFIG ===
+CACHE_MAX_ENTRIES = 1024      # entries kept in the in-process LRU
+CACHE_TTL_SECONDS = 300       # scrapers bump TableVersions, so this is only a safety net
+VERSION_POLL_SECONDS = 5      # how often TableVersions is re-read
+SHARED_CACHE = None           # None, "memory" (local stand-in) or "redis://localhost:6379/0" to share between workers
+DEFAULT_MAX_AGE = 60          # Cache-Control max-age for endpoints that do not pass their own
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """In-process LRU with a per-entry TTL."""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._data)
+
+
+class MemoryBackend:
+    """Local stand-in for the shared backend, same interface as RedisBackend."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, raw = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            return raw
+
+    def set(self, key, raw, ttl):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, raw)
+
+
+class RedisBackend:
+    """Shared backend so several uvicorn workers reuse each other's entries."""
+
+    def __init__(self, url, prefix="bracu_api:"):
+        import redis  # optional dependency, only needed when SHARED_CACHE is a redis url
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, raw, ttl):
+        self.client.setex(self.prefix + key, ttl, raw)
+
+
+def make_key(endpoint, version, params, period=None):
+    """Build a cache key from the endpoint, the table version and the query params.
+
+    Empty values are dropped (the handlers ignore them too) and the rest are
+    sorted, so `?a=1&b=2` and `?b=2&a=1&c=` end up on the same entry.
+    `period` is the first day of the default date window, for endpoints
+    that fall back to the current month or year.
+    """
+    normalized = []
+    for name in sorted(params):
+        value = params[name]
+        if value is None or value == "":
+            continue
+        normalized.append(f"{name}={value}")
+    key = f"{endpoint}|v{version}|" + "&".join(normalized)
+    if period is not None:
+        key += f"|{period.isoformat()}"
+    return key
+
+
+def etag_for(key):
+    """The cache key already changes with the table version and the params, so its hash is the ETag."""
+    return '"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+
+
+def not_modified(request, etag, last_modified):
+    """True if the client's If-None-Match (or, without it, If-Modified-Since) still matches."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # a proxy may have handed out a weak W/"..." copy, and compressed copies carry a suffix
+        tags = [strip_encoding(tag.strip().removeprefix("W/")) for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def with_request_parameter(wrapper, func):
+    """Add a Request parameter to the signature FastAPI reads, without the handler having to declare it."""
+    signature = inspect.signature(func)
+    request = inspect.Parameter("_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+    wrapper.__signature__ = signature.replace(parameters=[*signature.parameters.values(), request])
+    return wrapper
+
+
+class ResponseCache:
+    """Two tier cache (local LRU, then optional shared backend) for endpoint results.
+
+    Every entry is keyed on the version of the table it was read from. The
+    scrapers bump `TableVersions` when they finish writing a table, so the next
+    request after a scrape builds a new key and old entries simply age out.
+    Entries are the serialized bodies (JSON, or MessagePack when the client
+    asks for it), so a hit is sent without re-encoding and the shared backend
+    stores them as they are. Compressed copies are kept in a local LRU of
+    their own, so a body is gzipped or brotli'd once per version too.
+    """
+
+    def __init__(self, engine, shared=None, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS):
+        self.engine = engine
+        self.local = LRUCache(max_entries, ttl)
+        self.compressed = LRUCache(max_entries, ttl)
+        self.shared = shared
+        self.ttl = ttl
+        self._versions = {}
+        self._updated_at = {}
+        self._versions_read_at = 0.0
+        self._versions_lock = threading.Lock()
+        self.counters = {"local_hits": 0, "shared_hits": 0, "misses": 0, "not_modified": 0}
+        self._counters_lock = threading.Lock()   # sync handlers run on the threadpool
+
+    def versions_stale(self):
+        return time.monotonic() - self._versions_read_at >= VERSION_POLL_SECONDS
+
+    def table_versions(self):
+        if not self.versions_stale():
+            return self._versions
+        with self._versions_lock:
+            if not self.versions_stale():
+                return self._versions
+            try:
+                with self.engine.connect() as conn:
+                    result = conn.execute(text(
+                        "SELECT table_name, version, UNIX_TIMESTAMP(updated_at) AS updated_at FROM TableVersions"))
+                    rows = result.fetchall()
+                    self._versions = {row.table_name: row.version for row in rows}
+                    self._updated_at = {row.table_name: int(row.updated_at) for row in rows if row.updated_at}
+            except Exception as e:
+                # Table missing on an old database, fall back to TTL only
+                logger.warning("Could not read TableVersions: %s", e)
+            self._versions_read_at = time.monotonic()
+        return self._versions
+
+    def count(self, name):
+        with self._counters_lock:
+            self.counters[name] += 1
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            self.count("local_hits")
+            return value
+
+        if self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value)
+                self.count("shared_hits")
+                return value
+
+        self.count("misses")
+        return None
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value, self.ttl)
+
+    def version_of(self, table_names):
+        return ".".join(str(self._versions.get(name, 0)) for name in table_names)
+
+    def last_modified(self, table_names, period=None):
+        """Newest update of `table_names`, or the start of `period` when that is later. None if one is unknown."""
+        updated = [self._updated_at.get(name) for name in table_names]
+        if not all(updated):
+            return None
+        if period is not None:
+            updated.append(time.mktime(period.timetuple()))
+        return int(max(updated))
+
+    def validators(self, table_names, key, max_age, period=None):
+        """ETag, Last-Modified and Cache-Control for a response built from `table_names`.
+
+        Without a version for every table (old database, unreadable
+        TableVersions) only Cache-Control is sent, since nothing would
+        change the ETag when the data does.
+        """
+        headers = {"Cache-Control": f"public, max-age={max_age}", "Vary": "Accept, Accept-Encoding"}
+        if all(name in self._versions for name in table_names):
+            headers["ETag"] = etag_for(key)
+            last_modified = self.last_modified(table_names, period)
+            if last_modified is not None:
+                headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+        return headers
+
+    def respond(self, request, key, table_names, max_age, period=None):
+        """(headers, 304 response or None), checked before the cache or the handler is touched."""
+        headers = self.validators(table_names, key, max_age, period)
+        if "ETag" in headers:
+            last_modified = self.last_modified(table_names, period)
+            if not_modified(request, headers["ETag"], last_modified):
+                self.count("not_modified")
+                return headers, Response(status_code=304, headers=headers)
+        return headers, None
+
+    def request_key(self, request, endpoint, table_names, params, period=None):
+        """(cache key, media type), MessagePack bodies are cached apart from the JSON ones."""
+        media_type = choose_media_type(request.headers.get("accept"))
+        key = make_key(endpoint, self.version_of(table_names), params, period)
+        if media_type != JSON_MEDIA_TYPE:
+            key += "|" + media_type
+        return key, media_type
+
+    def send(self, request, key, body, headers, media_type):
+        """Response for `body`, compressed when the client accepts it and it is worth it."""
+        encoding = choose_encoding(request.headers.get("accept-encoding"), len(body))
+        if encoding is not None:
+            compressed = self.compressed.get((key, encoding))
+            if compressed is None:
+                with timed("serialize"):
+                    compressed = compress(body, encoding)
+                self.compressed.set((key, encoding), compressed)
+            body = compressed
+            headers = {**headers, "Content-Encoding": encoding}
+            if "ETag" in headers:
+                headers["ETag"] = etag_with_encoding(headers["ETag"], encoding)
+        return Response(body, media_type=media_type, headers=headers)
+
+    def cached(self, *table_names, max_age=DEFAULT_MAX_AGE, period=None):
+        """Decorator for a read endpoint whose result only depends on `table_names`.
+
+        Responses carry ETag / Last-Modified from the tables' versions and a
+        conditional request that still matches gets a 304 without running
+        the handler. `max_age` sets Cache-Control for the resource. The body
+        is JSON or MessagePack depending on `Accept` and is gzip / brotli
+        compressed depending on `Accept-Encoding`. For a handler that
+        defaults to the current month or year, `period()` returns the first
+        day of that window, so the key and validators change when it rolls over.
+        """
+        def decorator(func):
+            endpoint = func.__name__
+
+            if inspect.iscoroutinefunction(func):
+                @wraps(func)
+                async def async_wrapper(_request, **params):
+                    # Polling TableVersions blocks, keep it off the event loop
+                    if self.versions_stale():
+                        await run_in_threadpool(self.table_versions)
+                    window = period() if period is not None else None
+                    key, media_type = self.request_key(_request, endpoint, table_names, params, window)
+                    headers, not_modified_response = self.respond(_request, key, table_names, max_age, window)
+                    if not_modified_response is not None:
+                        return not_modified_response
+                    body = self.get(key)
+                    if body is None:
+                        value = await func(**params)
+                        with timed("serialize"):
+                            body = encode(value, media_type)
+                        self.set(key, body)
+                    return self.send(_request, key, body, headers, media_type)
+                return with_request_parameter(async_wrapper, func)
+
+            @wraps(func)
+            def wrapper(_request, **params):
+                self.table_versions()
+                window = period() if period is not None else None
+                key, media_type = self.request_key(_request, endpoint, table_names, params, window)
+                headers, not_modified_response = self.respond(_request, key, table_names, max_age, window)
+                if not_modified_response is not None:
+                    return not_modified_response
+                body = self.get(key)
+                if body is None:
+                    value = func(**params)
+                    with timed("serialize"):
+                        body = encode(value, media_type)
+                    self.set(key, body)
+                return self.send(_request, key, body, headers, media_type)
+            return with_request_parameter(wrapper, func)
+        return decorator
+
+    def stats(self):
+        with self._counters_lock:
+            counters = dict(self.counters)
+        lookups = counters["local_hits"] + counters["shared_hits"] + counters["misses"]
+        hits = counters["local_hits"] + counters["shared_hits"]
+        return {
+            **counters,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "local_entries": len(self.local),
+            "compressed_entries": len(self.compressed),
+            "local_evictions": self.local.evictions,
+            "local_expirations": self.local.expirations,
+            "shared_backend": type(self.shared).__name__ if self.shared is not None else None,
+            "table_versions": dict(self._versions),
+        }
+
+
+def make_shared_backend():
+    if not SHARED_CACHE:
+        return None
+    if SHARED_CACHE == "memory":
+        return MemoryBackend()
+    return RedisBackend(SHARED_CACHE)
@@ -0,0 +1,170 @@
+from sqlalchemy import create_engine, text
+import logging
+import threading
+import time
+
+import anyio
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import pymysql
+except ImportError:   # optional, exports then buffer each result in mysqlconnector
+    pymysql = None
+
+from metrics import Gauge, pool_checkout_seconds, registry, timed
+
+
+# Database config
+DB_USER = "root"
+DB_PASSWORD = ""
+DB_HOST = "localhost"
+DB_NAME = "bracu_info"
+
+# "sync" runs every query on the blocking engine inside the threadpool,
+# "async" uses SQLAlchemy's async extension so handlers never hold a worker
+# thread while MySQL works. Switch and compare under load.
+DB_MODE = "sync"
+
+SYNC_DRIVER = "mysql+mysqlconnector"   # or "mysql+pymysql"
+ASYNC_DRIVER = "mysql+aiomysql"        # or "mysql+asyncmy", needs `pip install aiomysql` / `asyncmy`
+
+# Pool settings, shared by both engines
+DB_POOL_SIZE = 10
+DB_MAX_OVERFLOW = 20
+DB_POOL_PRE_PING = True
+DB_POOL_RECYCLE = 1800   # seconds, keep below MySQL's wait_timeout
+
+# Rows fetched per round trip by stream_rows. Only pymysql / aiomysql / asyncmy
+# give SQLAlchemy a server-side cursor, with mysqlconnector the driver still
+# buffers the whole result, so in sync mode exports get their own pymysql engine.
+STREAM_BATCH = 1000
+STREAM_DRIVER = "mysql+pymysql"
+STREAM_POOL_SIZE = 2   # exports are rare, the overflow still covers bursts
+
+logger = logging.getLogger(__name__)
+
+
+def database_url(driver):
+    return f"{driver}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+
+
+def pool_options():
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+# The sync engine always exists, the response cache polls TableVersions with it
+engine = create_engine(database_url(SYNC_DRIVER), echo=False, **pool_options())
+
+async_engine = None
+if DB_MODE == "async":
+    from sqlalchemy.ext.asyncio import create_async_engine
+    async_engine = create_async_engine(database_url(ASYNC_DRIVER), echo=False, **pool_options())
+elif DB_MODE != "sync":
+    raise ValueError(f"Unknown DB_MODE {DB_MODE!r}, expected 'sync' or 'async'")
+
+# Engine stream_rows_sync reads from, SQLAlchemy gives pymysql an SSCursor for stream_results
+stream_engine = engine
+if async_engine is None and SYNC_DRIVER != STREAM_DRIVER:
+    if pymysql is not None:
+        stream_engine = create_engine(database_url(STREAM_DRIVER), echo=False,
+                                      **{**pool_options(), "pool_size": STREAM_POOL_SIZE})
+    else:
+        logger.warning("pymysql is not installed, /export buffers whole tables in %s", SYNC_DRIVER)
+
+
+def rows_as_dicts(result):
+    """One zip per row, cheaper than building each row's `_mapping` view."""
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+def fetch_all_sync(sql, params=None):
+    with timed("db"):
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            pool_checkout_seconds.observe("sync", value=time.perf_counter() - start)
+            return rows_as_dicts(conn.execute(text(sql), params or {}))
+
+
+async def fetch_all(sql, params=None):
+    """Run a SELECT and return its rows as dicts, on whichever engine DB_MODE picked."""
+    if async_engine is None:
+        return await run_in_threadpool(fetch_all_sync, sql, params)
+
+    with timed("db"):
+        start = time.perf_counter()
+        async with async_engine.connect() as conn:
+            pool_checkout_seconds.observe("async", value=time.perf_counter() - start)
+            return rows_as_dicts(await conn.execute(text(sql), params or {}))
+
+
+def stream_rows_sync(sql, params=None, batch_size=STREAM_BATCH):
+    """Yield lists of up to `batch_size` row dicts, the connection is held until the generator ends or is closed."""
+    with stream_engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(text(sql), params or {})
+        keys = list(result.keys())
+        for partition in result.partitions(batch_size):
+            yield [dict(zip(keys, row)) for row in partition]
+
+
+async def stream_rows(sql, params=None, batch_size=STREAM_BATCH):
+    """Async version of stream_rows_sync, for StreamingResponse bodies of any size."""
+    if async_engine is None:
+        batches = stream_rows_sync(sql, params, batch_size)
+        # a cancelled request can leave a next() running in its thread, close() waits for it
+        lock = threading.Lock()
+
+        def next_batch():
+            with lock:
+                return next(batches, None)
+
+        def close():
+            with lock:
+                batches.close()
+
+        try:
+            while (rows := await run_in_threadpool(next_batch)) is not None:
+                yield rows
+        finally:
+            # a client that disconnects mid-export must not hold the connection until GC. Closing
+            # reads out the rest of the server-side cursor, so off the event loop and not cancelled
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(close)
+        return
+
+    async with async_engine.connect() as conn:
+        result = await conn.stream(text(sql), params or {})
+        keys = list(result.keys())
+        async for partition in result.partitions(batch_size):
+            yield [dict(zip(keys, row)) for row in partition]
+
+
+POOL_GAUGES = {
+    "size": Gauge("db_pool_size", "Connections the pool keeps open", ["engine"]),
+    "checkedout": Gauge("db_pool_checked_out", "Connections in use", ["engine"]),
+    "overflow": Gauge("db_pool_overflow", "Connections open beyond the pool size (negative while below it)", ["engine"]),
+}
+
+
+@registry.collector
+def pool_metrics():
+    pools = {"sync": engine.pool}
+    if stream_engine is not engine:
+        pools["stream"] = stream_engine.pool
+    if async_engine is not None:
+        pools["async"] = async_engine.pool
+    for method, gauge in POOL_GAUGES.items():
+        yield gauge, [((name,), getattr(pool, method)()) for name, pool in pools.items() if hasattr(pool, method)]
+
+
+async def dispose():
+    if async_engine is not None:
+        await async_engine.dispose()
+    if stream_engine is not engine:
+        stream_engine.dispose()
+    engine.dispose()
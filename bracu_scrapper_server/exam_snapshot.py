@@ -0,0 +1,140 @@
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:   # optional, /exam-schedule falls back to SQL
+    np = None
+
+from db import fetch_all_sync
+
+
+# === CONFIG ===
+EXAM_SNAPSHOT = True         # serve /exam-schedule from memory, needs `pip install numpy`
+SNAPSHOT_MAX_AGE = 3600      # seconds, rebuild anyway in case TableVersions cannot be read
+
+COLUMNS = ["id", "type", "course_code", "section", "date", "start_time", "end_time",
+           "room_no", "dept", "student_id", "source_file"]
+# Filterable columns, stored as int32 codes into a per-column dictionary
+ENCODED = ["type", "course_code", "section", "student_id"]
+
+
+def snapshot_enabled():
+    return EXAM_SNAPSHOT and np is not None
+
+
+def collation_key(value):
+    """Sort key close to MySQL's case-insensitive collation: NULL first, then ignoring case."""
+    if value is None:
+        return (False, "", "")
+    return (True, value.casefold(), value)
+
+
+class Column:
+    """Dictionary-encoded string column: `codes[i]` indexes `values`."""
+
+    def __init__(self, raw):
+        self.values = sorted(set(raw), key=collation_key)
+        lookup = {v: code for code, v in enumerate(self.values)}
+        self.codes = np.fromiter((lookup[v] for v in raw), dtype=np.int32, count=len(raw))
+        # `col = 'cse110'` matches CSE110 in MySQL, so lookups ignore case too
+        self.folded = {}
+        for code, v in enumerate(self.values):
+            if v is not None:
+                self.folded.setdefault(v.casefold(), []).append(code)
+
+    def codes_of(self, value):
+        """Codes of every value equal to `value` when case is ignored, [] when there is none."""
+        return self.folded.get(value.casefold(), [])
+
+
+class ExamSnapshot:
+    """Read-only columnar copy of ExamSchedule.
+
+    Filters become `codes == code` masks over int32 arrays. Because the
+    dictionaries are sorted case-insensitively like MySQL sorts, a column's
+    codes also sort like its values, which is how results are put in
+    section order. Columns that are only
+    returned stay as plain object arrays.
+    """
+
+    def __init__(self, rows, version):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.size = len(rows)
+        self.encoded = {name: Column([r[name] for r in rows]) for name in ENCODED}
+        self.plain = {}
+        for name in COLUMNS:
+            if name not in self.encoded:
+                column = np.empty(self.size, dtype=object)
+                column[:] = [r[name] for r in rows]
+                self.plain[name] = column
+
+    @classmethod
+    def load(cls, version):
+        start = time.perf_counter()
+        rows = fetch_all_sync(f"SELECT {', '.join(COLUMNS)} FROM ExamSchedule")
+        snapshot = cls(rows, version)
+        print(f"ExamSchedule snapshot v{version}: {snapshot.size} rows, {snapshot.nbytes() / 1024:.0f} KiB "
+              f"of codes, built in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return snapshot
+
+    def nbytes(self):
+        return sum(column.codes.nbytes for column in self.encoded.values())
+
+    def filter(self, **filters):
+        """Rows whose columns equal every non-empty filter, ordered by section like the SQL path."""
+        mask = np.ones(self.size, dtype=bool)
+        for name, value in filters.items():
+            if not value:
+                continue
+            codes = self.encoded[name].codes_of(value)
+            if not codes:
+                return []
+            mask &= np.isin(self.encoded[name].codes, codes)
+
+        indexes = np.flatnonzero(mask)
+        order = np.argsort(self.encoded["section"].codes[indexes], kind="stable")
+        return [self.row(i) for i in indexes[order]]
+
+    def row(self, i):
+        row = {}
+        for name in COLUMNS:
+            if name in self.encoded:
+                column = self.encoded[name]
+                row[name] = column.values[column.codes[i]]
+            else:
+                row[name] = self.plain[name][i]
+        return row
+
+
+class SnapshotHolder:
+    """Keeps the current snapshot and swaps in a new one when ExamSchedule's version moves.
+
+    The swap is one reference assignment, so a request either sees the old
+    snapshot or the new one. Requests that notice the new version wait for
+    the rebuild instead of answering from stale data, which the response
+    cache would then store under the new version.
+    """
+
+    def __init__(self):
+        self.snapshot = None
+        self._lock = threading.Lock()
+
+    def current(self, version):
+        """The snapshot if it is fresh for `version`, else None (call get() off the event loop)."""
+        snapshot = self.snapshot
+        if (snapshot is not None and snapshot.version == version
+                and time.monotonic() - snapshot.loaded_at < SNAPSHOT_MAX_AGE):
+            return snapshot
+        return None
+
+    def get(self, version):
+        snapshot = self.current(version)
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            snapshot = self.current(version)
+            if snapshot is None:
+                snapshot = self.snapshot = ExamSnapshot.load(version)
+            return snapshot
@@ -0,0 +1,81 @@
+import csv
+import io
+from datetime import datetime, timedelta
+
+from serialize import dumps, format_time, parse_json_columns
+
+
+# === CONFIG ===
+# name in the url -> table, sort key, JSON text columns, and how `since` selects rows:
+# by the row's updated_at, or for ExamSchedule by when its PDF was (re)ingested
+EXPORT_TABLES = {
+    "announcements": {"table": "Announcements", "key": "id", "since": "updated_at"},
+    "news": {"table": "News", "key": "id", "json": ["image_url"], "since": "updated_at"},
+    "academic_dates": {"table": "AcademicDates", "key": "id", "since": "updated_at"},
+    "exam_schedule": {"table": "ExamSchedule", "key": "id", "since": "pdf_manifest"},
+    "transport": {"table": "Transport", "key": "route_id"},
+    "contact_info": {"table": "ContactInfo", "key": "id", "json": ["emails", "phone_no"]},
+    "people": {"table": "People", "key": "id"},
+}
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def parse_since(since):
+    try:
+        return datetime.fromisoformat(since)
+    except ValueError:
+        raise ValueError("since must be an ISO date or datetime, e.g. 2025-01-31 or 2025-01-31T08:00:00")
+
+
+def export_query(name, since=None):
+    """(sql, params) for every row of an export, or the rows changed after `since`.
+
+    Rows come out in a stable order: by updated_at when filtering on it, so
+    the last row's updated_at is the client's next watermark, else by key.
+    Deletions are not part of an export, /sync reports those.
+    """
+    export = EXPORT_TABLES.get(name)
+    if export is None:
+        raise LookupError(f"Unknown table {name}, expected one of: {', '.join(EXPORT_TABLES)}")
+
+    sql = f"SELECT * FROM {export['table']}"
+    if since is None:
+        return sql + f" ORDER BY {export['key']}", {}
+
+    params = {"since": parse_since(since)}
+    if export.get("since") == "updated_at":
+        return sql + f" WHERE updated_at > :since ORDER BY updated_at, {export['key']}", params
+    if export.get("since") == "pdf_manifest":
+        return (sql + " WHERE source_file IN (SELECT source_file FROM PdfManifest WHERE ingested_at > :since)"
+                f" ORDER BY {export['key']}", params)
+    raise ValueError(f"{name} has no change tracking, export it without since")
+
+
+async def ndjson_chunks(batches, json_columns=()):
+    """One JSON object per line, one chunk per batch of rows."""
+    async for rows in batches:
+        parse_json_columns(rows, *json_columns)
+        yield b"".join(dumps(row) + b"\n" for row in rows)
+
+
+def _csv_value(value):
+    if isinstance(value, timedelta):
+        return format_time(value)
+    return value
+
+
+async def csv_chunks(batches):
+    """Header from the first batch's columns, JSON columns stay as their JSON text."""
+    buffer = io.StringIO()
+    writer = None
+    async for rows in batches:
+        if writer is None:
+            if not rows:
+                continue
+            writer = csv.writer(buffer)
+            writer.writerow(rows[0].keys())
+        for row in rows:
+            writer.writerow([_csv_value(value) for value in row.values()])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
@@ -0,0 +1,246 @@
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+
+# === CONFIG ===
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)   # seconds
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)           # bytes
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels_text(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def lines(self):
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_labels_text(self.label_names, labels)} {_number(value)}"
+                for labels, value in sorted(values.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *labels, value):
+        with self._lock:
+            self._values[labels] = value
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    """Cumulative buckets plus _sum and _count, per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, *labels, value):
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            counts, _, _ = entry
+            counts[bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def lines(self):
+        with self._lock:
+            values = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._values.items()}
+        names = self.label_names + ("le",)
+        lines = []
+        for labels, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_labels_text(names, labels + (_number(bound),))} {cumulative}")
+            base = _labels_text(self.label_names, labels)
+            lines.append(f"{self.name}_sum{base} {_number(total)}")
+            lines.append(f"{self.name}_count{base} {count}")
+        return lines
+
+
+class Registry:
+    """Metrics of this process in the Prometheus text format.
+
+    Collectors are functions called on every scrape that return extra
+    (metric, samples) pairs, for values read on demand such as the pool.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def collector(self, func):
+        self.collectors.append(func)
+        return func
+
+    def render(self, extra=()):
+        lines = []
+        for metric in self.metrics:
+            lines += metric.header() + metric.lines()
+        for collect in [*self.collectors, lambda: extra]:
+            for metric, samples in collect():
+                lines += metric.header()
+                for labels, value in samples:
+                    lines.append(f"{metric.name}{_labels_text(metric.label_names, labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+requests_total = registry.counter("api_requests_total", "Requests handled", ["route", "method", "status"])
+requests_in_flight = registry.gauge("api_requests_in_flight", "Requests being handled right now")
+request_seconds = registry.histogram("api_request_duration_seconds", "Time to the last body byte", ["route"])
+response_bytes = registry.histogram("api_response_size_bytes", "Response body size as sent (after compression)",
+                                    ["route"], buckets=SIZE_BUCKETS)
+request_db_seconds = registry.histogram("api_request_db_seconds", "Time spent in database queries per request", ["route"])
+request_serialize_seconds = registry.histogram("api_request_serialize_seconds",
+                                               "Time spent encoding and compressing the body per request", ["route"])
+pool_checkout_seconds = registry.histogram("db_pool_checkout_seconds", "Wait for a pooled connection", ["engine"])
+
+
+# Per request {"db": seconds, "serialize": seconds}. Starlette's threadpool
+# copies the context, so queries run off the event loop add to the same dict.
+request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def timed(kind):
+    """Add the block's duration to the current request's `kind` time."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = request_timings.get()
+        if timings is not None:
+            timings[kind] = timings.get(kind, 0.0) + time.perf_counter() - start
+
+
+def route_of(scope, status):
+    """The route template (/students/{student_id}/exams), not the path, so labels stay few."""
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    return "unmatched" if status == 404 else "other"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, size, status, in-flight and DB / serialization time per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        timings = {"db": 0.0, "serialize": 0.0}
+        token = request_timings.set(timings)
+        response = {"status": 500, "bytes": 0}
+
+        async def send_and_measure(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            requests_in_flight.dec()
+            request_timings.reset(token)
+            route = route_of(scope, response["status"])
+            requests_total.inc(route, scope["method"], str(response["status"]))
+            request_seconds.observe(route, value=time.perf_counter() - start)
+            response_bytes.observe(route, value=response["bytes"])
+            request_db_seconds.observe(route, value=timings["db"])
+            request_serialize_seconds.observe(route, value=timings["serialize"])
+
+
+SCRAPER_RUN_METRICS = {
+    "runs": Counter("scraper_runs_total", "Scheduled runs per job", ["job"]),
+    "failures": Counter("scraper_failures_total", "Failed runs per job", ["job"]),
+    "last_duration_sec": Gauge("scraper_last_duration_seconds", "Duration of the last run", ["job"]),
+    "last_finished": Gauge("scraper_last_finished_timestamp_seconds", "When the last run finished", ["job"]),
+}
+SCRAPER_TOTALS = {
+    "pages_fetched": Counter("scraper_pages_fetched_total", "Pages and files downloaded", ["job"]),
+    "bytes_fetched": Counter("scraper_bytes_fetched_total", "Bytes downloaded", ["job"]),
+    "parse_seconds": Counter("scraper_parse_seconds_total", "Time spent parsing HTML and PDFs", ["job"]),
+    "rows_written": Counter("scraper_rows_written_total", "Rows written per table", ["job", "table"]),
+}
+
+
+def scraper_metrics(runs, totals):
+    """(metric, samples) pairs from the ScraperRuns and ScraperMetrics rows the scheduler writes."""
+    samples = {metric: [] for metric in [*SCRAPER_RUN_METRICS.values(), *SCRAPER_TOTALS.values()]}
+    for row in runs:
+        for column, metric in SCRAPER_RUN_METRICS.items():
+            if row[column] is not None:
+                samples[metric].append(((row["job_name"],), row[column]))
+    for row in totals:
+        metric = SCRAPER_TOTALS.get(row["metric"])
+        if metric is None:
+            continue
+        labels = (row["job_name"], row["table_name"]) if "table" in metric.label_names else (row["job_name"],)
+        samples[metric].append((labels, row["value"]))
+    return [(metric, values) for metric, values in samples.items() if values]
@@ -0,0 +1,61 @@
+import os
+import re
+import mysql.connector
+
+# === CONFIG ===
+db_config = {
+    "host": "localhost",
+    "user": "root",
+    "password": "",  # your MySQL password
+    "database": "bracu_info"
+}
+migrations_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+
+def split_statements(sql):
+    """Split a migration file on ';', dropping comments and blank statements."""
+    sql = re.sub(r"--[^\n]*", "", sql)
+    return [stmt.strip() for stmt in sql.split(";") if stmt.strip()]
+
+
+def pending_migrations(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS SchemaMigrations (
+            version VARCHAR(255) PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT version FROM SchemaMigrations")
+    applied = {row[0] for row in cursor.fetchall()}
+
+    files = sorted(f for f in os.listdir(migrations_folder) if f.endswith(".sql"))
+    return [f for f in files if f not in applied]
+
+
+def migrate():
+    conn = mysql.connector.connect(**db_config)
+    cursor = conn.cursor()
+
+    pending = pending_migrations(cursor)
+    if not pending:
+        print("Database is up to date.")
+
+    for filename in pending:
+        print(f"Applying {filename}...")
+        with open(os.path.join(migrations_folder, filename)) as f:
+            statements = split_statements(f.read())
+
+        # MySQL commits DDL implicitly, so a failed file has to be fixed by hand
+        # before re-running; it is only recorded once every statement succeeded.
+        for stmt in statements:
+            cursor.execute(stmt)
+        cursor.execute("INSERT INTO SchemaMigrations (version) VALUES (%s)", (filename,))
+        conn.commit()
+        print(f"Applied {filename}")
+
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    migrate()
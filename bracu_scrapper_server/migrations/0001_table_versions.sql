@@ -0,0 +1,6 @@
+-- Per-table version counter bumped by the scrapers, the API response cache keys on it
+CREATE TABLE IF NOT EXISTS TableVersions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
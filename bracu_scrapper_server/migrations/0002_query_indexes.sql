@@ -0,0 +1,17 @@
+-- Indexes matching the WHERE / ORDER BY clauses api.py issues
+
+-- /exam-schedule: type = ? AND course_code = ? [AND section = ?] [AND student_id = ?] ORDER BY section
+CREATE INDEX idx_exam_type_course_section ON ExamSchedule (type, course_code, section, student_id);
+
+-- /announcements: published_date range, ORDER BY published_date DESC, id DESC (keyset pages)
+CREATE INDEX idx_announcements_published ON Announcements (published_date, id);
+
+-- /news: published_date range / exact date, ORDER BY published_date, id (keyset pages)
+CREATE INDEX idx_news_published ON News (published_date, id);
+
+-- /news?title=
+CREATE INDEX idx_news_title ON News (title);
+
+-- /academic-dates: start_date range or exact, end_date exact
+CREATE INDEX idx_academic_dates_start ON AcademicDates (start_date);
+CREATE INDEX idx_academic_dates_end ON AcademicDates (end_date);
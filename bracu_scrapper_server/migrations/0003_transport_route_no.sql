@@ -0,0 +1,11 @@
+-- /transport?route_id= used to run route_name LIKE '%Route-NN%', a full scan.
+-- Store the route number on its own so the lookup is an index seek.
+ALTER TABLE Transport ADD COLUMN route_no INT NULL AFTER route_name;
+
+-- Backfill from names like "Route-01: Mirpur to BRACU"
+UPDATE Transport
+SET route_no = CAST(TRIM(SUBSTRING_INDEX(SUBSTRING_INDEX(route_name, 'Route-', -1), ':', 1)) AS UNSIGNED)
+WHERE route_name LIKE '%Route-%'
+  AND TRIM(SUBSTRING_INDEX(SUBSTRING_INDEX(route_name, 'Route-', -1), ':', 1)) REGEXP '^[0-9]+$';
+
+CREATE INDEX idx_transport_route_no ON Transport (route_no);
@@ -0,0 +1,4 @@
+-- Inverted indexes for /search, replaces LIKE '%...%' full scans
+CREATE FULLTEXT INDEX ft_announcements_text ON Announcements (title, message);
+CREATE FULLTEXT INDEX ft_news_text ON News (title, message);
+CREATE FULLTEXT INDEX ft_people_about ON People (about);
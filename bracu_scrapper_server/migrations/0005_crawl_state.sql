@@ -0,0 +1,17 @@
+-- Validators and content hash of every page the scrapers parsed, for incremental crawls
+CREATE TABLE IF NOT EXISTS CrawlState (
+    url VARCHAR(500) PRIMARY KEY,
+    etag VARCHAR(255),
+    last_modified VARCHAR(64),
+    content_hash CHAR(64),
+    last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_changed TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- News had no natural key, so every crawl inserted every article again
+ALTER TABLE News ADD COLUMN url VARCHAR(500) NULL AFTER title;
+ALTER TABLE News ADD UNIQUE INDEX uq_news_url (url);
+
+-- Rows from before this have no url, the unique index would let the next crawl store them all
+-- a second time. CrawlState starts empty, so that crawl walks the whole archive and puts them back.
+DELETE FROM News WHERE url IS NULL;
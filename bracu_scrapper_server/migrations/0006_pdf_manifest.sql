@@ -0,0 +1,19 @@
+-- Which PDF each ExamSchedule row came from, so a changed file replaces only its own rows
+ALTER TABLE ExamSchedule ADD COLUMN source_file VARCHAR(500) NULL;
+CREATE INDEX idx_exam_source_file ON ExamSchedule (source_file);
+
+-- Rows ingested before this have no source_file, so no ingest would ever replace them and
+-- the next one would store every PDF a second time. PdfManifest starts empty below, so
+-- that next ingest parses every PDF again and puts these rows back, tagged.
+DELETE FROM ExamSchedule WHERE source_file IS NULL;
+
+-- One row per ingested PDF, unchanged files are skipped on the next run
+CREATE TABLE IF NOT EXISTS PdfManifest (
+    source_file VARCHAR(500) PRIMARY KEY,
+    sha256 CHAR(64) NOT NULL,
+    size BIGINT NOT NULL,
+    mtime DOUBLE NOT NULL,
+    parser_version VARCHAR(32) NOT NULL,
+    row_count INT NOT NULL,
+    ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
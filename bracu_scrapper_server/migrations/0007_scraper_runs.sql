@@ -0,0 +1,11 @@
+-- Last run of every scheduled scraper job, so the scheduler keeps its cadence across restarts
+CREATE TABLE IF NOT EXISTS ScraperRuns (
+    job_name VARCHAR(64) PRIMARY KEY,
+    last_started DATETIME,
+    last_finished DATETIME,
+    last_status VARCHAR(16),
+    last_duration_sec DOUBLE,
+    last_error TEXT,
+    runs INT NOT NULL DEFAULT 0,
+    failures INT NOT NULL DEFAULT 0
+);
@@ -0,0 +1,20 @@
+-- One row per (student, exam), rebuilt from ExamSchedule after every PDF ingest,
+-- so a student's whole timetable for a term is one index range
+CREATE TABLE IF NOT EXISTS StudentExams (
+    student_id VARCHAR(50) NOT NULL,
+    term VARCHAR(100) NOT NULL,
+    course_code VARCHAR(50) NOT NULL,
+    section VARCHAR(50),
+    date DATE NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    room_no VARCHAR(50),
+    dept VARCHAR(100),
+    exam_id INT NOT NULL,
+    PRIMARY KEY (student_id, term, date, start_time, exam_id)
+);
+
+INSERT INTO StudentExams (student_id, term, course_code, section, date, start_time, end_time, room_no, dept, exam_id)
+SELECT TRIM(student_id), type, course_code, section, date, start_time, end_time, room_no, dept, id
+FROM ExamSchedule
+WHERE student_id <> 'N/A' AND TRIM(student_id) <> '';
@@ -0,0 +1,31 @@
+-- /sync: every synced table gets a change timestamp the client keeps as its watermark.
+-- ON UPDATE only fires when a value actually changes, so re-scraping an unchanged row is not a delta.
+ALTER TABLE Announcements ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+CREATE INDEX idx_announcements_updated ON Announcements (updated_at, id);
+
+ALTER TABLE News ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+CREATE INDEX idx_news_updated ON News (updated_at, id);
+
+ALTER TABLE AcademicDates ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+CREATE INDEX idx_academic_dates_updated ON AcademicDates (updated_at, id);
+
+-- Deleted rows, so clients can drop them too
+CREATE TABLE IF NOT EXISTS SyncTombstones (
+    table_name VARCHAR(64) NOT NULL,
+    row_id INT NOT NULL,
+    deleted_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+    PRIMARY KEY (table_name, row_id),
+    INDEX idx_tombstones_deleted (table_name, deleted_at, row_id)
+);
+
+CREATE TRIGGER trg_announcements_tombstone AFTER DELETE ON Announcements FOR EACH ROW
+    INSERT INTO SyncTombstones (table_name, row_id) VALUES ('Announcements', OLD.id)
+    ON DUPLICATE KEY UPDATE deleted_at = CURRENT_TIMESTAMP(6);
+
+CREATE TRIGGER trg_news_tombstone AFTER DELETE ON News FOR EACH ROW
+    INSERT INTO SyncTombstones (table_name, row_id) VALUES ('News', OLD.id)
+    ON DUPLICATE KEY UPDATE deleted_at = CURRENT_TIMESTAMP(6);
+
+CREATE TRIGGER trg_academic_dates_tombstone AFTER DELETE ON AcademicDates FOR EACH ROW
+    INSERT INTO SyncTombstones (table_name, row_id) VALUES ('AcademicDates', OLD.id)
+    ON DUPLICATE KEY UPDATE deleted_at = CURRENT_TIMESTAMP(6);
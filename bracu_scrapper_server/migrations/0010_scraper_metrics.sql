@@ -0,0 +1,9 @@
+-- Running totals the scrapers report (pages, bytes, parse time, rows written), served on the API's /metrics
+CREATE TABLE IF NOT EXISTS ScraperMetrics (
+    job_name VARCHAR(64) NOT NULL,
+    metric VARCHAR(64) NOT NULL,
+    table_name VARCHAR(64) NOT NULL DEFAULT '',
+    value DOUBLE NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (job_name, metric, table_name)
+);
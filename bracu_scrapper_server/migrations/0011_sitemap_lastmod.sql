@@ -0,0 +1,2 @@
+-- <lastmod> from the sitemap when a profile was last crawled, so unchanged profiles are not fetched again
+ALTER TABLE CrawlState ADD COLUMN sitemap_lastmod VARCHAR(64) NULL AFTER content_hash;
@@ -0,0 +1,12 @@
+-- Every scraper run inserted every event again. Events are now upserted per term,
+-- keyed on (event_name, start_date, semester).
+ALTER TABLE AcademicDates ADD COLUMN semester VARCHAR(20) NULL AFTER end_date;
+
+-- Keep the oldest copy of each repeated event. Rows from before this migration have no
+-- semester; the scraper deletes each one once it has imported the event with its term.
+DELETE newer FROM AcademicDates newer
+JOIN AcademicDates older
+  ON older.event_name = newer.event_name AND older.start_date = newer.start_date
+ AND older.end_date = newer.end_date AND older.id < newer.id;
+
+ALTER TABLE AcademicDates ADD UNIQUE INDEX uq_academic_dates_event (event_name, start_date, semester);
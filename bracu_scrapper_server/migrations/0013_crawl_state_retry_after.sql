@@ -0,0 +1,2 @@
+-- Pages that came back 404 / 410, not fetched again until this time passes
+ALTER TABLE CrawlState ADD COLUMN retry_after TIMESTAMP NULL AFTER sitemap_lastmod;
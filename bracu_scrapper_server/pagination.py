@@ -0,0 +1,71 @@
+import base64
+import json
+
+from fastapi import HTTPException
+
+
+# === CONFIG ===
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def clamp_page_size(page_size):
+    if not page_size:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def encode_cursor(row, columns):
+    """Opaque token holding the sort key of the last row on a page."""
+    values = {col: row[col] for col in columns}
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, columns):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not isinstance(values, dict) or any(col not in values for col in columns):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def keyset_condition(token, columns, descending):
+    """WHERE fragment that starts right after the row the cursor points at.
+
+    For (published_date, id) descending this gives
+    `(published_date < :p) OR (published_date = :p AND id < :i)`, which MySQL
+    can answer with a range scan instead of skipping OFFSET rows.
+    """
+    return keyset_after(decode_cursor(token, columns), columns, descending)
+
+
+def keyset_after(values, columns, descending=False, prefix="cursor"):
+    """keyset_condition() for values that are already decoded, params are named `<prefix>_<col>`."""
+    op = "<" if descending else ">"
+
+    clauses = []
+    params = {}
+    for i, col in enumerate(columns):
+        params[f"{prefix}_{col}"] = values[col]
+        parts = [f"{prev} = :{prefix}_{prev}" for prev in columns[:i]]
+        parts.append(f"{col} {op} :{prefix}_{col}")
+        clauses.append("(" + " AND ".join(parts) + ")")
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def order_by(columns, descending):
+    direction = "DESC" if descending else "ASC"
+    return " ORDER BY " + ", ".join(f"{col} {direction}" for col in columns)
+
+
+def make_page(rows, page_size, columns):
+    """Rows were fetched with LIMIT page_size + 1, the extra one tells us there is a next page."""
+    has_more = len(rows) > page_size
+    items = rows[:page_size]
+    next_cursor = encode_cursor(items[-1], columns) if has_more else None
+    return {"items": items, "next_cursor": next_cursor}
@@ -9,7 +9,11 @@ CREATE TABLE Announcements (
     title VARCHAR(255) NOT NULL,
     url VARCHAR(500) NOT NULL UNIQUE,
     message TEXT,
-    published_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    published_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX idx_announcements_published (published_date, id),
+    INDEX idx_announcements_updated (updated_at, id),
+    FULLTEXT INDEX ft_announcements_text (title, message)
 );
 
 -- ==============================
@@ -25,7 +29,10 @@ CREATE TABLE ExamSchedule (
     end_time TIME NOT NULL,
     room_no VARCHAR(50),
     dept VARCHAR(100),
-    student_id VARCHAR(50) NOT NULL
+    student_id VARCHAR(50) NOT NULL,
+    source_file VARCHAR(500),
+    INDEX idx_exam_type_course_section (type, course_code, section, student_id),
+    INDEX idx_exam_source_file (source_file)
 );
 
 -- ==============================
@@ -35,7 +42,13 @@ CREATE TABLE AcademicDates (
     id INT AUTO_INCREMENT PRIMARY KEY,
     event_name VARCHAR(255) NOT NULL,
     start_date DATE NOT NULL,
-    end_date DATE NOT NULL
+    end_date DATE NOT NULL,
+    semester VARCHAR(20),
+    updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    UNIQUE INDEX uq_academic_dates_event (event_name, start_date, semester),
+    INDEX idx_academic_dates_start (start_date),
+    INDEX idx_academic_dates_end (end_date),
+    INDEX idx_academic_dates_updated (updated_at, id)
 );
 
 -- ==============================
@@ -44,9 +57,15 @@ CREATE TABLE AcademicDates (
 CREATE TABLE News (
     id INT AUTO_INCREMENT PRIMARY KEY,
     title VARCHAR(255) NOT NULL,
+    url VARCHAR(500) UNIQUE,
     message TEXT,
     image_url JSON,
-    published_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    published_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX idx_news_published (published_date, id),
+    INDEX idx_news_updated (updated_at, id),
+    INDEX idx_news_title (title),
+    FULLTEXT INDEX ft_news_text (title, message)
 );
 
 -- ==============================
@@ -55,12 +74,14 @@ CREATE TABLE News (
 create table Transport (
     route_id int auto_increment primary key,
     route_name varchar(255) not null,
+    route_no int,
     stoppage varchar(255) not null,
     first_pickup_time time,
     second_pickup_time time,
     first_dropoff_time time,
     second_dropoff_time time,
-    phone_no varchar(20)
+    phone_no varchar(20),
+    index idx_transport_route_no (route_no)
 );
 
 -- ==============================
@@ -82,5 +103,143 @@ CREATE TABLE People (
     id INT AUTO_INCREMENT PRIMARY KEY,
     url VARCHAR(500) NOT NULL UNIQUE,
     image_url VARCHAR(500),
-    about TEXT
+    about TEXT,
+    FULLTEXT INDEX ft_people_about (about)
 );
+
+-- ==============================
+-- Table Versions
+-- ==============================
+-- Bumped by the scrapers after they write a table, the API keys its
+-- response cache on these so a finished scrape invalidates old entries.
+CREATE TABLE TableVersions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- ==============================
+-- Crawl State
+-- ==============================
+-- Validators and content hash of every page the scrapers parsed,
+-- so a routine refresh can skip pages that did not change.
+CREATE TABLE CrawlState (
+    url VARCHAR(500) PRIMARY KEY,
+    etag VARCHAR(255),
+    last_modified VARCHAR(64),
+    content_hash CHAR(64),
+    sitemap_lastmod VARCHAR(64),
+    retry_after TIMESTAMP NULL,
+    last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_changed TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ==============================
+-- PDF Manifest
+-- ==============================
+-- One row per ingested exam schedule PDF, unchanged files are skipped
+-- and a changed file replaces only its own ExamSchedule rows.
+CREATE TABLE PdfManifest (
+    source_file VARCHAR(500) PRIMARY KEY,
+    sha256 CHAR(64) NOT NULL,
+    size BIGINT NOT NULL,
+    mtime DOUBLE NOT NULL,
+    parser_version VARCHAR(32) NOT NULL,
+    row_count INT NOT NULL,
+    ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- ==============================
+-- Scraper Runs
+-- ==============================
+-- Last run of every scheduled scraper job (scrappers/scheduler.py)
+CREATE TABLE ScraperRuns (
+    job_name VARCHAR(64) PRIMARY KEY,
+    last_started DATETIME,
+    last_finished DATETIME,
+    last_status VARCHAR(16),
+    last_duration_sec DOUBLE,
+    last_error TEXT,
+    runs INT NOT NULL DEFAULT 0,
+    failures INT NOT NULL DEFAULT 0
+);
+
+-- ==============================
+-- Student Exams
+-- ==============================
+-- Per-student copy of ExamSchedule, rebuilt by the exam ingesters (scrappers/student_exams.py)
+CREATE TABLE StudentExams (
+    student_id VARCHAR(50) NOT NULL,
+    term VARCHAR(100) NOT NULL,
+    course_code VARCHAR(50) NOT NULL,
+    section VARCHAR(50),
+    date DATE NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    room_no VARCHAR(50),
+    dept VARCHAR(100),
+    exam_id INT NOT NULL,
+    PRIMARY KEY (student_id, term, date, start_time, exam_id)
+);
+
+-- ==============================
+-- Sync Tombstones
+-- ==============================
+-- Rows deleted from the tables /sync serves, filled by the triggers below
+CREATE TABLE SyncTombstones (
+    table_name VARCHAR(64) NOT NULL,
+    row_id INT NOT NULL,
+    deleted_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+    PRIMARY KEY (table_name, row_id),
+    INDEX idx_tombstones_deleted (table_name, deleted_at, row_id)
+);
+
+CREATE TRIGGER trg_announcements_tombstone AFTER DELETE ON Announcements FOR EACH ROW
+    INSERT INTO SyncTombstones (table_name, row_id) VALUES ('Announcements', OLD.id)
+    ON DUPLICATE KEY UPDATE deleted_at = CURRENT_TIMESTAMP(6);
+
+CREATE TRIGGER trg_news_tombstone AFTER DELETE ON News FOR EACH ROW
+    INSERT INTO SyncTombstones (table_name, row_id) VALUES ('News', OLD.id)
+    ON DUPLICATE KEY UPDATE deleted_at = CURRENT_TIMESTAMP(6);
+
+CREATE TRIGGER trg_academic_dates_tombstone AFTER DELETE ON AcademicDates FOR EACH ROW
+    INSERT INTO SyncTombstones (table_name, row_id) VALUES ('AcademicDates', OLD.id)
+    ON DUPLICATE KEY UPDATE deleted_at = CURRENT_TIMESTAMP(6);
+
+-- ==============================
+-- Scraper Metrics
+-- ==============================
+-- Running totals reported by the scrapers (scrappers/scrape_metrics.py), served on /metrics
+CREATE TABLE ScraperMetrics (
+    job_name VARCHAR(64) NOT NULL,
+    metric VARCHAR(64) NOT NULL,
+    table_name VARCHAR(64) NOT NULL DEFAULT '',
+    value DOUBLE NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (job_name, metric, table_name)
+);
+
+-- ==============================
+-- Schema Migrations
+-- ==============================
+-- Applied by migrate.py on databases created from an older schema.sql.
+-- This file already contains everything up to the versions below.
+CREATE TABLE SchemaMigrations (
+    version VARCHAR(255) PRIMARY KEY,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO SchemaMigrations (version) VALUES
+    ('0001_table_versions.sql'),
+    ('0002_query_indexes.sql'),
+    ('0003_transport_route_no.sql'),
+    ('0004_fulltext_search.sql'),
+    ('0005_crawl_state.sql'),
+    ('0006_pdf_manifest.sql'),
+    ('0007_scraper_runs.sql'),
+    ('0008_student_exams.sql'),
+    ('0009_sync.sql'),
+    ('0010_scraper_metrics.sql'),
+    ('0011_sitemap_lastmod.sql'),
+    ('0012_academic_dates_semester.sql'),
+    ('0013_crawl_state_retry_after.sql');
@@ -0,0 +1,91 @@
+import time
+
+import scrape_metrics
+
+# === CONFIG ===
+BATCH_SIZE = 500   # rows per executemany, mysql-connector turns it into one multi-row INSERT
+
+
+class BulkWriter:
+    """Buffer rows for one table and write them in batches inside a single transaction.
+
+        with BulkWriter(conn, "Transport", ["route_name", "stoppage"]) as writer:
+            writer.add((route_name, stoppage))
+
+    `update_columns` turns the statement into an upsert
+    (`ON DUPLICATE KEY UPDATE col = VALUES(col)`), `ignore` into `INSERT IGNORE`.
+    `replace_all` deletes the table's rows before the first batch, for sources
+    that are a full snapshot of a page; readers keep seeing the old rows until
+    the commit, and a scrape that found nothing leaves the table alone.
+    `replace_where=("source_file = %s", (path,))` deletes just the matching
+    rows when the block opens, for sources that own a slice of the table.
+    Nothing is committed until the block exits cleanly, an exception rolls
+    the whole source back.
+    """
+
+    def __init__(self, conn, table, columns, update_columns=None, ignore=False,
+                 replace_all=False, replace_where=None, batch_size=BATCH_SIZE):
+        self.conn = conn
+        self.table = table
+        self.columns = columns
+        self.batch_size = batch_size
+        self.replace_all = replace_all
+        self.replace_where = replace_where
+        self.replaced = False
+        self.cursor = None
+        self.buffer = []
+        self.rows = 0
+        self.affected = 0
+        self.started = None
+
+        placeholders = ", ".join(["%s"] * len(columns))
+        verb = "INSERT IGNORE" if ignore else "INSERT"
+        self.sql = f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+        if update_columns:
+            self.sql += " ON DUPLICATE KEY UPDATE " + ", ".join(f"{c} = VALUES({c})" for c in update_columns)
+
+    def __enter__(self):
+        self.cursor = self.conn.cursor()
+        self.started = time.perf_counter()
+        if self.replace_where:
+            condition, params = self.replace_where
+            self.cursor.execute(f"DELETE FROM {self.table} WHERE {condition}", params)
+        return self
+
+    def add(self, row):
+        self.buffer.append(tuple(row))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        if self.replace_all and not self.replaced:
+            self.cursor.execute(f"DELETE FROM {self.table}")
+            self.replaced = True
+        self.cursor.executemany(self.sql, self.buffer)
+        self.rows += len(self.buffer)
+        scrape_metrics.add("rows_written", len(self.buffer), table=self.table)
+        self.affected += max(self.cursor.rowcount, 0)
+        self.buffer = []
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.conn.rollback()
+            self.cursor.close()
+            print(f"{self.table}: rolled back after {self.rows} rows ({exc})")
+            return False
+
+        self.flush()
+        self.conn.commit()
+        self.cursor.close()
+        print(self.summary())
+        return False
+
+    def rows_per_sec(self):
+        elapsed = time.perf_counter() - self.started
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.table}: wrote {self.rows} rows ({self.affected} affected) "
+                f"at {self.rows_per_sec():.0f} rows/sec")
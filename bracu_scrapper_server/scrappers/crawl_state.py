@@ -0,0 +1,206 @@
+import hashlib
+import threading
+
+# === CONFIG ===
+KNOWN_RUN_TO_STOP = 10   # stop paging a listing after this many already-crawled items in a row
+MISSING_STATUSES = {404, 410}
+MISSING_RETRY_AFTER = 24 * 3600   # seconds before a URL that came back missing is fetched again
+
+
+def content_hash(response):
+    return hashlib.sha256(response.content).hexdigest()
+
+
+class CrawlState:
+    """What we saw last time for each URL, backed by the CrawlState table.
+
+    Rows are loaded up front so the crawler's worker threads only read a dict.
+    Changes are buffered and written by `save()` from the thread that owns the
+    MySQL connection.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.states = {}
+        self.changed = {}
+        self.seen = set()
+        self.gone = set()    # urls that came back 404 / 410 this run
+        self.lastmods = {}   # url -> sitemap <lastmod> of pages being fetched this run
+        self._lock = threading.Lock()
+        self.stats = {"not_modified": 0, "same_hash": 0, "changed": 0, "same_lastmod": 0,
+                      "missing": 0, "still_missing": 0}
+
+    def load(self, url_prefix):
+        cursor = self.conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT url, etag, last_modified, content_hash, sitemap_lastmod,
+                   retry_after > CURRENT_TIMESTAMP AS missing
+            FROM CrawlState WHERE url LIKE %s
+        """, (url_prefix + "%",))
+        for row in cursor.fetchall():
+            self.states[row["url"]] = row
+        cursor.close()
+        print(f"Loaded crawl state for {len(self.states)} urls under {url_prefix}")
+        return self
+
+    def load_urls(self, urls, chunk_size=500):
+        """Like load(), for a list of URLs that share no useful prefix."""
+        urls = list(urls)
+        cursor = self.conn.cursor(dictionary=True)
+        for start in range(0, len(urls), chunk_size):
+            chunk = urls[start:start + chunk_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"""
+                SELECT url, etag, last_modified, content_hash, sitemap_lastmod,
+                       retry_after > CURRENT_TIMESTAMP AS missing
+                FROM CrawlState WHERE url IN ({placeholders})
+            """, chunk)
+            for row in cursor.fetchall():
+                self.states[row["url"]] = row
+        cursor.close()
+        print(f"Loaded crawl state for {len(self.states)} of {len(urls)} urls")
+        return self
+
+    def known(self, url):
+        """True once the page has been parsed, a URL that was only ever missing is not known."""
+        state = self.states.get(url)
+        return state is not None and state["content_hash"] is not None
+
+    def missing(self, url):
+        """True while a URL that came back 404 / 410 is within its retry-after, so it is not fetched."""
+        state = self.states.get(url)
+        if state and state.get("missing"):
+            self._count("still_missing")
+            return True
+        return False
+
+    def gone_missing(self, url, response):
+        """True on a 404 / 410, remembered so the URL is not fetched again for MISSING_RETRY_AFTER."""
+        if response.status_code not in MISSING_STATUSES:
+            return False
+        self._count("missing")
+        with self._lock:
+            self.gone.add(url)
+            state = self.states.get(url) or {"url": url, "etag": None, "last_modified": None,
+                                             "content_hash": None, "sitemap_lastmod": None}
+            self.states[url] = {**state, "missing": True}
+        return True
+
+    def conditional_headers(self, url):
+        state = self.states.get(url)
+        headers = {}
+        if state and state["etag"]:
+            headers["If-None-Match"] = state["etag"]
+        if state and state["last_modified"]:
+            headers["If-Modified-Since"] = state["last_modified"]
+        return headers
+
+    def unchanged(self, url, response):
+        """True on a 304 or when the body hashes the same as last time."""
+        if response.status_code == 304:
+            self._count("not_modified")
+            with self._lock:
+                self.seen.add(url)
+            return True
+
+        state = self.states.get(url)
+        if state and state["content_hash"] == content_hash(response):
+            self._count("same_hash")
+            with self._lock:
+                self.seen.add(url)
+            return True
+        return False
+
+    def lastmod_unchanged(self, url, lastmod):
+        """True when the sitemap's <lastmod> for `url` is the one stored when it was last crawled.
+
+        Otherwise the new value is kept and saved once the page has been
+        fetched, so a page that fails to fetch is tried again next run.
+        """
+        if not lastmod:
+            return False
+        state = self.states.get(url)
+        if state and state.get("sitemap_lastmod") == lastmod:
+            self._count("same_lastmod")
+            with self._lock:
+                self.seen.add(url)
+            return True
+        with self._lock:
+            self.lastmods[url] = lastmod
+        return False
+
+    def record(self, url, response, digest=None):
+        """Remember the validators of a page that was just parsed.
+
+        Pass `digest` for a streamed response whose body was written to disk.
+        """
+        row = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_hash": digest or content_hash(response),
+            "sitemap_lastmod": self.lastmods.get(url),
+            "missing": False,
+        }
+        self._count("changed")
+        with self._lock:
+            self.changed[url] = row
+            self.states[url] = row
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def save(self):
+        with self._lock:
+            changed = list(self.changed.values())
+            seen = [(self.lastmods.get(url), url) for url in self.seen - set(self.changed)]
+            gone = [(url, MISSING_RETRY_AFTER) for url in self.gone]
+            self.changed.clear()
+            self.seen.clear()
+            self.gone.clear()
+            self.lastmods.clear()
+
+        cursor = self.conn.cursor()
+        if changed:
+            cursor.executemany("""
+                INSERT INTO CrawlState (url, etag, last_modified, content_hash, sitemap_lastmod)
+                VALUES (%(url)s, %(etag)s, %(last_modified)s, %(content_hash)s, %(sitemap_lastmod)s)
+                ON DUPLICATE KEY UPDATE
+                    etag = VALUES(etag),
+                    last_modified = VALUES(last_modified),
+                    content_hash = VALUES(content_hash),
+                    sitemap_lastmod = COALESCE(VALUES(sitemap_lastmod), sitemap_lastmod),
+                    retry_after = NULL,
+                    last_seen = CURRENT_TIMESTAMP,
+                    last_changed = CURRENT_TIMESTAMP
+            """, changed)
+        if seen:
+            # a page that came back 304 / same hash under a new <lastmod> is skipped on it next time
+            cursor.executemany("""
+                UPDATE CrawlState SET last_seen = CURRENT_TIMESTAMP, sitemap_lastmod = COALESCE(%s, sitemap_lastmod)
+                WHERE url = %s
+            """, seen)
+        if gone:
+            # a page that used to exist keeps its validators, so it can still come back as a 304
+            cursor.executemany("""
+                INSERT INTO CrawlState (url, retry_after) VALUES (%s, CURRENT_TIMESTAMP + INTERVAL %s SECOND)
+                ON DUPLICATE KEY UPDATE retry_after = VALUES(retry_after), last_seen = CURRENT_TIMESTAMP
+            """, gone)
+        self.conn.commit()
+        cursor.close()
+
+
+class KnownRun:
+    """Counts already-crawled items in a row while walking a newest-first listing."""
+
+    def __init__(self, state, limit=KNOWN_RUN_TO_STOP):
+        self.state = state
+        self.limit = limit
+        self.run = 0
+
+    def add(self, url):
+        self.run = self.run + 1 if self.state.known(url) else 0
+
+    def reached(self):
+        return self.run >= self.limit
@@ -0,0 +1,190 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import cloudscraper
+
+import scrape_metrics
+
+# === CONFIG ===
+MAX_WORKERS = 8              # detail pages fetched at the same time
+REQUESTS_PER_SECOND = 2.0    # steady rate allowed per host
+BURST = 4                    # requests a host may get back to back before the rate kicks in
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0           # seconds, doubled on every retry
+BACKOFF_MAX = 30.0
+TIMEOUT = 30
+RETRY_STATUSES = {403, 429, 500, 502, 503, 504}   # 403 is what Cloudflare sends when it wants us to slow down
+
+
+class TokenBucket:
+    """Politeness limiter, `rate` tokens per second up to `capacity` saved up."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hand out no token for `seconds`, every thread fetching from the host waits."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with full jitter, or the server's Retry-After if it sent one."""
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1)))
+
+
+class Crawler:
+    """Shared fetch engine for the db_scrape_* scripts.
+
+    Scrapers hand over a list of URLs with a `parse(url, response)` function,
+    which runs on a thread pool, and a `store(item)` function, which runs in
+    the calling thread so a single MySQL connection is enough.
+
+    Each worker thread gets its own session from `session_factory`, pass
+    `requests.Session` to run against a local fixture server.
+
+    With a `CrawlState` the crawler sends If-None-Match / If-Modified-Since
+    for pages it has seen and skips `parse` when they come back 304 or with
+    the same content hash. A page that came back 404 / 410 is not fetched
+    again until its retry-after has passed.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, rate=REQUESTS_PER_SECOND, burst=BURST,
+                 max_retries=MAX_RETRIES, session_factory=cloudscraper.create_scraper, state=None):
+        self.max_workers = max_workers
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.session_factory = session_factory
+        self.state = state
+        self._local = threading.local()
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+        self._stats_lock = threading.Lock()
+
+    def count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = self.session_factory()
+        return self._local.session
+
+    def bucket(self, url):
+        host = urlparse(url).netloc
+        with self._buckets_lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def fetch(self, url, conditional=True, **kwargs):
+        """GET `url` with rate limiting and retries.
+
+        Returns the response, which may be an error status that is not worth
+        retrying (404, ...), or None once every attempt raised or came back
+        with a retryable status (403 / 429 / 5xx). With `stream=True` the body
+        is left to the caller. `conditional=False` fetches the page even if
+        the crawl state has validators for it.
+        """
+        kwargs.setdefault("timeout", TIMEOUT)
+        if self.state is not None and conditional:
+            kwargs["headers"] = {**self.state.conditional_headers(url), **kwargs.get("headers", {})}
+        for attempt in range(1, self.max_retries + 1):
+            self.bucket(url).acquire()
+            self.count("requests")
+            retry_after = None
+            throttled = False
+            try:
+                response = self.session().get(url, **kwargs)
+            except Exception as e:
+                error = e
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    scrape_metrics.add("pages_fetched")
+                    if not kwargs.get("stream"):
+                        scrape_metrics.add("bytes_fetched", len(response.content))
+                    return response
+                error = f"status code {response.status_code}"
+                retry_after = response.headers.get("Retry-After")
+                throttled = True
+
+            if attempt == self.max_retries:
+                break
+            delay = backoff_delay(attempt, retry_after)
+            self.count("retries")
+            print(f"Attempt {attempt} for {url} failed ({error}), retrying in {delay:.1f}s...")
+            if throttled:
+                # the host itself asked us to slow down (403 / 429 / 5xx), so back off every thread
+                self.bucket(url).pause(delay)
+            else:
+                time.sleep(delay)
+
+        self.count("failures")
+        print(f"Giving up on {url} after {self.max_retries} attempts: {error}")
+        return None
+
+    def map(self, urls, parse):
+        """Fetch and parse `urls` concurrently, yielding each non-None result as it finishes."""
+        def task(url):
+            if self.state is not None and self.state.missing(url):
+                return None
+            response = self.fetch(url)
+            if response is None:
+                return None
+            if self.state is not None and (self.state.gone_missing(url, response)
+                                           or self.state.unchanged(url, response)):
+                return None
+            start = time.perf_counter()
+            result = parse(url, response)
+            scrape_metrics.add("parse_seconds", time.perf_counter() - start)
+            if self.state is not None and result is not None:
+                self.state.record(url, response)
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {scrape_metrics.submit(pool, task, url): url for url in urls}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Error parsing {futures[future]}: {e}")
+                    continue
+                if result is not None:
+                    yield result
+
+    def crawl(self, urls, parse, store):
+        """map() and hand every parsed item to `store`, returns how many were stored."""
+        stored = 0
+        for item in self.map(urls, parse):
+            store(item)
+            stored += 1
+        return stored
@@ -1,8 +1,11 @@
-import time
-import cloudscraper
+import argparse
 from bs4 import BeautifulSoup
 import mysql.connector
-from datetime import datetime
+from datetime import date, datetime
+from crawler import Crawler
+from crawl_state import CrawlState
+from bulk_writer import BulkWriter
+from table_versions import bump_table_version
 
 # MySQL configuration
 db_config = {
@@ -16,18 +19,9 @@ db_config = {
 base_url = "https://www.bracu.ac.bd/academic/{semester}/{year}/rss.xml"
 semesters = ["spring", "summer", "fall"]
 end_year = 2014
-max_retries = 10
-retry_delay = 5
+term_end_month = {"spring": 4, "summer": 8, "fall": 12}   # a term's feed is frozen once this month is over
+max_retries = 3   # per feed, with the crawler's jittered backoff; a failed term is simply tried next run
 
-# Determine current year dynamically
-current_year = datetime.now().year
-
-# Initialize scraper
-scraper = cloudscraper.create_scraper()
-
-# Connect to MySQL
-conn = mysql.connector.connect(**db_config)
-cursor = conn.cursor()
 
 def parse_date(date_str):
     """Parse date using the exact format from the RSS feed."""
@@ -36,46 +30,112 @@ def parse_date(date_str):
     except (ValueError, TypeError):
         return None
 
-for year in range(current_year, end_year - 1, -1):  # current year down to 2010
-    for semester in semesters:
-        url = base_url.format(semester=semester, year=year)
-        print(f"Fetching RSS for {semester.capitalize()} {year}: {url}")
-
-        for attempt in range(1, max_retries + 1):
-            try:
-                response = scraper.get(url)
-                if response.status_code == 403:
-                    print(f"Attempt {attempt}: 403 Forbidden, retrying in {retry_delay}s...")
-                    time.sleep(retry_delay)
-                    continue
-
-                response.raise_for_status()
-                soup = BeautifulSoup(response.text, "xml")
-
-                for event in soup.find_all("event"):
-                    event_name = event.title.text.strip() if event.title else "N/A"
-                    start_date_str = event.find("start-date").text.strip() if event.find("start-date") else None
-                    end_date_str = event.find("end-date").text.strip() if event.find("end-date") else None
-
-                    start_date = parse_date(start_date_str)
-                    end_date = parse_date(end_date_str)
-
-                    if start_date and end_date:
-                        cursor.execute(
-                            "INSERT INTO AcademicDates (event_name, start_date, end_date) VALUES (%s, %s, %s)",
-                            (event_name, start_date, end_date)
-                        )
-                        conn.commit()
-
-                break  # exit retry loop if successful
-
-            except Exception as e:
-                print(f"Attempt {attempt}: Error - {e}, retrying in {retry_delay}s...")
-                time.sleep(retry_delay)
-        else:
-            print(f"Failed to fetch {semester} {year} RSS after {max_retries} attempts.")
-
-cursor.close()
-conn.close()
-print("Done inserting academic dates into database.")
 
+def term_ended(semester, year, today):
+    return (year, term_end_month[semester]) < (today.year, today.month)
+
+
+def all_terms(today):
+    """{feed url: (semester, year)} from end_year up to next year, whose feeds appear before the term starts."""
+    return {base_url.format(semester=semester, year=year): (semester, year)
+            for year in range(end_year, today.year + 2) for semester in semesters}
+
+
+def parse_feed(url, response, terms):
+    """Runs on the crawler's worker threads, returns (url, rows) for one term's feed."""
+    if response.status_code != 200:
+        print(f"No feed for {url}, status code: {response.status_code}")
+        return None
+
+    semester, year = terms[url]
+    term = f"{semester.capitalize()} {year}"
+    soup = BeautifulSoup(response.text, "xml")
+
+    rows = []
+    for event in soup.find_all("event"):
+        event_name = event.title.text.strip() if event.title else "N/A"
+        start_date_str = event.find("start-date").text.strip() if event.find("start-date") else None
+        end_date_str = event.find("end-date").text.strip() if event.find("end-date") else None
+
+        start_date = parse_date(start_date_str)
+        end_date = parse_date(end_date_str)
+
+        if start_date and end_date:
+            rows.append((event_name, start_date, end_date, term))
+    return url, rows
+
+
+def drop_untagged_duplicates(conn):
+    """Delete rows stored before migration 0012 (no semester) once the import has the same event with one."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        DELETE legacy FROM AcademicDates legacy
+        JOIN AcademicDates tagged
+          ON tagged.event_name = legacy.event_name AND tagged.start_date = legacy.start_date
+         AND tagged.semester IS NOT NULL
+        WHERE legacy.semester IS NULL
+    """)
+    if cursor.rowcount:
+        print(f"Removed {cursor.rowcount} academic dates stored without a semester")
+    conn.commit()
+    cursor.close()
+
+
+def main(backfill=False):
+    """Routine runs fetch the current and upcoming terms plus any past term never imported.
+
+    A past term is frozen once its feed has been imported (it is in
+    CrawlState), so it is not fetched again. A feed that came back 404 (a term
+    not published yet) is skipped until its retry-after in CrawlState has
+    passed; `backfill` refetches every term.
+    All feeds are fetched concurrently under the crawler's per-host rate limit.
+    """
+    today = date.today()
+
+    # Connect to MySQL
+    conn = mysql.connector.connect(**db_config)
+
+    # Feeds imported on earlier runs: conditional GETs for open terms, frozen past terms
+    crawl_state = CrawlState(conn)
+    if not backfill:
+        crawl_state.load(base_url.split("{")[0])
+    crawler = Crawler(max_retries=max_retries, state=crawl_state)
+
+    terms = all_terms(today)
+    frozen = [url for url, (semester, year) in terms.items()
+              if term_ended(semester, year, today) and crawl_state.known(url)]
+    urls = [url for url in terms if url not in frozen]
+    print(f"Fetching {len(urls)} term feeds, {len(frozen)} past terms are frozen")
+
+    def parse(url, response):
+        return parse_feed(url, response, terms)
+
+    # Upserted on (event_name, start_date, semester), so a rerun updates events instead of repeating them
+    dates_writer = BulkWriter(conn, "AcademicDates", ["event_name", "start_date", "end_date", "semester"],
+                              update_columns=["end_date"])
+
+    imported = 0
+    with dates_writer:
+        for url, rows in crawler.map(urls, parse):
+            semester, year = terms[url]
+            print(f"{semester.capitalize()} {year}: {len(rows)} events")
+            for row in rows:
+                dates_writer.add(row)
+            imported += 1
+
+    # Only remember the feeds once their rows are committed
+    crawl_state.save()
+    drop_untagged_duplicates(conn)
+    print(f"Imported {imported} terms, skipped {len(frozen)} frozen terms. "
+          f"Crawler stats: {crawler.stats}, crawl state: {crawl_state.stats}")
+
+    bump_table_version(conn, "AcademicDates")
+    conn.close()
+    print("Done inserting academic dates into database.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import academic dates from the per-term RSS feeds")
+    parser.add_argument("--backfill", action="store_true", help="Refetch every term, including frozen past terms")
+    args = parser.parse_args()
+    main(backfill=args.backfill)
@@ -2,6 +2,12 @@ import pdfplumber
 import mysql.connector
 from datetime import datetime
 import os
+from bulk_writer import BulkWriter
+from pdf_ingest import ingest
+from pdf_manifest import PdfManifest
+from student_exams import rebuild_student_exams
+from table_versions import bump_table_version
+import scrape_metrics
 
 def get_col_index(headers, keyword):
     for idx, h in enumerate(headers):
@@ -26,105 +32,142 @@ def parse_date(date_str):
 
 
 # MySQL connection
-conn = mysql.connector.connect(
-    host="localhost",
-    user="root",
-    password="",  # replace with your password
-    database="bracu_info"
-)
-cursor = conn.cursor()
+db_config = {
+    "host": "localhost",
+    "user": "root",
+    "password": "",  # replace with your password
+    "database": "bracu_info"
+}
 
 # Base folder containing exam schedule PDFs
 base_folder = "./exam schedule pdfs"
-
-# Loop through subfolders
-for root, dirs, files in os.walk(base_folder):
-    for file in files:
-        if file.lower().endswith(".pdf") and ("mid" in file.lower() or "final" in file.lower() or "exam" in file.lower() or "schedule" in file.lower()):
-            pdf_path = os.path.join(root, file)
-
-            # Use folder name as exam type (like "Final Fall 2022")
-            exam_type = os.path.basename(root) or "N/A"
-            print(f"\nProcessing: {pdf_path}")
-            print("Exam type:", exam_type)
-
-            # Default student ID
-            student_id = "N/A"
-
-            try:
-                with pdfplumber.open(pdf_path) as pdf:
-                    total_pages = len(pdf.pages)
-                    for i in range(total_pages):
-                        page = pdf.pages[i]
-                        tables = page.extract_tables()
-
-                        if not tables:
-                            continue
-
-                        table = tables[0]
-
-                        # Find header row index
-                        # header_index = None
-                        header_index = -1
-                        for idx, row in enumerate(table):
-                            if row and any("course" in str(c).lower() for c in row):
-                                header_index = idx
-                                break
-
-                        # if header_index is None:
-                        #     continue
-
-                        headers = table[header_index]
-                        data_rows = table[header_index + 1:]
-
-                        for row in data_rows:
-                            if not row or all(cell is None for cell in row):
-                                continue
-
-                            # Map columns
-                            course_code = row[get_col_index(headers, "course")] if get_col_index(headers, "course") is not None else "N/A"
-                            section = row[get_col_index(headers, "section")] if get_col_index(headers, "section") is not None else "N/A"
-                            date_str = row[get_col_index(headers, "date")] if get_col_index(headers, "date") is not None else "N/A"
-                            start_time_str = row[get_col_index(headers, "start time")] if get_col_index(headers, "start time") is not None else "N/A"
-                            end_time_str = row[get_col_index(headers, "end time")] if get_col_index(headers, "end time") is not None else "N/A"
-                            room_no = row[get_col_index(headers, "room")] if get_col_index(headers, "room") is not None else "N/A"
-                            dept = row[get_col_index(headers, "dept")] if get_col_index(headers, "dept") is not None else "N/A"
-
-                            # Convert date and time
-                            date = parse_date(date_str)
-
-                            try:
-                                start_time = datetime.strptime(start_time_str.strip(), "%I:%M %p").time()
-                            except:
-                                start_time = None
-
-                            try:
-                                end_time = datetime.strptime(end_time_str.strip(), "%I:%M %p").time()
-                            except:
-                                end_time = None
-
-                            # Insert into MySQL
-                            sql = """
-                                INSERT INTO ExamSchedule 
-                                (type, course_code, section, date, start_time, end_time, room_no, dept, student_id)
-                                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            """
-                            cursor.execute(sql, (
-                                exam_type,
-                                course_code or "N/A",
-                                section or "N/A",
-                                date,
-                                start_time,
-                                end_time,
-                                room_no or "N/A",
-                                dept or "N/A",
-                                student_id
-                            ))
-                            conn.commit()
-            except Exception as e:
-                print(f"Error processing {pdf_path}: {e}")
-
-cursor.close()
-conn.close()
-print("\nAll PDF data inserted into MySQL successfully!")
-
+workers = os.cpu_count() or 2   # parser processes
+parser_version = "general-2"           # bump when the parsing below changes, every PDF is then re-ingested
+
+exam_columns = ["type", "course_code", "section", "date", "start_time", "end_time", "room_no", "dept", "student_id", "source_file"]
+
+
+def parse_exam_pages(pdf_path, exam_type, page_numbers):
+    """Runs in a worker process, returns the ExamSchedule rows of the given pages (all when None)."""
+    rows = []
+
+    # Default student ID
+    student_id = "N/A"
+
+    with pdfplumber.open(pdf_path) as pdf:
+        total_pages = len(pdf.pages)
+        for i in (page_numbers if page_numbers is not None else range(total_pages)):
+            page = pdf.pages[i]
+            tables = page.extract_tables()
+
+            if not tables:
+                continue
+
+            table = tables[0]
+
+            # Find header row index
+            # header_index = None
+            header_index = -1
+            for idx, row in enumerate(table):
+                if row and any("course" in str(c).lower() for c in row):
+                    header_index = idx
+                    break
+
+            # if header_index is None:
+            #     continue
+
+            headers = table[header_index]
+            data_rows = table[header_index + 1:]
+
+            for row in data_rows:
+                if not row or all(cell is None for cell in row):
+                    continue
+
+                # Map columns
+                course_code = row[get_col_index(headers, "course")] if get_col_index(headers, "course") is not None else "N/A"
+                section = row[get_col_index(headers, "section")] if get_col_index(headers, "section") is not None else "N/A"
+                date_str = row[get_col_index(headers, "date")] if get_col_index(headers, "date") is not None else "N/A"
+                start_time_str = row[get_col_index(headers, "start time")] if get_col_index(headers, "start time") is not None else "N/A"
+                end_time_str = row[get_col_index(headers, "end time")] if get_col_index(headers, "end time") is not None else "N/A"
+                room_no = row[get_col_index(headers, "room")] if get_col_index(headers, "room") is not None else "N/A"
+                dept = row[get_col_index(headers, "dept")] if get_col_index(headers, "dept") is not None else "N/A"
+
+                # Convert date and time, None when unreadable (store() skips those rows)
+                date = parse_date(date_str)
+
+                try:
+                    start_time = datetime.strptime(start_time_str.strip(), "%I:%M %p").time()
+                except:
+                    start_time = None
+
+                try:
+                    end_time = datetime.strptime(end_time_str.strip(), "%I:%M %p").time()
+                except:
+                    end_time = None
+
+                rows.append((
+                    exam_type,
+                    course_code or "N/A",
+                    section or "N/A",
+                    date,
+                    start_time,
+                    end_time,
+                    room_no or "N/A",
+                    dept or "N/A",
+                    student_id
+                ))
+    return rows
+
+
+def find_exam_pdfs():
+    """(pdf_path, exam_type) for every general exam schedule PDF."""
+    found = []
+    # Loop through subfolders
+    for root, dirs, files in os.walk(base_folder):
+        for file in files:
+            if file.lower().endswith(".pdf") and ("mid" in file.lower() or "final" in file.lower() or "exam" in file.lower() or "schedule" in file.lower()):
+                # Use folder name as exam type (like "Final Fall 2022")
+                exam_type = os.path.basename(root) or "N/A"
+                found.append((os.path.join(root, file), exam_type))
+    return found
+
+
+def main():
+    conn = mysql.connector.connect(**db_config)
+
+    manifest = PdfManifest(conn, base_folder, parser_version).load()
+    all_pdfs = find_exam_pdfs()
+    pdfs = manifest.filter(all_pdfs)
+    manifest.save()
+    print(f"{len(all_pdfs) - len(pdfs)} of {len(all_pdfs)} PDFs unchanged {manifest.stats}")
+    print(f"Parsing {len(pdfs)} PDFs with {workers} workers")
+
+    # Files are parsed in parallel, each one comes back here and replaces
+    # only its own rows, together with its manifest entry, in one transaction
+    def store(pdf_path, context, rows):
+        # date, start_time and end_time are NOT NULL, a row without them is no use to a student either
+        complete = [row for row in rows if None not in row[3:6]]
+        if len(complete) < len(rows):
+            print(f"⚠️ {pdf_path}: skipped {len(rows) - len(complete)} rows without a readable date or time")
+            scrape_metrics.add("rows_skipped", len(rows) - len(complete), table="ExamSchedule")
+        rows = complete
+
+        source_file = manifest.key(pdf_path)
+        with BulkWriter(conn, "ExamSchedule", exam_columns,
+                        replace_where=("source_file = %s", (source_file,))) as exam_writer:
+            for row in rows:
+                exam_writer.add(row + (source_file,))
+            manifest.record(exam_writer.cursor, pdf_path, len(rows))
+
+    stored, skipped = ingest(pdfs, parse_exam_pages, store, workers=workers)
+
+    print(f"\n{stored} PDFs ingested, {skipped} skipped")
+    if stored:
+        rebuild_student_exams(conn)
+        bump_table_version(conn, "ExamSchedule")
+    conn.close()
+    print("\nAll PDF data inserted into MySQL successfully!")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
-import cloudscraper
-from bs4 import BeautifulSoup
 import mysql.connector
 import json
 from datetime import datetime
 import re
+from crawler import Crawler
+from crawl_state import CrawlState, KnownRun
+from bulk_writer import BulkWriter
+from html_parse import parse_html
+from table_versions import bump_table_version
 
 def clean_ordinal_date(date_str: str):
     """Remove ordinal suffixes like st, nd, rd, th from day numbers."""
@@ -20,92 +23,117 @@ db_config = {
     "database": "bracu_info"
 }
 
-# === MYSQL CONNECTION ===
-conn = mysql.connector.connect(**db_config)
-cursor = conn.cursor()
-
-# === SCRAPER ===
-scraper = cloudscraper.create_scraper()
-page_num = 0
-while True:
-    main_url = f"{base_url}/news-archive?page={page_num}"
-    print(f"Fetching: {main_url}")
-    # Fetch the main page
-    response = scraper.get(main_url)
-    if response.status_code == 404:
-        break
+
+def parse_news_page(url, response, titles):
+    """Runs on the crawler's worker threads, returns the row to insert."""
     if response.status_code != 200:
-        print(f"Failed to fetch {main_url}, status code: {response.status_code}")
-        exit()
-
-    # Parse the main page
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # Remove parent of pagination div
-    pagination_div = soup.find("div", class_="item-list item-list-pagination")
-    if pagination_div:
-        pagination_div.decompose()
-
-    # Find all divs with class "block-content content"
-    blocks = soup.find_all("div", class_="block-content content")
-
-    if len(blocks) < 3:
-        print("Less than 3 content blocks found.")
-        exit()
-
-    # Target block
-    target_block = blocks[2]
-
-    # Extract all a tags that start with /news
-    links = [a for a in target_block.find_all("a", href=True) if a['href'].startswith("/news")]
-
-    for link in links:
-        title = link.get_text(strip=True)
-        url = base_url + link['href']
-
-        # Fetch the page of the link
-        page_resp = scraper.get(url)
-        if page_resp.status_code != 200:
-            print(f"  Failed to fetch {url}")
-            continue
-
-        # Parse the page
-        page_soup = BeautifulSoup(page_resp.text, "html.parser")
-        page_blocks = page_soup.find_all("div", class_="block-content content")
-
-        if len(page_blocks) < 3:
-            print("  Less than 3 content blocks on the page.")
-            continue
-
-        page_content_block = page_blocks[2]
-        message = page_content_block.get_text(separator="\n", strip=True)
-
-        # Collect all images
-        images = [img['src'] for img in page_content_block.find_all("img", src=True)]
-        image_json = json.dumps(images) if images else json.dumps([])
-
-        # === Get published date ===
-        date_tag = page_soup.select_one("span.date-display-single")
-        pub_date_sql = None
-        if date_tag:
-            published_date = clean_ordinal_date(date_tag.get_text(strip=True))
-            try:
-                pub_date_sql = datetime.strptime(published_date, "%B %d, %Y")
-            except Exception as e:
-                print(f"  Could not parse date '{published_date}' for {title}: {e}")
-
-        # Insert into DB
+        print(f"  Failed to fetch {url}")
+        return None
+
+    # Parse the page, only the content blocks and the date are built
+    page_soup = parse_html(response.text, "div.block-content.content", "span.date-display-single")
+    page_blocks = page_soup.select("div.block-content.content")
+
+    if len(page_blocks) < 3:
+        print("  Less than 3 content blocks on the page.")
+        return None
+
+    page_content_block = page_blocks[2]
+    message = page_content_block.get_text(separator="\n", strip=True)
+
+    # Collect all images
+    images = [img['src'] for img in page_content_block.find_all("img", src=True)]
+    image_json = json.dumps(images) if images else json.dumps([])
+
+    # === Get published date ===
+    date_tag = page_soup.select_one("span.date-display-single")
+    pub_date_sql = None
+    if date_tag:
+        published_date = clean_ordinal_date(date_tag.get_text(strip=True))
         try:
-            cursor.execute("""
-                INSERT INTO News (title, message, image_url, published_date)
-                VALUES (%s, %s, %s, %s)
-            """, (title, message, image_json, pub_date_sql))
-            conn.commit()
-            print(f"Inserted: {title} ({pub_date_sql})")
+            pub_date_sql = datetime.strptime(published_date, "%B %d, %Y")
         except Exception as e:
-            print(f"Error inserting {title}: {e}")
-    page_num += 1
-# Close DB connection
-cursor.close()
-conn.close()
-
+            print(f"  Could not parse date '{published_date}' for {titles[url]}: {e}")
+
+    return (titles[url], url, message, image_json, pub_date_sql)
+
+
+def main():
+    # === MYSQL CONNECTION ===
+    conn = mysql.connector.connect(**db_config)
+
+    # === SCRAPER ===
+    # Pages seen on earlier runs are fetched conditionally and skipped when unchanged
+    crawl_state = CrawlState(conn).load(base_url + "/news")
+    crawler = Crawler(state=crawl_state)
+    known_run = KnownRun(crawl_state)
+    titles = {}  # detail url -> title from the listing page
+
+    # Buffered and upserted in batches, the whole crawl is one transaction
+    news_writer = BulkWriter(conn, "News", ["title", "url", "message", "image_url", "published_date"],
+                             update_columns=["title", "message", "image_url", "published_date"])
+
+    def parse(url, response):
+        return parse_news_page(url, response, titles)
+
+    with news_writer:
+        page_num = 0
+        while True:
+            main_url = f"{base_url}/news-archive?page={page_num}"
+            print(f"Fetching: {main_url}")
+            # Fetch the main page
+            response = crawler.fetch(main_url)
+            if response is None:
+                print(f"Failed to fetch {main_url}")
+                break
+            if response.status_code == 404:
+                break
+            if response.status_code != 200:
+                print(f"Failed to fetch {main_url}, status code: {response.status_code}")
+                break
+
+            # Parse the main page, only the divs with class "block-content content" are built
+            soup = parse_html(response.text, "div.block-content.content")
+            blocks = soup.select("div.block-content.content")
+
+            if len(blocks) < 3:
+                print("Less than 3 content blocks found.")
+                break
+
+            # Target block
+            target_block = blocks[2]
+
+            # Remove the pagination div, its links start with /news too
+            pagination_div = target_block.select_one("div.item-list.item-list-pagination")
+            if pagination_div:
+                pagination_div.decompose()
+
+            # Extract all a tags that start with /news
+            links = [a for a in target_block.find_all("a", href=True) if a['href'].startswith("/news")]
+
+            urls = []
+            for link in links:
+                url = base_url + link['href']
+                titles[url] = link.get_text(strip=True)
+                urls.append(url)
+                known_run.add(url)
+
+            # Detail pages are fetched concurrently, rows are inserted here as they come back
+            crawler.crawl(urls, parse, news_writer.add)
+
+            # The archive is newest first, once we are deep into known articles the rest is known too
+            if known_run.reached():
+                print("Reached already crawled news, stopping.")
+                break
+            page_num += 1
+
+    # Only remember the pages once their rows are committed
+    crawl_state.save()
+    print(f"Crawler stats: {crawler.stats}, crawl state: {crawl_state.stats}")
+    bump_table_version(conn, "News")
+    # Close DB connection
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
-import cloudscraper
-from bs4 import BeautifulSoup
+import xml.etree.ElementTree as ET
 import mysql.connector
 from mysql.connector import Error
+from crawler import Crawler
+from crawl_state import CrawlState
+from bulk_writer import BulkWriter
+from html_parse import parse_html
+from table_versions import bump_table_version
+import scrape_metrics
 
 def decode_cf_email(e):
     """Decode Cloudflare-protected emails"""
@@ -17,77 +22,128 @@ DB_HOST = "localhost"
 DB_USER = "root"
 DB_PASSWORD = ""
 DB_NAME = "bracu_info"
-
-scraper = cloudscraper.create_scraper()
-
-# Connect to MySQL
-try:
-    conn = mysql.connector.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        database=DB_NAME
-    )
-    cursor = conn.cursor()
-except Error as e:
-    print(f"Error connecting to MySQL: {e}")
-    exit()
-
-page = 1
-while True:
-    sitemap_url = f"https://www.bracu.ac.bd/sitemap.xml?page={page}"
-    r = scraper.get(sitemap_url)
-    if r.status_code != 200:
-        break
-
-    # Parse sitemap
-    soup = BeautifulSoup(r.content, "lxml-xml")
-    urls = soup.find_all("url")
-    people_links = [u for u in urls if "/people/" in u.loc.text]
-    if not people_links:
-        break
-
-    for u in people_links:
-        link = u.loc.text
-        r2 = scraper.get(link, allow_redirects=True)
-
-        # Skip if redirected to homepage
-        if r2.url.rstrip("/") == "https://www.bracu.ac.bd":
-            print(f"Skipped: {link}")
-            continue
-
-        soup2 = BeautifulSoup(r2.content, "html.parser")
-        divs = soup2.find_all("div", class_="block-content content")
-        if len(divs) >= 3:
-            # Decode Cloudflare emails
-            for span in divs[2].find_all("span", class_="__cf_email__"):
-                cf_encoded = span.get("data-cfemail")
-                if cf_encoded:
-                    span.string = decode_cf_email(cf_encoded)
-
-
-            about_text = divs[2].get_text(separator="\n", strip=True)
-            imgs = divs[2].find_all("img")
-            image_url = imgs[0].get("src") if imgs and imgs[0].get("src") else None
-
-            # Insert into database
+SITEMAP_URL = "https://www.bracu.ac.bd/sitemap.xml"
+CHUNK_BYTES = 64 * 1024       # sitemap bodies are parsed as they arrive, in chunks of this size
+
+
+def local_name(tag):
+    """"{http://www.sitemaps.org/schemas/sitemap/0.9}loc" -> "loc"."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def stream_sitemap(response):
+    """Yield ("url" or "sitemap", loc, lastmod) for every entry while the body downloads.
+
+    A sitemap index lists `sitemap` entries (the pages), a page lists `url`
+    entries. Entries are dropped as soon as they are read, so no tree of the
+    whole sitemap is ever built.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = None
+    for chunk in response.iter_content(CHUNK_BYTES):
+        scrape_metrics.add("bytes_fetched", len(chunk))
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if root is None:
+                root = element
+            if event != "end" or local_name(element.tag) not in ("url", "sitemap"):
+                continue
+            fields = {local_name(child.tag): (child.text or "").strip() for child in element}
+            if fields.get("loc"):
+                yield local_name(element.tag), fields["loc"], fields.get("lastmod") or None
+            root.clear()
+    parser.close()
+
+
+def parse_person(link, r2):
+    """Runs on the crawler's worker threads, returns the row to upsert."""
+    # Skip if redirected to homepage
+    if r2.url.rstrip("/") == "https://www.bracu.ac.bd":
+        print(f"Skipped: {link}")
+        return None
+
+    soup2 = parse_html(r2.content, "div.block-content.content")
+    divs = soup2.select("div.block-content.content")
+    if len(divs) < 3:
+        return None
+
+    # Decode Cloudflare emails
+    for span in divs[2].find_all("span", class_="__cf_email__"):
+        cf_encoded = span.get("data-cfemail")
+        if cf_encoded:
+            span.string = decode_cf_email(cf_encoded)
+
+
+    about_text = divs[2].get_text(separator="\n", strip=True)
+    imgs = divs[2].find_all("img")
+    image_url = imgs[0].get("src") if imgs and imgs[0].get("src") else None
+    return (link, image_url, about_text)
+
+
+def main():
+    # Connect to MySQL
+    try:
+        conn = mysql.connector.connect(
+            host=DB_HOST,
+            user=DB_USER,
+            password=DB_PASSWORD,
+            database=DB_NAME
+        )
+    except Error as e:
+        print(f"Error connecting to MySQL: {e}")
+        raise
+
+    # Sitemap pages and profiles seen on earlier runs are fetched conditionally and skipped when unchanged
+    crawl_state = CrawlState(conn).load("https://www.bracu.ac.bd/")
+    crawler = Crawler(state=crawl_state)
+
+    # Buffered and upserted in batches, the whole crawl is one transaction
+    people_writer = BulkWriter(conn, "People", ["url", "image_url", "about"],
+                               update_columns=["image_url", "about"])
+
+    # sitemap.xml is either the index of the sitemap pages or, on a small site, the only page
+    sitemap_urls = [SITEMAP_URL]
+    profiles = skipped = 0
+
+    with people_writer:
+        while sitemap_urls:
+            sitemap_url = sitemap_urls.pop(0)
+            # Always read the whole sitemap, <lastmod> decides per profile below
+            r = crawler.fetch(sitemap_url, conditional=False, stream=True)
+            if r is None or r.status_code != 200:
+                print(f"Failed to fetch {sitemap_url}, status code: {r.status_code if r is not None else 'no response'}")
+                continue
+
+            changed = []
             try:
-                cursor.execute("""
-                    INSERT INTO People (url, image_url, about)
-                    VALUES (%s, %s, %s)
-                    ON DUPLICATE KEY UPDATE
-                        image_url = VALUES(image_url),
-                        about = VALUES(about)
-                """, (link, image_url, about_text))
-                conn.commit()
-                print(f"Inserted: {link}")
-
-            except Error as e:
-                print(f"Error inserting {link}: {e}")
-
-    page += 1
-
-# Close connection
-cursor.close()
-conn.close()
-
+                with r:
+                    for kind, loc, lastmod in stream_sitemap(r):
+                        if kind == "sitemap":
+                            sitemap_urls.append(loc)
+                        elif "/people/" in loc:
+                            profiles += 1
+                            if crawl_state.lastmod_unchanged(loc, lastmod):
+                                skipped += 1
+                            else:
+                                changed.append(loc)
+            except (ET.ParseError, OSError) as e:
+                # a cut off page: crawl what was read, the rest is picked up next run
+                print(f"Could not read all of {sitemap_url}: {e}")
+
+            # Profiles are fetched concurrently (redirects are followed by default), their
+            # <lastmod> is remembered with them once the rows are committed
+            print(f"{sitemap_url}: {len(changed)} profiles changed")
+            crawler.crawl(changed, parse_person, people_writer.add)
+
+    print(f"{profiles} profiles in the sitemap, {skipped} skipped with an unchanged <lastmod>")
+
+    # Only remember the pages once their rows are committed
+    crawl_state.save()
+    print(f"Crawler stats: {crawler.stats}, crawl state: {crawl_state.stats}")
+    bump_table_version(conn, "People")
+    # Close connection
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,16 @@ import mysql.connector
 import os
 import re
 from datetime import datetime
+from bulk_writer import BulkWriter
+from pdf_ingest import ingest
+from pdf_manifest import PdfManifest
+from student_exams import rebuild_student_exams
+from table_versions import bump_table_version
 
 # === CONFIG ===
 base_folder = "./exam schedule pdfs"
+workers = os.cpu_count() or 2   # parser processes
+parser_version = "special-1"           # bump when the parsing below changes, every PDF is then re-ingested
 db_config = {
     "host": "localhost",
     "user": "root",
@@ -59,102 +66,149 @@ def parse_time_range(time_str):
 
     return (None, None)
 
-def safe_get(key):
+def safe_get(header_map, row, key):
     key_lower = key.lower()
     # Find the first column whose header contains the key substring
     idx = next((i for k, i in header_map.items() if key_lower in k.lower()), None)
     return row[idx].strip() if idx is not None and row[idx] else "N/A"
 
-
-conn = mysql.connector.connect(**db_config)
-cursor = conn.cursor()
-header_map = {}
-
-for root, dirs, files in os.walk(base_folder):
-    for filename in files:
-        if not filename.lower().endswith(".pdf"):
+def find_header(table):
+    """Return (header_idx, header_map) from the first 5 rows, (-1, None) if there is no header."""
+    for idx in range(min(5, len(table))):
+        row = table[idx]
+        if not row:
             continue
-        # skip if filename contains mid, final, exam, or schedule
-        if any(sub in filename.lower() for sub in ["mid", "final", "exam", "schedule"]):
+        if any("schedule" in str(c).lower() for c in row):
             continue
+        if any("sl" in str(c).lower() for c in row):
+            header_map = {}
+            # build header_map
+            for col_idx, col in enumerate(row):
+                if col:
+                    header_map[col.lower().strip()] = col_idx
+            return idx, header_map
+    return -1, None
+
+def header_before(pdf, first_page):
+    """Header of the closest earlier page, for page ranges that start without one."""
+    for i in range(first_page - 1, -1, -1):
+        tables = pdf.pages[i].extract_tables()
+        if tables:
+            header_idx, header_map = find_header(tables[0])
+            if header_map is not None:
+                return header_map
+    return {}
+
+
+exam_columns = ["type", "course_code", "section", "date", "start_time", "end_time", "room_no", "dept", "student_id", "source_file"]
+
+
+def parse_special_pages(pdf_path, context, page_numbers):
+    """Runs in a worker process, returns the ExamSchedule rows of the given pages (all when None)."""
+    exam_type, course_code = context
+    rows = []
+
+    with pdfplumber.open(pdf_path) as pdf:
+        total_pages = len(pdf.pages)
+        pages = page_numbers if page_numbers is not None else range(total_pages)
+
+        # A page without a header row keeps using the previous page's header
+        header_map = header_before(pdf, pages[0]) if len(pages) and pages[0] > 0 else {}
+
+        for i in pages:
+            tables = pdf.pages[i].extract_tables()
+            if not tables:
+                continue
+
+            table = tables[0]
+
+            # --- Step 1: find header in first 5 rows ---
+            header_idx, found_map = find_header(table)
+            if found_map is not None:
+                header_map = found_map
+
+            # --- Step 2: start row automatically becomes header_idx + 1 ---
+            start_row = header_idx + 1
+
+            # print("start_row", start_row)
+            # --- Step 3: process data rows ---
+            for row in table[start_row:]:
+                if not row:
+                    continue
 
-        pdf_path = os.path.join(root, filename)
-        course_code = filename[:6]
-        exam_type = os.path.basename(root) or "N/A"
-
-        print(f"Processing {pdf_path}...")
-
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                total_pages = len(pdf.pages)
-                for i in range(total_pages):
-                    tables = pdf.pages[i].extract_tables()
-                    if not tables:
-                        continue
-
-                    table = tables[0]
-                    header_idx = -1
-
-                    # --- Step 1: find header in first 5 rows ---
-                    for idx in range(min(5, len(table))):
-                        row = table[idx]
-                        if not row:
-                            continue
-                        if any("schedule" in str(c).lower() for c in row):
-                            continue
-                        if any("sl" in str(c).lower() for c in row):
-                            header_idx = idx
-                            header_map = {}
-                            # build header_map
-                            for col_idx, col in enumerate(row):
-                                if col:
-                                    header_map[col.lower().strip()] = col_idx
-                            break
-
-                    # --- Step 2: start row automatically becomes header_idx + 1 ---
-                    start_row = header_idx + 1
-
-                    # print("start_row", start_row)
-                    # --- Step 3: process data rows ---
-                    for row in table[start_row:]:
-                        if not row:
-                            continue
-
-                        student_id = safe_get("id")
-                        section    = safe_get("section")
-                        date_str   = safe_get("date")
-                        time_str   = safe_get("time")
-                        room       = safe_get("room")
-                        # print(student_id, section, date_str, time_str,room)
-
-                        exam_date = parse_date(date_str) or datetime(1900, 1, 1).date()
-                        start_time, end_time = parse_time_range(time_str)
-
-                        if not start_time: start_time = datetime(1900,1,1,0,0).time()
-                        if not end_time: end_time = datetime(1900,1,1,0,0).time()
-
-                        cursor.execute("""
-                            INSERT INTO ExamSchedule
-                            (type, course_code, section, date, start_time, end_time, room_no, dept, student_id)
-                            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
-                        """, (
-                            exam_type,
-                            course_code,
-                            section,
-                            exam_date,
-                            start_time,
-                            end_time,
-                            room,
-                            "N/A",
-                            student_id
-                        ))
-                print(f"✅ Finished {pdf_path}")
-                print("-"*50)
-        except Exception as e:
-                    print(f"❌ Skipping {pdf_path} due to error: {e}")
-                    print("-"*50)
-
-conn.commit()
-cursor.close()
-conn.close()
-print("✅ All PDFs processed!")
+                student_id = safe_get(header_map, row, "id")
+                section    = safe_get(header_map, row, "section")
+                date_str   = safe_get(header_map, row, "date")
+                time_str   = safe_get(header_map, row, "time")
+                room       = safe_get(header_map, row, "room")
+                # print(student_id, section, date_str, time_str,room)
+
+                exam_date = parse_date(date_str) or datetime(1900, 1, 1).date()
+                start_time, end_time = parse_time_range(time_str)
+
+                if not start_time: start_time = datetime(1900,1,1,0,0).time()
+                if not end_time: end_time = datetime(1900,1,1,0,0).time()
+
+                rows.append((
+                    exam_type,
+                    course_code,
+                    section,
+                    exam_date,
+                    start_time,
+                    end_time,
+                    room,
+                    "N/A",
+                    student_id
+                ))
+    return rows
+
+
+def find_special_pdfs():
+    """(pdf_path, (exam_type, course_code)) for every per-course exam PDF."""
+    found = []
+    for root, dirs, files in os.walk(base_folder):
+        for filename in files:
+            if not filename.lower().endswith(".pdf"):
+                continue
+            # skip if filename contains mid, final, exam, or schedule
+            if any(sub in filename.lower() for sub in ["mid", "final", "exam", "schedule"]):
+                continue
+
+            course_code = filename[:6]
+            exam_type = os.path.basename(root) or "N/A"
+            found.append((os.path.join(root, filename), (exam_type, course_code)))
+    return found
+
+
+def main():
+    conn = mysql.connector.connect(**db_config)
+
+    manifest = PdfManifest(conn, base_folder, parser_version).load()
+    all_pdfs = find_special_pdfs()
+    pdfs = manifest.filter(all_pdfs)
+    manifest.save()
+    print(f"{len(all_pdfs) - len(pdfs)} of {len(all_pdfs)} PDFs unchanged {manifest.stats}")
+    print(f"Processing {len(pdfs)} PDFs with {workers} workers")
+
+    # Files are parsed in parallel, each one comes back here and replaces
+    # only its own rows, together with its manifest entry, in one transaction
+    def store(pdf_path, context, rows):
+        source_file = manifest.key(pdf_path)
+        with BulkWriter(conn, "ExamSchedule", exam_columns,
+                        replace_where=("source_file = %s", (source_file,))) as exam_writer:
+            for row in rows:
+                exam_writer.add(row + (source_file,))
+            manifest.record(exam_writer.cursor, pdf_path, len(rows))
+
+    stored, skipped = ingest(pdfs, parse_special_pages, store, workers=workers)
+
+    print(f"\n{stored} PDFs ingested, {skipped} skipped")
+    if stored:
+        rebuild_student_exams(conn)
+        bump_table_version(conn, "ExamSchedule")
+    conn.close()
+    print("✅ All PDFs processed!")
+
+
+if __name__ == "__main__":
+    main()
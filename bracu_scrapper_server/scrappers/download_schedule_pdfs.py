@@ -3,60 +3,86 @@ import cloudscraper
 import os
 import time
 import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from crawler import Crawler, backoff_delay, RETRY_STATUSES, TIMEOUT
+from crawl_state import CrawlState
+from pdf_manifest import file_sha256
+import scrape_metrics
 
 # Base folder to save PDFs
 base_folder = "../exam schedule pdfs"
-os.makedirs(base_folder, exist_ok=True)
 
-# Initialize cloudscraper
-scraper = cloudscraper.create_scraper()
+db_config = {
+    "host": "localhost",
+    "user": "root",
+    "password": "",
+    "database": "bracu_info"
+}
 
 # Maximum number of retries
 MAX_RETRIES = 5
-RETRY_DELAY = 3
+MAX_DOWNLOADS = 4             # files downloaded at the same time
+CHUNK_BYTES = 64 * 1024       # streamed to disk in chunks of this size
+PART_SUFFIX = ".part"         # unfinished downloads, resumed with a Range request on the next attempt
+VALIDATOR_SUFFIX = ".validator"   # next to a .part file, the ETag / Last-Modified its bytes came from
 
-def fetch_and_download_exam_schedule_pdfs():
+
+class IncompleteDownload(Exception):
+    pass
+
+
+def find_pdf_links(conn):
+    """(url, folder_path) for every embedded link in the exam schedule announcements."""
+    cursor = conn.cursor(dictionary=True)
+
+    # Run query
+    query = "SELECT title, message FROM Announcements WHERE title LIKE %s"
+    cursor.execute(query, ["%exam schedule%"])
+
+    links = []
+    for row in cursor.fetchall():
+        title = row["title"]
+        message = row["message"]
+
+        # Determine folder name from title
+        folder_name = get_folder_name_from_title(title)
+        full_folder_path = os.path.join(base_folder, folder_name)
+
+        if "Embedded Page Links :" in message:
+            content_after = message.split("Embedded Page Links :", 1)[1].strip()
+            urls = [url.strip() for url in content_after.splitlines() if url.strip()]
+            for url in urls:
+                links.append((url, full_folder_path))
+        else:
+            print(f"No Embedded Page Links found in message: {title}")
+    cursor.close()
+    return links
+
+
+def fetch_and_download_exam_schedule_pdfs(session_factory=cloudscraper.create_scraper):
+    conn = None
+    os.makedirs(base_folder, exist_ok=True)
     try:
         # Connect to MySQL
-        conn = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="",
-            database="bracu_info"
-        )
-        cursor = conn.cursor(dictionary=True)
-
-        # Run query
-        query = "SELECT title, message FROM Announcements WHERE title LIKE %s"
-        cursor.execute(query, ["%exam schedule%"])
-
-        # Fetch results
-        results = cursor.fetchall()
-        for row in results:
-            title = row["title"]
-            message = row["message"]
-
-            # Determine folder name from title
-            folder_name = get_folder_name_from_title(title)
-            full_folder_path = os.path.join(base_folder, folder_name)
-            os.makedirs(full_folder_path, exist_ok=True)
-
-            if "Embedded Page Links :" in message:
-                content_after = message.split("Embedded Page Links :", 1)[1].strip()
-                urls = [url.strip() for url in content_after.splitlines() if url.strip()]
-                for url in urls:
-                    download_pdf_with_retry(url, full_folder_path)
-            else:
-                print(f"No Embedded Page Links found in message: {title}")
+        conn = mysql.connector.connect(**db_config)
+
+        links = find_pdf_links(conn)
+        state = CrawlState(conn).load_urls(url for url, _ in links)
+        crawler = Crawler(session_factory=session_factory)
+
+        results = download_all(crawler, links, state)
+        state.save()
+        print(f"Downloads finished: {dict(results)}")
 
     except mysql.connector.Error as err:
         print(f"Error: {err}")
 
     finally:
-        if conn.is_connected():
-            cursor.close()
+        if conn is not None and conn.is_connected():
             conn.close()
 
+
 def get_folder_name_from_title(title):
     # Detect exam type
     title_lower = title.lower()
@@ -73,31 +99,129 @@ def get_folder_name_from_title(title):
 
     return f"{exam_type} {semester}".strip()
 
-def download_pdf_with_retry(url, folder_path):
+
+def download_all(crawler, links, state=None, max_downloads=MAX_DOWNLOADS):
+    """Download (url, folder_path) pairs on a thread pool, returns a Counter of outcomes."""
+    results = Counter()
+    with ThreadPoolExecutor(max_workers=max_downloads) as pool:
+        futures = {scrape_metrics.submit(pool, download_pdf_with_retry, crawler, url, folder_path, state): url
+                   for url, folder_path in links}
+        for future in as_completed(futures):
+            try:
+                results[future.result()] += 1
+            except Exception as e:
+                print(f"Error downloading {futures[future]}: {e}")
+                results["failed"] += 1
+    return results
+
+
+def read_validator(part):
+    """The validator saved next to `part`, None when there is none."""
+    try:
+        with open(part + VALIDATOR_SUFFIX) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def save_validator(part, validator):
+    """Remember which version of the file `part` holds, or forget it when the server sent no validator."""
+    if validator:
+        with open(part + VALIDATOR_SUFFIX, "w") as f:
+            f.write(validator)
+    elif os.path.exists(part + VALIDATOR_SUFFIX):
+        os.remove(part + VALIDATOR_SUFFIX)
+
+
+def remove_part(part):
+    """Delete a .part file and its saved validator."""
+    for path in (part, part + VALIDATOR_SUFFIX):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def download_pdf_with_retry(crawler, url, folder_path, state=None):
+    """Stream `url` into `folder_path`, returns "downloaded", "unchanged", "missing" or "failed".
+
+    The body goes to `<name>.part` and is renamed over the real file only
+    once it is complete, so a reader never sees half a PDF. A leftover
+    .part file is resumed with a Range request plus If-Range, using the
+    validator saved next to it, even by an earlier run; a .part file
+    without a validator is thrown away. With a `CrawlState`, a file
+    that is already on disk is re-checked with If-None-Match /
+    If-Modified-Since and left alone on a 304.
+    """
+    os.makedirs(folder_path, exist_ok=True)
+    filename = os.path.join(folder_path, url.split("/")[-1])
+    part = filename + PART_SUFFIX
+
     for attempt in range(1, MAX_RETRIES + 1):
+        validator = read_validator(part)
+        if os.path.exists(part) and validator is None:
+            # nothing to tell whether the server still has the file these bytes came from
+            remove_part(part)
+        headers = {}
+        if state is not None and os.path.exists(filename) and not os.path.exists(part):
+            headers.update(state.conditional_headers(url))
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            # only resume if the file is still the one the partial body came from
+            headers["If-Range"] = validator
+
+        crawler.bucket(url).acquire()
+        crawler.count("requests")
+        retry_after = None
         try:
-            response = scraper.get(url)
-            if response.status_code == 404:
-                print(f"404 Not Found: {url}, skipping download.")
-                break  # do not retry on 404
-            response.raise_for_status()  # raise exception for other bad status
-            filename = os.path.join(folder_path, url.split("/")[-1])
-            with open(filename, "wb") as f:
-                f.write(response.content)
+            with crawler.session().get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+                if response.status_code == 404:
+                    print(f"404 Not Found: {url}, skipping download.")
+                    return "missing"  # do not retry on 404
+                if response.status_code == 304:
+                    state.unchanged(url, response)
+                    return "unchanged"
+                if response.status_code == 416:
+                    # the partial file is not a prefix of what the server has now
+                    remove_part(part)
+                    raise IncompleteDownload("range not satisfiable, starting over")
+                if response.status_code in RETRY_STATUSES:
+                    retry_after = response.headers.get("Retry-After")
+                response.raise_for_status()  # raise exception for other bad status
+
+                mode = "ab" if response.status_code == 206 else "wb"
+                if mode == "wb":
+                    # a fresh body, saved before any of it so a later run can resume it
+                    save_validator(part, response.headers.get("ETag") or response.headers.get("Last-Modified"))
+                written = 0
+                with open(part, mode) as f:
+                    for chunk in response.iter_content(CHUNK_BYTES):
+                        f.write(chunk)
+                        written += len(chunk)
+
+                expected = response.headers.get("Content-Length")
+                if expected is not None and written < int(expected):
+                    raise IncompleteDownload(f"got {written} of {expected} bytes")
+
+            os.replace(part, filename)
+            remove_part(part)
+            scrape_metrics.add("pages_fetched")
+            scrape_metrics.add("bytes_fetched", written)
+            if state is not None:
+                state.record(url, response, digest=file_sha256(filename))
             print(f"Downloaded: {filename}")
-            break  # success, exit loop
+            return "downloaded"
         except Exception as e:
-            # Only retry if it's not a 404
-            if "404" in str(e):
-                print(f"404 Error encountered, skipping: {url}")
-                break
             print(f"Attempt {attempt} failed for {url}: {e}")
             if attempt < MAX_RETRIES:
-                print(f"Retrying in {RETRY_DELAY} seconds...")
-                time.sleep(RETRY_DELAY)
-            else:
-                print(f"Failed to download {url} after {MAX_RETRIES} attempts.")
+                delay = backoff_delay(attempt, retry_after)
+                crawler.count("retries")
+                print(f"Retrying in {delay:.1f} seconds...")
+                time.sleep(delay)
+
+    crawler.count("failures")
+    print(f"Failed to download {url} after {MAX_RETRIES} attempts.")
+    return "failed"
+
 
 if __name__ == "__main__":
     fetch_and_download_exam_schedule_pdfs()
-
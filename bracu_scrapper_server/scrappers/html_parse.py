@@ -0,0 +1,121 @@
+"""
+Shared HTML parsing for the scrapers, with a choice of backend.
+
+The scrapers only read a few blocks of each page (the third
+`div.block-content.content`, the `article.node-announcement` teasers, ...),
+so parse_html() is told which selectors will be used and builds only those
+elements and what is inside them:
+
+    page = parse_html(response.text, "div.block-content.content", "span.date-display-single")
+    blocks = page.select("div.block-content.content")
+
+Backends:
+  selectolax   the Lexbor parser finds the blocks in C, only they are turned into BeautifulSoup trees
+  lxml         BeautifulSoup on lxml, with a SoupStrainer so only the blocks are built
+  html.parser  the same on Python's own parser, always available
+
+The result is BeautifulSoup elements whichever backend ran, so the code
+reading them does not change. Only call select()/select_one() on the page
+with selectors that were passed to parse_html().
+"""
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401, optional, BeautifulSoup's fast builder
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:   # optional, see BACKENDS
+    LexborHTMLParser = None
+
+
+# === CONFIG ===
+HTML_BACKEND = "auto"   # "selectolax", "lxml", "html.parser", or "auto" for the fastest one installed
+BACKENDS = ["selectolax", "lxml", "html.parser"]   # fastest first
+
+# tag.class.class, the only selectors the partial parse can build for
+SIMPLE_SELECTOR = re.compile(r"^([a-z][a-z0-9]*)((?:\.[\w-]+)*)$")
+
+
+def available_backends():
+    installed = {"selectolax": LexborHTMLParser is not None, "lxml": lxml is not None, "html.parser": True}
+    return [name for name in BACKENDS if installed[name]]
+
+
+def resolve_backend(backend=None):
+    backend = backend or HTML_BACKEND
+    if backend == "auto":
+        return available_backends()[0]
+    if backend not in available_backends():
+        raise ValueError(f"HTML backend {backend} is not installed, available: {', '.join(available_backends())}")
+    return backend
+
+
+def split_selector(selector):
+    """"div.block-content.content" -> ("div", {"block-content", "content"})."""
+    match = SIMPLE_SELECTOR.match(selector.strip())
+    if match is None:
+        raise ValueError(f"Only tag.class selectors can be parsed partially, got {selector!r}")
+    return match.group(1), set(filter(None, match.group(2).split(".")))
+
+
+def strainer_for(selectors):
+    """SoupStrainer keeping every element a selector matches (and everything inside it).
+
+    It may keep a few extra elements (it sees tag names and classes
+    separately), select() on the result still only returns real matches.
+    """
+    parts = [split_selector(selector) for selector in selectors]
+    names = sorted({name for name, _ in parts})
+    class_sets = [classes for _, classes in parts]
+
+    def has_classes(value):
+        # called per class and with the whole attribute, the whole one is what counts
+        return value is not None and any(classes <= set(value.split()) for classes in class_sets)
+
+    if any(not classes for classes in class_sets):
+        return SoupStrainer(names)
+    return SoupStrainer(names, attrs={"class": has_classes})
+
+
+class Fragments:
+    """What selectolax found: the matches of each selector as BeautifulSoup elements."""
+
+    def __init__(self, matches):
+        self.matches = matches
+
+    def select(self, selector):
+        return self.matches[selector]
+
+    def select_one(self, selector):
+        found = self.matches[selector]
+        return found[0] if found else None
+
+
+def _selectolax_fragments(markup, selectors):
+    tree = LexborHTMLParser(markup)
+    matches = {}
+    for selector in selectors:
+        nodes = tree.css(selector)
+        if not nodes:
+            matches[selector] = []
+            continue
+        # one small parse per selector, each match is a top level element of it
+        soup = BeautifulSoup("".join(node.html for node in nodes), "html.parser")
+        matches[selector] = soup.find_all(recursive=False)
+    return Fragments(matches)
+
+
+def parse_html(markup, *selectors, backend=None):
+    """A page to call select()/select_one() on, built only for `selectors` (the whole page without any)."""
+    backend = resolve_backend(backend)
+    if not selectors:
+        # the whole tree is needed, selectolax cannot give BeautifulSoup one
+        return BeautifulSoup(markup, "lxml" if lxml is not None and backend != "html.parser" else "html.parser")
+    if backend == "selectolax":
+        return _selectolax_fragments(markup, selectors)
+    return BeautifulSoup(markup, backend, parse_only=strainer_for(selectors))
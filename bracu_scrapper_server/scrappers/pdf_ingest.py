@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pdfplumber
+
+import scrape_metrics
+
+# === CONFIG ===
+WORKERS = os.cpu_count() or 2
+TASK_TIMEOUT = 300                  # seconds one file (or page range) may take before it is skipped
+LARGE_FILE_BYTES = 2 * 1024 * 1024  # files bigger than this are split into page ranges
+PAGES_PER_TASK = 10
+START_METHOD = "spawn"              # workers start clean, forking the scheduler's threads and locks could deadlock them
+
+
+class TaskTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise TaskTimeout()
+
+
+def _run_task(parse_pages, pdf_path, context, page_numbers, timeout):
+    """Runs in a worker process, returns (rows, seconds). SIGALRM stops a stuck pdfplumber call where it is available."""
+    use_alarm = hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.alarm(timeout)
+    start = time.perf_counter()
+    try:
+        return parse_pages(pdf_path, context, page_numbers), time.perf_counter() - start
+    except TaskTimeout:
+        raise TimeoutError(f"took longer than {timeout}s")
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+
+
+def split_tasks(pdf_path, pages_per_task=PAGES_PER_TASK):
+    """Page ranges for one file, or [None] (whole file) when it is small."""
+    if os.path.getsize(pdf_path) <= LARGE_FILE_BYTES:
+        return [None]
+    with pdfplumber.open(pdf_path) as pdf:
+        total_pages = len(pdf.pages)
+    return [range(start, min(start + pages_per_task, total_pages))
+            for start in range(0, total_pages, pages_per_task)]
+
+
+def ingest(files, parse_pages, store, workers=WORKERS, timeout=TASK_TIMEOUT):
+    """Parse PDFs on a process pool and hand each file's rows to `store` in this process.
+
+    `files` is a list of (pdf_path, context). `parse_pages(pdf_path, context,
+    page_numbers)` must be a module level function (it is pickled, and its
+    module imported again in every spawned worker) that returns a list of
+    rows; page_numbers is None for the whole file.
+    `store(pdf_path, context, rows)` is called once per file, after all of
+    its page ranges are back, so a single DB writer sees whole files; a
+    file whose parse or store raises is counted as skipped.
+
+    Returns (files stored, files skipped).
+    """
+    stored = skipped = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(START_METHOD)) as pool:
+        futures = {}
+        pending = {}
+        for pdf_path, context in files:
+            try:
+                tasks = split_tasks(pdf_path)
+            except Exception as e:
+                # counting pages opens the file here, a corrupt PDF must not stop the others
+                print(f"❌ Skipping {pdf_path}, could not read its pages: {e}")
+                skipped += 1
+                continue
+            pending[pdf_path] = {"context": context, "left": len(tasks), "rows": {}, "failed": False}
+            for index, page_numbers in enumerate(tasks):
+                future = pool.submit(_run_task, parse_pages, pdf_path, context, page_numbers, timeout)
+                futures[future] = (pdf_path, index)
+
+        for future in as_completed(futures):
+            pdf_path, index = futures[future]
+            state = pending[pdf_path]
+            state["left"] -= 1
+            try:
+                state["rows"][index], seconds = future.result()
+                scrape_metrics.add("parse_seconds", seconds)
+            except Exception as e:
+                print(f"❌ Skipping {pdf_path} due to error: {e}")
+                state["failed"] = True
+
+            if state["left"] == 0:
+                if state["failed"]:
+                    skipped += 1
+                else:
+                    rows = [row for i in sorted(state["rows"]) for row in state["rows"][i]]
+                    try:
+                        store(pdf_path, state["context"], rows)
+                        stored += 1
+                        print(f"✅ Finished {pdf_path} ({len(rows)} rows)")
+                    except Exception as e:
+                        print(f"❌ Skipping {pdf_path}, storing its rows failed: {e}")
+                        skipped += 1
+                del pending[pdf_path]
+
+    return stored, skipped
@@ -0,0 +1,94 @@
+import hashlib
+import os
+
+# === CONFIG ===
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PdfManifest:
+    """What each exam PDF looked like when it was last ingested, backed by the PdfManifest table.
+
+    `changed()` compares size and mtime first and only hashes files whose
+    stat moved, so a rerun over an untouched folder reads no PDF bytes. A
+    file that was touched but hashes the same is skipped too, its new mtime
+    is saved by `save()`. Bumping `parser_version` re-ingests everything.
+    """
+
+    def __init__(self, conn, base_folder, parser_version):
+        self.conn = conn
+        self.base_folder = base_folder
+        self.parser_version = parser_version
+        self.entries = {}
+        self.pending = {}
+        self.touched = []
+        self.stats = {"unchanged": 0, "same_hash": 0, "changed": 0}
+
+    def key(self, pdf_path):
+        """Path relative to the base folder, so the manifest survives a different working directory."""
+        return os.path.relpath(pdf_path, self.base_folder).replace(os.sep, "/")
+
+    def load(self):
+        cursor = self.conn.cursor(dictionary=True)
+        cursor.execute("SELECT source_file, sha256, size, mtime, parser_version FROM PdfManifest")
+        for row in cursor.fetchall():
+            self.entries[row["source_file"]] = row
+        cursor.close()
+        print(f"Loaded manifest for {len(self.entries)} PDFs")
+        return self
+
+    def changed(self, pdf_path):
+        key = self.key(pdf_path)
+        stat = os.stat(pdf_path)
+        entry = self.entries.get(key)
+        same_version = entry is not None and entry["parser_version"] == self.parser_version
+
+        if same_version and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            self.stats["unchanged"] += 1
+            return False
+
+        sha256 = file_sha256(pdf_path)
+        if same_version and entry["sha256"] == sha256:
+            self.stats["same_hash"] += 1
+            self.touched.append((stat.st_size, stat.st_mtime, key))
+            return False
+
+        self.stats["changed"] += 1
+        self.pending[key] = (sha256, stat.st_size, stat.st_mtime)
+        return True
+
+    def filter(self, files):
+        """Keep the (pdf_path, context) pairs whose file changed since it was ingested."""
+        return [(pdf_path, context) for pdf_path, context in files if self.changed(pdf_path)]
+
+    def record(self, cursor, pdf_path, row_count):
+        """Upsert the manifest row on the writer's cursor, so it commits together with the file's rows."""
+        key = self.key(pdf_path)
+        sha256, size, mtime = self.pending.pop(key)
+        cursor.execute("""
+            INSERT INTO PdfManifest (source_file, sha256, size, mtime, parser_version, row_count)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                sha256 = VALUES(sha256),
+                size = VALUES(size),
+                mtime = VALUES(mtime),
+                parser_version = VALUES(parser_version),
+                row_count = VALUES(row_count)
+        """, (key, sha256, size, mtime, self.parser_version, row_count))
+
+    def save(self):
+        """Store the new size/mtime of files that were touched but not changed."""
+        if not self.touched:
+            return
+        cursor = self.conn.cursor()
+        cursor.executemany("UPDATE PdfManifest SET size = %s, mtime = %s WHERE source_file = %s", self.touched)
+        self.conn.commit()
+        cursor.close()
+        self.touched = []
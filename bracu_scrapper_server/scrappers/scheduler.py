@@ -0,0 +1,271 @@
+"""
+Long-running scheduler for the scrapers.
+
+    python scheduler.py                 # run forever
+    python scheduler.py --once          # run whatever is due, then exit
+    python scheduler.py --run news      # run one job now
+
+Each job is a scraper's main() with its own interval, or run each time
+the job it depends on finishes (the exam ingesters after the PDF
+download, so they never see half a folder). A job never overlaps
+itself: inside this process it is skipped while still running, and a MySQL
+named lock keeps a second scheduler (or a cron copy) from starting it too.
+At most MAX_CONCURRENT_JOBS run at once. Last runs and durations are kept
+in the ScraperRuns table, so a restart does not re-run everything, and the
+counters each job reports (scrape_metrics.py) are added to ScraperMetrics.
+"""
+import argparse
+import importlib
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import mysql.connector
+
+import scrape_metrics
+
+# === CONFIG ===
+db_config = {
+    "host": "localhost",
+    "user": "root",
+    "password": "",  # your MySQL password
+    "database": "bracu_info"
+}
+MAX_CONCURRENT_JOBS = 2
+TICK_SECONDS = 30     # how often due jobs are checked
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+
+
+class Job:
+    """A scraper run every `every` seconds, or, with `after`, each time that job finishes."""
+
+    def __init__(self, name, module, every=None, function="main", after=None):
+        self.name = name
+        self.module = module
+        self.function = function
+        self.every = every
+        self.after = after
+
+    def load(self):
+        """Import the scraper when the job first runs, so one missing dependency only breaks its own job."""
+        return getattr(importlib.import_module(self.module), self.function)
+
+
+JOBS = [
+    Job("announcements", "db_scrape_announcements", every=HOUR),
+    Job("news", "db_scrape_news", every=6 * HOUR),
+    Job("academic_dates", "db_scrape_academic_dates", every=6 * HOUR),   # rss.xml, see TODO.txt
+    Job("exam_pdfs", "download_schedule_pdfs", every=6 * HOUR, function="fetch_and_download_exam_schedule_pdfs"),
+    # ingested once the download is done, so they never read a folder that is still filling up
+    Job("general_exam_schedule", "db_scrape_general_exam_schedule", after="exam_pdfs"),
+    Job("special_exam_schedule", "db_scrape_special_exam_schedule", after="exam_pdfs"),
+    Job("transport", "db_scrape_transport", every=DAY),
+    Job("contact_info", "db_scrape_contact_info", every=WEEK),
+    Job("people", "db_scrape_people_info", every=WEEK),
+]
+
+
+def load_last_started(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT job_name, last_started FROM ScraperRuns")
+    last_started = {name: started for name, started in cursor.fetchall()}
+    cursor.close()
+    return last_started
+
+
+def record_start(conn, job, started):
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO ScraperRuns (job_name, last_started, last_status)
+        VALUES (%s, %s, 'running')
+        ON DUPLICATE KEY UPDATE last_started = VALUES(last_started), last_status = 'running'
+    """, (job.name, started))
+    conn.commit()
+    cursor.close()
+
+
+def record_finish(conn, job, status, duration, error):
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE ScraperRuns
+        SET last_finished = %s, last_status = %s, last_duration_sec = %s, last_error = %s,
+            runs = runs + 1, failures = failures + %s
+        WHERE job_name = %s
+    """, (datetime.now(), status, duration, error, int(status == "failed"), job.name))
+    conn.commit()
+    cursor.close()
+
+
+class Scheduler:
+    def __init__(self, jobs=JOBS, max_concurrent=MAX_CONCURRENT_JOBS):
+        self.jobs = {job.name: job for job in jobs}
+        self.max_concurrent = max_concurrent
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrent)
+        self.running = set()
+        self.last_started = {}
+        self.metrics = {name: {"runs": 0, "failures": 0, "skipped": 0, "last_duration": None,
+                               "total_duration": 0.0, "max_duration": 0.0} for name in self.jobs}
+        self._lock = threading.Lock()
+
+    def load_state(self):
+        conn = mysql.connector.connect(**db_config)
+        self.last_started = load_last_started(conn)
+        conn.close()
+        print(f"Loaded last runs for {len(self.last_started)} jobs")
+
+    def due(self, now):
+        due = []
+        for job in self.jobs.values():
+            if job.every is None:
+                continue
+            last = self.last_started.get(job.name)
+            if last is None or (now - last).total_seconds() >= job.every:
+                due.append(job)
+        return due
+
+    def submit(self, job):
+        """Queue `job` unless it is already queued or running, returns the future or None."""
+        with self._lock:
+            if job.name in self.running:
+                return None
+            self.running.add(job.name)
+            # counted from when it was queued, so a slow job does not drift its cadence
+            self.last_started[job.name] = datetime.now()
+        return self.pool.submit(self.run, job)
+
+    def run(self, job):
+        """Run `job`, then queue the jobs that run after it. Returns their futures."""
+        ran = False
+        try:
+            conn = mysql.connector.connect(**db_config)
+            try:
+                ran = self.run_locked(conn, job)
+            finally:
+                conn.close()
+        except mysql.connector.Error as e:
+            print(f"[{job.name}] could not record the run: {e}")
+        finally:
+            with self._lock:
+                self.running.discard(job.name)
+
+        # whether it failed or not: downloaded PDFs are only renamed into place once complete
+        if not ran:
+            return []
+        followers = []
+        for follower in self.jobs.values():
+            if follower.after != job.name:
+                continue
+            try:
+                future = self.submit(follower)
+            except RuntimeError:   # pool already shut down
+                print(f"[{follower.name}] not started, the scheduler is stopping")
+                continue
+            if future is not None:
+                followers.append(future)
+        return followers
+
+    def run_locked(self, conn, job):
+        # Named locks are per server, this also stops a second scheduler running the same job.
+        # They belong to the connection, so closing it releases the lock if anything below fails.
+        lock_name = f"scraper:{job.name}"
+        cursor = conn.cursor()
+        cursor.execute("SELECT GET_LOCK(%s, 0)", (lock_name,))
+        if cursor.fetchone()[0] != 1:
+            cursor.close()
+            print(f"[{job.name}] already running elsewhere, skipped")
+            self.count(job, "skipped")
+            return False
+
+        record_start(conn, job, datetime.now())
+        print(f"[{job.name}] started")
+        start = time.perf_counter()
+        status, error = "ok", None
+        # pages, bytes, parse time and rows the scraper reports are counted under this job
+        token = scrape_metrics.current_job.set(job.name)
+        try:
+            job.load()()
+        except BaseException as e:   # SystemExit included, a scraper must not stop the scheduler
+            status, error = "failed", "".join(traceback.format_exception_only(type(e), e)).strip()
+            traceback.print_exc()
+        finally:
+            scrape_metrics.current_job.reset(token)
+        duration = time.perf_counter() - start
+
+        record_finish(conn, job, status, duration, error)
+        scrape_metrics.save(conn, job.name)
+        self.observe(job, status, duration)
+        print(f"[{job.name}] {status} in {duration:.1f}s")
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (lock_name,))
+        cursor.fetchone()
+        cursor.close()
+        return True
+
+    def count(self, job, name):
+        with self._lock:
+            self.metrics[job.name][name] += 1
+
+    def observe(self, job, status, duration):
+        with self._lock:
+            m = self.metrics[job.name]
+            m["runs"] += 1
+            m["failures"] += int(status == "failed")
+            m["last_duration"] = round(duration, 3)
+            m["total_duration"] += duration
+            m["max_duration"] = max(m["max_duration"], duration)
+
+    def report(self):
+        with self._lock:
+            for name, m in self.metrics.items():
+                if m["runs"]:
+                    avg = m["total_duration"] / m["runs"]
+                    print(f"  {name:24} runs={m['runs']} failures={m['failures']} skipped={m['skipped']} "
+                          f"last={m['last_duration']}s avg={avg:.1f}s max={m['max_duration']:.1f}s")
+
+    def wait(self, futures):
+        """Block until `futures` and the jobs they queued after themselves are done."""
+        for future in futures:
+            self.wait(future.result())
+
+    def run_pending(self):
+        return [f for f in (self.submit(job) for job in self.due(datetime.now())) if f is not None]
+
+    def forever(self, tick=TICK_SECONDS):
+        print(f"Scheduler started with {len(self.jobs)} jobs, {self.max_concurrent} at a time")
+        last_report = time.monotonic()
+        try:
+            while True:
+                self.run_pending()
+                if time.monotonic() - last_report >= HOUR:
+                    print("Job durations:")
+                    self.report()
+                    last_report = time.monotonic()
+                time.sleep(tick)
+        except KeyboardInterrupt:
+            print("Stopping, waiting for running jobs...")
+        finally:
+            self.pool.shutdown(wait=True)
+            self.report()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="Run the jobs that are due and exit")
+    parser.add_argument("--run", metavar="JOB", help="Run one job now and exit, one of: " + ", ".join(j.name for j in JOBS))
+    args = parser.parse_args()
+
+    scheduler = Scheduler()
+    if args.run:
+        scheduler.wait([scheduler.submit(scheduler.jobs[args.run])])
+        scheduler.report()
+    elif args.once:
+        scheduler.load_state()
+        scheduler.wait(scheduler.run_pending())
+        scheduler.report()
+    else:
+        scheduler.load_state()
+        scheduler.forever()
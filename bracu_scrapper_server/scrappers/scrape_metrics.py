@@ -0,0 +1,51 @@
+"""
+Counters the scrapers report while they run: pages fetched, bytes, parse time and rows written.
+
+The scheduler sets `current_job` before running a job and calls `save()`
+when it finishes, which adds the job's totals to the ScraperMetrics table;
+the API serves them on /metrics next to its own. Worker threads started by
+a job must be submitted with `submit()` so they report under the same job.
+Outside the scheduler (a scraper run by hand) nothing is collected.
+"""
+import contextvars
+import threading
+
+current_job = contextvars.ContextVar("scraper_job", default=None)
+
+_totals = {}   # (job, metric, table) -> value
+_lock = threading.Lock()
+
+
+def add(metric, value=1, table=""):
+    job = current_job.get()
+    if job is None:
+        return
+    key = (job, metric, table)
+    with _lock:
+        _totals[key] = _totals.get(key, 0) + value
+
+
+def submit(pool, fn, *args):
+    """pool.submit() that keeps the caller's job for counters added inside `fn`."""
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+def take(job):
+    """Remove and return {(metric, table): value} collected for `job`."""
+    with _lock:
+        keys = [key for key in _totals if key[0] == job]
+        return {(metric, table): _totals.pop((job, metric, table)) for _, metric, table in keys}
+
+
+def save(conn, job):
+    totals = take(job)
+    if not totals:
+        return
+    cursor = conn.cursor()
+    cursor.executemany("""
+        INSERT INTO ScraperMetrics (job_name, metric, table_name, value)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE value = value + VALUES(value)
+    """, [(job, metric, table, value) for (metric, table), value in totals.items()])
+    conn.commit()
+    cursor.close()
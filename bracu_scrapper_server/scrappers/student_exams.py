@@ -0,0 +1,18 @@
+def rebuild_student_exams(conn):
+    """Refill StudentExams from ExamSchedule, in one transaction so the API never sees it half empty.
+
+    Call this after an exam ingester has committed, before bumping ExamSchedule's version.
+    """
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM StudentExams")
+    cursor.execute("""
+        INSERT INTO StudentExams (student_id, term, course_code, section, date, start_time, end_time, room_no, dept, exam_id)
+        SELECT TRIM(student_id), type, course_code, section, date, start_time, end_time, room_no, dept, id
+        FROM ExamSchedule
+        WHERE student_id <> 'N/A' AND TRIM(student_id) <> ''
+    """)
+    rows = cursor.rowcount
+    conn.commit()
+    cursor.close()
+    print(f"StudentExams: rebuilt with {rows} rows")
+    return rows
@@ -0,0 +1,13 @@
+def bump_table_version(conn, table_name):
+    """Tell the API that `table_name` changed so its cached responses are dropped.
+
+    Call this once a scraper has finished (and committed) its writes.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO TableVersions (table_name, version)
+        VALUES (%s, 1)
+        ON DUPLICATE KEY UPDATE version = version + 1
+    """, (table_name,))
+    conn.commit()
+    cursor.close()
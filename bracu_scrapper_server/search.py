@@ -0,0 +1,79 @@
+import html
+import re
+
+
+# === CONFIG ===
+SNIPPET_WIDTH = 200       # characters of context returned around the first hit
+MAX_SEARCH_OFFSET = 500   # relevance pages deeper than this are not worth ranking
+
+# source name -> SELECT over its FULLTEXT index, every branch returns the same columns
+SEARCH_SOURCES = {
+    "announcements": """
+        SELECT 'announcements' AS source, id, title, url, message AS body, published_date,
+               MATCH(title, message) AGAINST (:q IN NATURAL LANGUAGE MODE) AS score
+        FROM Announcements
+        WHERE MATCH(title, message) AGAINST (:q IN NATURAL LANGUAGE MODE)""",
+    "news": """
+        SELECT 'news' AS source, id, title, url, message AS body, published_date,
+               MATCH(title, message) AGAINST (:q IN NATURAL LANGUAGE MODE) AS score
+        FROM News
+        WHERE MATCH(title, message) AGAINST (:q IN NATURAL LANGUAGE MODE)""",
+    "people": """
+        SELECT 'people' AS source, id, NULL AS title, url, about AS body, NULL AS published_date,
+               MATCH(about) AGAINST (:q IN NATURAL LANGUAGE MODE) AS score
+        FROM People
+        WHERE MATCH(about) AGAINST (:q IN NATURAL LANGUAGE MODE)""",
+}
+
+
+def parse_sources(sources):
+    """Turn "news,people" into a list of known source names, all of them when empty."""
+    if not sources:
+        return list(SEARCH_SOURCES)
+    names = [name.strip().lower() for name in sources.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SEARCH_SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown source(s): {', '.join(unknown)}")
+    return names
+
+
+def build_search_sql(source_names):
+    """One ranked query over every requested source, MySQL merges the results."""
+    union = " UNION ALL ".join(SEARCH_SOURCES[name] for name in source_names)
+    return f"SELECT * FROM ({union}) AS hits ORDER BY score DESC, source ASC, id DESC LIMIT :page_limit OFFSET :offset"
+
+
+def query_terms(q):
+    return [term for term in re.findall(r"\w+", q.lower()) if len(term) > 1]
+
+
+def make_snippet(text, terms, width=SNIPPET_WIDTH):
+    """Cut `width` characters around the first matching term and wrap every hit in <mark>.
+
+    The text itself is HTML escaped so the only markup in the result is ours.
+    """
+    if not text:
+        return ""
+
+    text = " ".join(text.split())
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE) if terms else None
+
+    match = pattern.search(text) if pattern else None
+    start = max(0, match.start() - width // 3) if match else 0
+    end = min(len(text), start + width)
+    snippet = text[start:end]
+
+    parts = []
+    last = 0
+    if pattern:
+        for m in pattern.finditer(snippet):
+            parts.append(html.escape(snippet[last:m.start()]))
+            parts.append(f"<mark>{html.escape(m.group(0))}</mark>")
+            last = m.end()
+    parts.append(html.escape(snippet[last:]))
+
+    if start > 0:
+        parts.insert(0, "…")
+    if end < len(text):
+        parts.append("…")
+    return "".join(parts)
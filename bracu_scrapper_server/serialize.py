@@ -0,0 +1,95 @@
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:   # optional, falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:   # optional, only JSON is offered without it
+    msgpack = None
+
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+
+def format_time(seconds):
+    """MySQL TIME (a timedelta, or seconds) as HH:MM:SS."""
+    if seconds is None:
+        return None
+
+    if isinstance(seconds, timedelta):
+        td = seconds
+    else:
+        td = timedelta(seconds=float(seconds))
+
+    # Format into HH:MM:SS
+    total_seconds = int(td.total_seconds())
+    hours, remainder = divmod(total_seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def _default(value):
+    """Types the encoder does not know. TIME columns are formatted here, while encoding, not per row beforehand."""
+    if isinstance(value, timedelta):
+        return format_time(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date, time)):   # not reached with orjson, it does these itself
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.decode()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def dumps(value):
+    """Serialize rows straight from the database to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def dumps_msgpack(value):
+    """Same values as dumps(): dates as ISO strings, TIME as HH:MM:SS, JSON columns as arrays/maps."""
+    return msgpack.packb(value, default=_default)
+
+
+def encode(value, media_type=JSON_MEDIA_TYPE):
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return dumps_msgpack(value)
+    return dumps(value)
+
+
+def loads(raw):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def parse_json_columns(rows, *columns):
+    """Decode JSON stored in text columns, a value that does not parse becomes None."""
+    for row in rows:
+        for column in columns:
+            raw = row.get(column)
+            if raw:
+                try:
+                    row[column] = loads(raw)
+                except ValueError:
+                    row[column] = None
+    return rows
+
+
+class FastJSONResponse(Response):
+    """JSON response that skips FastAPI's jsonable_encoder pass when given bytes from dumps()."""
+
+    media_type = JSON_MEDIA_TYPE
+
+    def render(self, content):
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
@@ -0,0 +1,98 @@
+from fastapi import HTTPException
+
+from pagination import decode_cursor, encode_cursor, keyset_after
+
+
+# === CONFIG ===
+SYNC_BATCH = 500   # changed rows per table per response, the client calls again while has_more is true
+
+# name the client uses -> table, every table has updated_at and a tombstone trigger (migration 0009)
+SYNC_TABLES = {
+    "announcements": "Announcements",
+    "news": "News",
+    "academic_dates": "AcademicDates",
+}
+
+CHANGE_KEYS = ["updated_at", "id"]
+TOMBSTONE_KEYS = ["deleted_at", "row_id"]
+INVALID_SINCE = "Invalid since, pass next_since from the previous /sync response"
+
+
+def parse_tables(tables):
+    """Turn "news,announcements" into a list of known names, all of them when empty."""
+    if not tables:
+        return list(SYNC_TABLES)
+    names = [name.strip().lower() for name in tables.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SYNC_TABLES]
+    if unknown:
+        raise ValueError(f"Unknown table(s): {', '.join(unknown)}")
+    return names
+
+
+def decode_since(token):
+    """Per-table watermarks from the previous response's next_since, {} for a first sync."""
+    if not token:
+        return {}
+    try:
+        decoded = decode_cursor(token, [])
+    except HTTPException:
+        raise HTTPException(status_code=400, detail=INVALID_SINCE)
+
+    watermarks = {}
+    for name, mark in decoded.items():
+        if name not in SYNC_TABLES:
+            continue
+        if (not isinstance(mark, dict)
+                or ("updated_at" in mark) != ("id" in mark)
+                or ("deleted_at" in mark) != ("row_id" in mark)):
+            raise HTTPException(status_code=400, detail=INVALID_SINCE)
+        watermarks[name] = mark
+    return watermarks
+
+
+def encode_since(watermarks):
+    return encode_cursor(watermarks, list(watermarks))
+
+
+def changes_query(name, watermark):
+    """Rows inserted or updated after the watermark, oldest change first."""
+    sql = f"SELECT * FROM {SYNC_TABLES[name]}"
+    params = {"limit": SYNC_BATCH + 1}
+    if watermark and "updated_at" in watermark:
+        condition, keyset_params = keyset_after(watermark, CHANGE_KEYS, prefix="since")
+        sql += " WHERE " + condition
+        params.update(keyset_params)
+    return sql + " ORDER BY updated_at, id LIMIT :limit", params
+
+
+def tombstones_query(name, watermark):
+    """Ids deleted after the watermark.
+
+    A first sync has nothing to delete, it only fetches the newest tombstone
+    so the next sync starts after it (see `first_sync`).
+    """
+    sql = "SELECT row_id, deleted_at FROM SyncTombstones WHERE table_name = :table_name"
+    params = {"table_name": SYNC_TABLES[name], "limit": SYNC_BATCH + 1}
+    if first_sync(watermark):
+        return sql + " ORDER BY deleted_at DESC, row_id DESC LIMIT 1", params
+    if "deleted_at" in watermark:
+        condition, keyset_params = keyset_after(watermark, TOMBSTONE_KEYS, prefix="since")
+        sql += " AND " + condition
+        params.update(keyset_params)
+    return sql + " ORDER BY deleted_at, row_id LIMIT :limit", params
+
+
+def first_sync(watermark):
+    return not watermark
+
+
+def advance(watermark, changed, deleted):
+    """The watermark after this batch, unchanged parts are carried over."""
+    watermark = dict(watermark or {})
+    if changed:
+        watermark["updated_at"] = str(changed[-1]["updated_at"])
+        watermark["id"] = changed[-1]["id"]
+    if deleted:
+        watermark["deleted_at"] = str(deleted[-1]["deleted_at"])
+        watermark["row_id"] = deleted[-1]["row_id"]
+    return watermark
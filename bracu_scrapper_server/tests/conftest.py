@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+root_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root_folder, "scrappers"))
+sys.path.insert(0, root_folder)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixture_server import FixtureServer
+
+
+@pytest.fixture
+def server():
+    with FixtureServer() as fixture_server:
+        yield fixture_server
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    """Retries still back off, just in milliseconds."""
+    import crawler
+    monkeypatch.setattr(crawler, "BACKOFF_BASE", 0.01)
@@ -0,0 +1,89 @@
+"""Local HTTP stand-in for bracu.ac.bd, so the crawler and the PDF downloader run without the network."""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Route:
+    """What the server answers on one path.
+
+    `failures` is a list of statuses sent (in order) before `body`, e.g.
+    [429, 503]. With `etag`, a request whose If-None-Match matches gets a
+    304. Range requests are answered from `body`, honouring If-Range.
+    """
+
+    def __init__(self, body=b"", status=200, failures=(), etag=None, retry_after=None, content_type="text/html"):
+        self.body = body
+        self.status = status
+        self.failures = list(failures)
+        self.etag = etag
+        self.retry_after = retry_after
+        self.content_type = content_type
+
+
+class FixtureServer:
+    def __init__(self):
+        self.routes = {}
+        self.requests = []   # (time, path, headers) of every request
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def send(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append((time.monotonic(), self.path, dict(self.headers)))
+                    route = server.routes.get(self.path)
+                    failure = route.failures.pop(0) if route is not None and route.failures else None
+                if route is None:
+                    return self.send(404)
+                if failure is not None:
+                    headers = {"Retry-After": route.retry_after} if route.retry_after is not None else {}
+                    return self.send(failure, headers=headers)
+
+                headers = {"Content-Type": route.content_type}
+                if route.etag:
+                    headers["ETag"] = route.etag
+                    if self.headers.get("If-None-Match") == route.etag:
+                        return self.send(304, headers=headers)
+
+                range_header = self.headers.get("Range")
+                if_range = self.headers.get("If-Range")
+                if range_header and (if_range is None or if_range == route.etag):
+                    start = int(range_header.split("=")[1].split("-")[0])
+                    if start >= len(route.body):
+                        return self.send(416, headers=headers)
+                    headers["Content-Range"] = f"bytes {start}-{len(route.body) - 1}/{len(route.body)}"
+                    return self.send(206, route.body[start:], headers)
+                self.send(route.status, route.body, headers)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def add(self, path, **route):
+        self.routes[path] = Route(**route)
+        return self.url + path
+
+    def hits(self, path):
+        return [r for r in self.requests if r[1] == path]
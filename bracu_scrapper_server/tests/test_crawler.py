@@ -0,0 +1,91 @@
+import time
+
+import requests
+
+from crawl_state import CrawlState
+from crawler import Crawler
+
+
+def make_crawler(**kwargs):
+    kwargs.setdefault("rate", 1000)
+    kwargs.setdefault("burst", 1000)
+    return Crawler(session_factory=requests.Session, **kwargs)
+
+
+def test_retries_429_and_503_then_succeeds(server):
+    url = server.add("/page", body=b"ok", failures=[429, 503], retry_after="0")
+    crawler = make_crawler(max_retries=3)
+
+    response = crawler.fetch(url)
+
+    assert response.status_code == 200
+    assert response.content == b"ok"
+    assert len(server.hits("/page")) == 3
+    assert crawler.stats == {"requests": 3, "retries": 2, "failures": 0}
+
+
+def test_gives_up_with_none_after_max_retries(server):
+    url = server.add("/down", failures=[503, 503, 503])
+    crawler = make_crawler(max_retries=2)
+
+    assert crawler.fetch(url) is None
+    assert len(server.hits("/down")) == 2
+    assert crawler.stats["failures"] == 1
+
+
+def test_404_is_returned_without_retrying(server):
+    crawler = make_crawler()
+
+    response = crawler.fetch(server.url + "/missing")
+
+    assert response.status_code == 404
+    assert crawler.stats["retries"] == 0
+
+
+def test_per_host_rate_limit(server):
+    urls = [server.add(f"/item-{i}", body=b"x") for i in range(8)]
+    crawler = make_crawler(rate=20, burst=2, max_workers=8)
+
+    start = time.monotonic()
+    results = list(crawler.map(urls, lambda url, response: url))
+    elapsed = time.monotonic() - start
+
+    assert sorted(results) == sorted(urls)
+    # 2 requests from the burst, the other 6 at 20 per second
+    assert elapsed >= 6 / 20 * 0.9
+
+
+def test_conditional_get_skips_unchanged_pages(server):
+    url = server.add("/news/a", body=b"<p>article</p>", etag='"v1"')
+    state = CrawlState(conn=None)
+    parsed = []
+
+    def parse(url, response):
+        parsed.append(url)
+        return url
+
+    assert list(make_crawler(state=state).map([url], parse)) == [url]
+    assert list(make_crawler(state=state).map([url], parse)) == []
+
+    assert parsed == [url]
+    assert server.hits("/news/a")[1][2].get("If-None-Match") == '"v1"'
+    assert state.stats["not_modified"] == 1
+
+
+def test_missing_page_is_not_fetched_again_until_retry_after(server):
+    url = server.add("/academic/fall/2099/rss.xml", status=404)
+    state = CrawlState(conn=None)
+    parsed = []
+
+    def parse(url, response):
+        parsed.append(url)
+        return url
+
+    assert list(make_crawler(state=state).map([url], parse)) == []
+    assert list(make_crawler(state=state).map([url], parse)) == []
+
+    assert parsed == []
+    assert len(server.hits("/academic/fall/2099/rss.xml")) == 1
+    assert not state.known(url)
+    assert state.gone == {url}
+    assert state.stats["missing"] == 1 and state.stats["still_missing"] == 1
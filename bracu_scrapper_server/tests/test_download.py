@@ -0,0 +1,70 @@
+import os
+
+import requests
+
+from crawler import Crawler
+from download_schedule_pdfs import PART_SUFFIX, VALIDATOR_SUFFIX, download_pdf_with_retry
+
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * 64 + b"\n%%EOF\n"
+
+
+def make_crawler():
+    return Crawler(session_factory=requests.Session, rate=1000, burst=1000)
+
+
+def leave_part(folder, name, body, validator=None):
+    """What an earlier, interrupted run leaves behind."""
+    part = os.path.join(folder, name + PART_SUFFIX)
+    with open(part, "wb") as f:
+        f.write(body)
+    if validator is not None:
+        with open(part + VALIDATOR_SUFFIX, "w") as f:
+            f.write(validator)
+    return part
+
+
+def downloaded(folder, name):
+    with open(os.path.join(folder, name), "rb") as f:
+        return f.read()
+
+
+def test_fresh_download_leaves_no_part_files(server, tmp_path):
+    url = server.add("/files/final.pdf", body=PDF, etag='"v1"', content_type="application/pdf")
+
+    assert download_pdf_with_retry(make_crawler(), url, str(tmp_path)) == "downloaded"
+
+    assert downloaded(tmp_path, "final.pdf") == PDF
+    assert os.listdir(tmp_path) == ["final.pdf"]
+
+
+def test_resumes_a_part_file_from_an_earlier_run(server, tmp_path):
+    url = server.add("/files/final.pdf", body=PDF, etag='"v1"', content_type="application/pdf")
+    leave_part(tmp_path, "final.pdf", PDF[:1000], validator='"v1"')
+
+    assert download_pdf_with_retry(make_crawler(), url, str(tmp_path)) == "downloaded"
+
+    headers = server.hits("/files/final.pdf")[0][2]
+    assert headers["Range"] == "bytes=1000-"
+    assert headers["If-Range"] == '"v1"'
+    assert downloaded(tmp_path, "final.pdf") == PDF
+    assert os.listdir(tmp_path) == ["final.pdf"]
+
+
+def test_part_file_of_an_older_version_is_replaced(server, tmp_path):
+    url = server.add("/files/final.pdf", body=PDF, etag='"v2"', content_type="application/pdf")
+    leave_part(tmp_path, "final.pdf", b"%PDF-1.3 old revision", validator='"v1"')
+
+    assert download_pdf_with_retry(make_crawler(), url, str(tmp_path)) == "downloaded"
+
+    assert server.hits("/files/final.pdf")[0][2]["If-Range"] == '"v1"'
+    assert downloaded(tmp_path, "final.pdf") == PDF
+
+
+def test_part_file_without_a_validator_is_discarded(server, tmp_path):
+    url = server.add("/files/final.pdf", body=PDF, etag='"v2"', content_type="application/pdf")
+    leave_part(tmp_path, "final.pdf", b"%PDF-1.3 old revision")
+
+    assert download_pdf_with_retry(make_crawler(), url, str(tmp_path)) == "downloaded"
+
+    assert "Range" not in server.hits("/files/final.pdf")[0][2]
+    assert downloaded(tmp_path, "final.pdf") == PDF